@@ -2,33 +2,69 @@
 #Gameplay class with pygame with AI players
 
 from board import *
-from gameView import *
 from player import *
 from heuristicAIPlayer import *
+from mctsAIPlayer import mctsAIPlayer
 from modelState import modelState
 from LLMPlayer import LLMPlayer
 from negotiation import NegotiationManager
 from gamelogic import GameLogicManager # Added import
+from eventLog import log, DEBUG, INFO, WARNING, OFF, ConsoleSink
+from gameRecord import GameRecordSink
+from phaseTimers import PhaseTimers, player_kind
 import queue
 import numpy as np
-import sys, pygame  # <-- Make sure sys is imported
-import matplotlib.pyplot as plt
+import sys  # <-- Make sure sys is imported
 import threading # <-- Add this
-
-from dotenv import load_dotenv
-load_dotenv() # Load environment variables from .env file
+import argparse, contextlib, os, signal, time
+#pygame, gameView and matplotlib are only imported when a view is attached - see catanAIGame(headless=...)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv() # Load environment variables from .env file
+except ImportError: #.env is only needed for LLM API keys
+    pass
+
+#Player types that can be seated, by menu choice
+AI_PLAYER_TYPES = {
+    "1": {"name": "ChatGPT (LLM)", "type": "llm", "llm_type": "chatgpt"},
+    "2": {"name": "Gemini (LLM)", "type": "llm", "llm_type": "gemini"},
+    "3": {"name": "Claude (LLM)", "type": "llm", "llm_type": "claude"},
+    "4": {"name": "Deepseek (LLM)", "type": "llm", "llm_type": "deepseek"},
+    "5": {"name": "Heuristic AI", "type": "heuristic"},
+    "6": {"name": "MCTS AI", "type": "mcts"}
+}
+
+#Function to get the player type details of a roster entry, e.g. 'heuristic' or 'gemini'
+def get_ai_type(rosterEntry):
+    for aiDetails in AI_PLAYER_TYPES.values():
+        if rosterEntry in (aiDetails["type"], aiDetails.get("llm_type")):
+            return aiDetails
+    raise ValueError("Unknown player type '{}', choose from: {}".format(rosterEntry, [d.get("llm_type", d["type"]) for d in AI_PLAYER_TYPES.values()]))
 
 #Class to implement an only AI
 class catanAIGame():
     #Create new gameboard
-    def __init__(self):
-        print("Initializing Settlers of Catan with only AI Players...")
-        self.board = catanBoard()
+    #headless=True runs the game on the engine alone: no pygame window, no drawing delays and no dice histogram
+    #roster: optional list of player types, e.g. ['heuristic']*4 - skips the player prompts
+    #seed: optional seed for the board layout, dice and AI choices. maxTurns: optional cap on player turns
+    #timers: optional PhaseTimers the phases of the game are timed into, e.g. shared by many games - see phaseTimers.py
+    #stateDeltas: LLM players get the full game state on the first decision of a turn and diffs after it - see stateDelta.py
+    def __init__(self, headless=False, roster=None, seed=None, maxTurns=None, timers=None, stateDeltas=False):
+        if log.level <= INFO:
+            log.emit(INFO, 'MESSAGE', text="Initializing Settlers of Catan with only AI Players...")
+        self.board = catanBoard(seed=seed) #The board owns the game's random streams
+        log.turn = 0 #Setup events are stamped turn 0
+        self.timers = timers if timers is not None else PhaseTimers()
+        self.stateDeltas = stateDeltas
 
         #Game State variables
         self.gameOver = False
         self.maxPoints = 10
-        self.numPlayers = 0
+        self.maxTurns = maxTurns
+        self.numTurns = 0
+        self.roster = roster
+        self.numPlayers = len(roster) if roster is not None else 0
 
         while(self.numPlayers not in [3,4]): #Only accept 3 and 4 player games
             try:
@@ -36,8 +72,9 @@ class catanAIGame():
             except:
                 print("Please input a valid number")
 
-        print("Initializing game with {} players...".format(self.numPlayers))
-        print("Note that Player 1 goes first, Player 2 second and so forth.")
+        if log.level <= INFO:
+            log.emit(INFO, 'MESSAGE', text="Initializing game with {} players...".format(self.numPlayers))
+            log.emit(INFO, 'MESSAGE', text="Note that Player 1 goes first, Player 2 second and so forth.")
         
         #Initialize blank player queue
         self.playerQueue = queue.Queue(self.numPlayers)
@@ -70,18 +107,40 @@ class catanAIGame():
         # Pass a lambda that can be called to get the current player list from the queue
         self.gameLogic = GameLogicManager(self.board, lambda: list(self.playerQueue.queue))
 
-        #Initialize boardview object
-        self.boardView = catanGameView(self.board, self)
+        #Initialize boardview object - the view is only an observer of the game state
+        self.boardView = None
+        if not headless:
+            from gameView import catanGameView
+            self.boardView = catanGameView(self.board, self)
 
         #Function to go through initial set up
         self.build_initial_settlements() # This will populate playerQueue
         self.playCatan()
+        if log.level <= INFO:
+            log.emit(INFO, 'GAME_END', winner=self.get_result()["winner"])
+            log.emit(INFO, 'PHASE_TIMES', phases=self.timers.summary())
+            llmPlayers = [p for p in self.playerQueue.queue if isinstance(p, LLMPlayer)]
+            if llmPlayers:
+                log.emit(INFO, 'PROMPT_STATS', players={p.name: p.prompt_stats.summary() for p in llmPlayers})
 
         #Plot diceStats histogram
-        plt.hist(self.diceStats_list, bins = 11)
-        plt.show()
+        if self.boardView is not None:
+            import matplotlib.pyplot as plt
+            plt.hist(self.diceStats_list, bins = 11)
+            plt.show()
 
         return None
+
+    #Function to redraw the attached view, then pause so moves stay readable - no-op when headless
+    def refresh_view(self, delay_ms=0):
+        if self.boardView is None:
+            return
+        import pygame
+        pygame.event.pump()
+        with self.timers.phase('render'):
+            self.boardView.displayGameScreen()
+        if delay_ms:
+            pygame.time.delay(delay_ms)
     
     def get_llm_action_threaded(self, llm_player, model_state):
         """Target function for the LLM thread. Calls the LLM and stores the result."""
@@ -95,53 +154,61 @@ class catanAIGame():
         wait loop that keeps the GUI responsive. Returns the LLM's action.
         """
         if self.llm_thread is not None and self.llm_thread.is_alive():
-            print("Warning: A previous LLM thread was still alive. Waiting for it to complete.")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'LLM_ERROR', player=llm_player.name, error="A previous LLM thread was still alive. Waiting for it to complete.")
             self.llm_thread.join()
 
         with self.lock:
             self.llm_action_result = None
 
-        self.llm_thread = threading.Thread(target=self.get_llm_action_threaded, args=(llm_player, model_state))
-        self.llm_thread.start()
+        # llm_wait is the time from the request to the answer, including the redraws below (also timed as render)
+        with self.timers.phase('llm_wait', llm_player):
+            if log.level <= DEBUG:
+                log.emit(DEBUG, 'LLM_WAIT', player=llm_player.name, llm_type=llm_player.llm_type)
+            self.llm_thread = threading.Thread(target=self.get_llm_action_threaded, args=(llm_player, model_state))
+            self.llm_thread.start()
+
+            # Non-blocking wait loop - keeps the view responsive if one is attached
+            if self.boardView is not None:
+                import pygame
+            while self.boardView is not None and self.llm_thread.is_alive():
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        if log.level <= WARNING:
+                            log.emit(WARNING, 'MESSAGE', text="Game quit during LLM API call.")
+                        pygame.quit()
+                        sys.exit()
+
+                with self.timers.phase('render'):
+                    self.boardView.displayGameScreen()
+                    pygame.display.flip()
+                pygame.time.wait(100) # 100ms delay to prevent high CPU usage
 
-        print(f"Waiting for {llm_player.name} ({llm_player.llm_type}) to respond...")
-        # Non-blocking wait loop
-        while self.llm_thread.is_alive():
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    print("Game quit during LLM API call.")
-                    pygame.quit()
-                    sys.exit()
-
-            self.boardView.displayGameScreen()
-            pygame.display.flip()
-            pygame.time.wait(100) # 100ms delay to prevent high CPU usage
-
-        self.llm_thread.join()
-        self.llm_thread = None
+            self.llm_thread.join()
+            self.llm_thread = None
 
         with self.lock:
             result = self.llm_action_result
 
         if result is None:
-            print(f"CRITICAL: LLM thread for {llm_player.name} finished but result is None. Defaulting to end_turn.")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'LLM_ERROR', player=llm_player.name, error="LLM thread finished but result is None. Defaulting to end_turn.")
             return {"thoughts": "Error: LLM response was None.", "action": {"type": "end_turn"}}
 
         return result
 
+    #Function to build the modelState an LLM player decides from, timed as the model_state phase
+    def build_model_state(self, player_i, **stateFlags):
+        with self.timers.phase('model_state', player_i):
+            return modelState(self, player_i, **stateFlags)
+
     #Function to initialize players + build initial settlements for players
     def build_initial_settlements(self):
         playerColors = ['black', 'darkslateblue', 'magenta4', 'orange1']
 
-        # Define available AI types for user selection
-        available_ai_types = {
-            "1": {"name": "ChatGPT (LLM)", "type": "llm", "llm_type": "chatgpt"},
-            "2": {"name": "Gemini (LLM)", "type": "llm", "llm_type": "gemini"},
-            "3": {"name": "Claude (LLM)", "type": "llm", "llm_type": "claude"},
-            "4": {"name": "Deepseek (LLM)", "type": "llm", "llm_type": "deepseek"},
-            "5": {"name": "Heuristic AI", "type": "heuristic"}
-        }
-        ai_type_prompt_string = "Choose AI type for Player {}:\n" +                                 "\n".join([f"  {key}: {val['name']}" for key, val in available_ai_types.items()]) +                                 "\nEnter choice (1-5): "
+        # Available AI types for user selection
+        available_ai_types = AI_PLAYER_TYPES
+        ai_type_prompt_string = "Choose AI type for Player {}:\n" +                                 "\n".join([f"  {key}: {val['name']}" for key, val in available_ai_types.items()]) +                                 "\nEnter choice (1-{}): ".format(len(AI_PLAYER_TYPES))
 
         available_personas = ["Aggressive", "Hoarder", "Diplomat", "Risk-Averse", "None"]
         persona_prompt_string = "Choose Persona for LLM Player {}:\n" +                                 "\n".join([f"  {idx+1}: {p_name}" for idx, p_name in enumerate(available_personas)]) +                                 "\nEnter choice (1-{}): ".format(len(available_personas))
@@ -155,6 +222,8 @@ class catanAIGame():
 
         for i in range(self.numPlayers):
             chosen_ai_details = None
+            if self.roster is not None: # Roster given up front - no prompts
+                chosen_ai_details = get_ai_type(self.roster[i])
             while chosen_ai_details is None:
                 try:
                     print("--------------------")
@@ -162,7 +231,7 @@ class catanAIGame():
                     if choice in available_ai_types:
                         chosen_ai_details = available_ai_types[choice]
                     else:
-                        print("Invalid choice. Please enter a number from 1 to 5.")
+                        print("Invalid choice. Please enter a number from 1 to {}.".format(len(available_ai_types)))
                 except EOFError: # Handle environments where input might not be available (e.g. some test runners)
                     print("EOFError encountered during input. Defaulting to Heuristic AI for remaining players.")
                     # Default to heuristic if input fails
@@ -178,7 +247,7 @@ class catanAIGame():
                 # Persona Selection
                 chosen_persona_value = None # Store the actual persona string or None
                 persona_selection_complete = False
-                if llm_type in ["gemini", "chatgpt", "claude", "deepseek"]: # Assuming all LLMs can have personas
+                if llm_type in ["gemini", "chatgpt", "claude", "deepseek"] and self.roster is None: # Assuming all LLMs can have personas
                     while not persona_selection_complete:
                         try:
                             persona_choice_idx = input(persona_prompt_string.format(i+1)).strip()
@@ -200,18 +269,33 @@ class catanAIGame():
                             persona_selection_complete = True # Exit loop on EOF
                             break # Explicitly break, though persona_selection_complete would also exit
 
-                print(f"Creating LLM Player: {playerName} with color {player_color}, type {llm_type}, and persona: {chosen_persona_value if chosen_persona_value else 'Default'}")
-                newPlayer = LLMPlayer(playerName, player_color, llm_type, persona=chosen_persona_value)
+                if log.level <= INFO:
+                    log.emit(INFO, 'MESSAGE', text=f"Creating LLM Player: {playerName} with color {player_color}, type {llm_type}, and persona: {chosen_persona_value if chosen_persona_value else 'Default'}")
+                newPlayer = LLMPlayer(playerName, player_color, llm_type, persona=chosen_persona_value, state_deltas=self.stateDeltas)
 
             elif chosen_ai_details["type"] == "heuristic":
                 playerName = f"Heuristic-AI-{i+1}"
-                print(f"Creating Heuristic Player: {playerName} with color {player_color}")
+                if log.level <= INFO:
+                    log.emit(INFO, 'MESSAGE', text=f"Creating Heuristic Player: {playerName} with color {player_color}")
                 newPlayer = heuristicAIPlayer(playerName, player_color)
                 newPlayer.updateAI() # This is specific to heuristicAIPlayer to set up its resources/flags
 
+            elif chosen_ai_details["type"] == "mcts":
+                playerName = f"MCTS-AI-{i+1}"
+                if log.level <= INFO:
+                    log.emit(INFO, 'MESSAGE', text=f"Creating MCTS Player: {playerName} with color {player_color}")
+                newPlayer = mctsAIPlayer(playerName, player_color)
+                newPlayer.updateAI() # Plays through the heuristic AI code paths of the game, with its own decisions
+
             if newPlayer:
+                newPlayer.rng = self.board.rng.agent_rng() # Independent random stream per seat
                 created_players.append(newPlayer)
 
+        # Search players play out the game from their decisions, so they need all the seats
+        for p in created_players:
+            if isinstance(p, mctsAIPlayer):
+                p.gamePlayers = created_players
+
         # Add players to the queue (original order for first setup round)
         for p in created_players:
             self.playerQueue.put(p)
@@ -223,18 +307,26 @@ class catanAIGame():
             for p2_name in player_names:
                 if p1_name != p2_name:
                     self.reputation[p1_name][p2_name] = 0
-        print(f"Initialized Reputation Matrix: {self.reputation}")
+        if log.level <= DEBUG:
+            log.emit(DEBUG, 'MESSAGE', text=f"Initialized Reputation Matrix: {self.reputation}")
+
+        # Everything a game record needs to rebuild the game: seats, board layout and dev card deck order
+        if log.level <= INFO:
+            log.emit(INFO, 'GAME_START', players=player_names, kinds=[player_kind(p) for p in created_players],
+                     resources=self.board.layout.resources.tolist(), numbers=self.board.layout.numbers.tolist(),
+                     ports=self.board.layout.ports.tolist(), deck=list(self.board.devCardStack.cards))
 
 
         playerList = list(self.playerQueue.queue) # Now correctly refers to players from the queue
 
-        print("\n--- Initial Setup Phase ---")
+        if log.level <= INFO:
+            log.emit(INFO, 'SETUP_PHASE')
         # First round of placements (e.g., P1, P2, P3, P4)
         for player_i in playerList: 
-            print(f"\nSetup Turn 1: {player_i.name}")
+            if log.level <= INFO:
+                log.emit(INFO, 'SETUP_TURN', round=1, player=player_i.name)
             if isinstance(player_i, LLMPlayer):
                 # --- LLM places first settlement ---
-                print(f"{player_i.name} to place first settlement.")
                 settlement_placed_successfully = False
                 settlement_placement_attempts = 0
                 max_settlement_placement_attempts = 3
@@ -243,40 +335,30 @@ class catanAIGame():
 
                 while not settlement_placed_successfully and settlement_placement_attempts < max_settlement_placement_attempts:
                     settlement_placement_attempts += 1
-                    if settlement_placement_attempts > 1:
-                        print(f"Re-prompting {player_i.name} for settlement (attempt {settlement_placement_attempts})")
-                        # Ensure feedback is set on player_i for the modelState to pick up
-                        # player_i.feedback_status_for_next_state = last_s_status_for_retry
-                        # player_i.feedback_details_for_next_state = last_s_error_for_retry
-                        # These last_s_status_for_retry would be set in the else clauses below.
+                    if log.level <= INFO:
+                        log.emit(INFO, 'SETUP_PROMPT', player=player_i.name, round=1, piece='SETTLEMENT', vertex=None, attempt=settlement_placement_attempts,
+                                 status=player_i.feedback_status_for_next_state if settlement_placement_attempts > 1 else None)
 
-                    current_model_state_settlement = modelState(self, player_i) # Will pick up feedback from player_i
+                    current_model_state_settlement = self.build_model_state(player_i) # Will pick up feedback from player_i
 
                     action_settlement = self.get_llm_response_non_blocking(player_i, current_model_state_settlement)
-                    print(f"{player_i.name} (Thoughts for settlement: {player_i.thoughts}) -> Action: {action_settlement}")
+                    if log.level <= INFO:
+                        log.emit(INFO, 'LLM_ACTION', player=player_i.name, phase='setup', step=settlement_placement_attempts, thoughts=player_i.thoughts, action=action_settlement)
                     action_type = action_settlement.get("type")
                     v_idx = action_settlement.get("vertex_index")
 
                     if action_type == "build_settlement" and v_idx is not None:
                         if v_idx in current_model_state_settlement.available_actions.get("build_settlement", []):
-                            v_coord = self.board.vertex_index_to_pixel_dict.get(v_idx)
-                            # player.build_settlement needs a setup_phase flag or similar, or direct board update
-                            # For now, direct update as in catanGame.py's handle_llm_setup_placement
-                            self.board.boardGraph[v_coord].state['Player'] = player_i
-                            self.board.boardGraph[v_coord].state['Settlement'] = True
-                            self.board.boardGraph[v_coord].isColonised = True
-                            player_i.buildGraph['SETTLEMENTS'].append(v_coord)
-                            player_i.settlementsLeft -= 1
-                            player_i.victoryPoints += 1 # VP for setup settlements
-                            if((self.board.boardGraph[v_coord].port != False) and (self.board.boardGraph[v_coord].port not in player_i.portList)):
-                                player_i.portList.append(self.board.boardGraph[v_coord].port)
-
-                            print(f"{player_i.name} built initial settlement at {v_idx}.")
-                            player_i.last_placed_settlement_v_idx = v_idx # Store for road prompt
-                            placed_settlement_v_idx = v_idx
-                            settlement_placed_successfully = True
-                            player_i.feedback_status_for_next_state = "success" # For the next action (road placement)
-                            player_i.feedback_details_for_next_state = f"Successfully placed settlement at {v_idx}."
+                            # Go through player.build_settlement so the placement is logged (and recorded) like any other build
+                            if player_i.build_settlement(v_idx, self.board, setup_phase=True):
+                                player_i.last_placed_settlement_v_idx = v_idx # Store for road prompt
+                                placed_settlement_v_idx = v_idx
+                                settlement_placed_successfully = True
+                                player_i.feedback_status_for_next_state = "success" # For the next action (road placement)
+                                player_i.feedback_details_for_next_state = f"Successfully placed settlement at {v_idx}."
+                            else:
+                                player_i.feedback_status_for_next_state = "error_unknown_build_failure"
+                                player_i.feedback_details_for_next_state = "player.build_settlement returned False for setup settlement unexpectedly."
                         else:
                             player_i.feedback_status_for_next_state = "error_invalid_placement"
                             player_i.feedback_details_for_next_state = f"Vertex {v_idx} is not a valid setup settlement location (e.g. occupied, too close, or rule violation). Valid are: {current_model_state_settlement.available_actions.get('build_settlement', [])}"
@@ -285,18 +367,17 @@ class catanAIGame():
                         player_i.feedback_details_for_next_state = f"Expected 'build_settlement' action with 'vertex_index'. Got: {action_settlement}"
 
                 if not settlement_placed_successfully:
-                    print(f"CRITICAL: {player_i.name} failed to place first settlement after {max_settlement_placement_attempts} attempts. Halting setup for this player.")
+                    if log.level <= WARNING:
+                        log.emit(WARNING, 'SETUP_FAILED', player=player_i.name, round=1, piece='SETTLEMENT', attempts=max_settlement_placement_attempts)
                     # Ensure feedback reflects the final failure if loop exhausted
                     # player_i.feedback_status_for_next_state and player_i.feedback_details_for_next_state will have the last error
                     # In a real game, might need to skip player or exit. For now, we'll just not place the road.
                     player_i.last_placed_settlement_v_idx = None # Ensure it's None
 
-                self.boardView.displayGameScreen()
-                pygame.time.delay(500)
+                self.refresh_view(500)
 
                 # --- LLM places first road ---
                 if placed_settlement_v_idx is not None: # Only proceed if settlement was placed successfully
-                    print(f"{player_i.name} to place first road connected to settlement at {placed_settlement_v_idx}.")
 
                     # The following line caused the error if player_i.buildGraph['SETTLEMENTS'] was empty.
                     # last_settlement_pixel_coord = player_i.buildGraph['SETTLEMENTS'][-1]
@@ -311,16 +392,17 @@ class catanAIGame():
 
                     while not road_placed_successfully and road_placement_attempts < max_road_placement_attempts:
                         road_placement_attempts += 1
-                        if road_placement_attempts > 1:
-                            print(f"Re-prompting {player_i.name} for road placement (attempt {road_placement_attempts}).")
-                            # Feedback for retry is already on player_i from previous failed attempt in this loop
+                        if log.level <= INFO:
+                            log.emit(INFO, 'SETUP_PROMPT', player=player_i.name, round=1, piece='ROAD', vertex=placed_settlement_v_idx, attempt=road_placement_attempts,
+                                     status=player_i.feedback_status_for_next_state if road_placement_attempts > 1 else None)
 
-                        current_model_state_road = modelState(self, player_i, # Will pick up feedback
-                                                              setup_road_placement_pending=True,
-                                                              last_settlement_vertex_index=placed_settlement_v_idx)
+                        current_model_state_road = self.build_model_state(player_i, # Will pick up feedback
+                                                                    setup_road_placement_pending=True,
+                                                                    last_settlement_vertex_index=placed_settlement_v_idx)
 
                         action_road = self.get_llm_response_non_blocking(player_i, current_model_state_road)
-                        print(f"{player_i.name} (Thoughts for road: {player_i.thoughts}) -> Action: {action_road}")
+                        if log.level <= INFO:
+                            log.emit(INFO, 'LLM_ACTION', player=player_i.name, phase='setup', step=road_placement_attempts, thoughts=player_i.thoughts, action=action_road)
                         action_type_road = action_road.get("type")
                         v1_idx_road = action_road.get("v1_index")
                         v2_idx_road = action_road.get("v2_index")
@@ -332,10 +414,7 @@ class catanAIGame():
                                 player_i.feedback_status_for_next_state = "error_invalid_placement"
                                 player_i.feedback_details_for_next_state = f"Road {chosen_road_pair} must connect to the new settlement at vertex {placed_settlement_v_idx}."
                             elif chosen_road_pair in current_model_state_road.available_actions.get("build_road", []):
-                                v1_coord = self.board.vertex_index_to_pixel_dict.get(v1_idx_road)
-                                v2_coord = self.board.vertex_index_to_pixel_dict.get(v2_idx_road)
-                                if player_i.build_road(v1_coord, v2_coord, self.board, setup_phase=True):
-                                    print(f"{player_i.name} built initial road from {v1_idx_road} to {v2_idx_road}.")
+                                if player_i.build_road(v1_idx_road, v2_idx_road, self.board, setup_phase=True):
                                     road_placed_successfully = True
                                     player_i.feedback_status_for_next_state = "success" # For the next player or phase
                                     player_i.feedback_details_for_next_state = f"Successfully built road {chosen_road_pair}."
@@ -350,27 +429,28 @@ class catanAIGame():
                             player_i.feedback_details_for_next_state = f"Expected 'build_road' action with 'v1_index' and 'v2_index'. Got: {action_road}"
 
                     if not road_placed_successfully:
-                        print(f"CRITICAL: {player_i.name} failed to place first road after {max_road_placement_attempts} attempts.")
+                        if log.level <= WARNING:
+                            log.emit(WARNING, 'SETUP_FAILED', player=player_i.name, round=1, piece='ROAD', attempts=max_road_placement_attempts)
                         # player_i feedback will retain the last error message.
                 # else:
                     # print(f"{player_i.name} did not place a settlement, so no road will be placed.")
                     # If settlement failed, player_i.feedback... will have that error. If it was successful, it'll have road success/failure.
 
             elif isinstance(player_i, heuristicAIPlayer): # Heuristic AI setup
-                print(f"{player_i.name} (Heuristic AI) performing initial setup (1st round).")
-                player_i.initial_setup(self.board) # Heuristic AI places one settlement and one road
+                if log.level <= INFO:
+                    log.emit(INFO, 'MESSAGE', text=f"{player_i.name} (Heuristic AI) performing initial setup (1st round).")
+                with self.timers.phase('ai_decision', player_i):
+                    player_i.initial_setup(self.board) # Heuristic AI places one settlement and one road
 
-            pygame.event.pump()
-            self.boardView.displayGameScreen()
-            pygame.time.delay(1000)
+            self.refresh_view(1000)
 
         # Second round of placements (e.g., P4, P3, P2, P1)
         playerList.reverse() # Reverse order for second round
         for player_i in playerList:
-            print(f"\nSetup Turn 2: {player_i.name}")
+            if log.level <= INFO:
+                log.emit(INFO, 'SETUP_TURN', round=2, player=player_i.name)
             if isinstance(player_i, LLMPlayer):
                 # --- LLM places second settlement ---
-                print(f"{player_i.name} to place second settlement.")
                 settlement_placed_successfully = False
                 settlement_placement_attempts = 0
                 max_settlement_placement_attempts = 3
@@ -379,36 +459,29 @@ class catanAIGame():
 
                 while not settlement_placed_successfully and settlement_placement_attempts < max_settlement_placement_attempts:
                     settlement_placement_attempts += 1
-                    if settlement_placement_attempts > 1:
-                        print(f"Re-prompting {player_i.name} for 2nd settlement (attempt {settlement_placement_attempts})")
-                        # Feedback for retry is on player_i
+                    if log.level <= INFO:
+                        log.emit(INFO, 'SETUP_PROMPT', player=player_i.name, round=2, piece='SETTLEMENT', vertex=None, attempt=settlement_placement_attempts,
+                                 status=player_i.feedback_status_for_next_state if settlement_placement_attempts > 1 else None)
 
-                    current_model_state_settlement = modelState(self, player_i) # Will pick up feedback
+                    current_model_state_settlement = self.build_model_state(player_i) # Will pick up feedback
 
                     action_settlement = self.get_llm_response_non_blocking(player_i, current_model_state_settlement)
-                    print(f"{player_i.name} (Thoughts for 2nd settlement: {player_i.thoughts}) -> Action: {action_settlement}")
+                    if log.level <= INFO:
+                        log.emit(INFO, 'LLM_ACTION', player=player_i.name, phase='setup', step=settlement_placement_attempts, thoughts=player_i.thoughts, action=action_settlement)
                     action_type = action_settlement.get("type")
                     v_idx = action_settlement.get("vertex_index")
 
                     if action_type == "build_settlement" and v_idx is not None:
                         if v_idx in current_model_state_settlement.available_actions.get("build_settlement", []):
-                            v_coord = self.board.vertex_index_to_pixel_dict.get(v_idx)
-                            # Direct board update for setup settlement
-                            self.board.boardGraph[v_coord].state['Player'] = player_i
-                            self.board.boardGraph[v_coord].state['Settlement'] = True
-                            self.board.boardGraph[v_coord].isColonised = True
-                            player_i.buildGraph['SETTLEMENTS'].append(v_coord)
-                            player_i.settlementsLeft -= 1
-                            player_i.victoryPoints += 1
-                            if((self.board.boardGraph[v_coord].port != False) and (self.board.boardGraph[v_coord].port not in player_i.portList)):
-                                player_i.portList.append(self.board.boardGraph[v_coord].port)
-
-                            print(f"{player_i.name} built 2nd initial settlement at {v_idx}.")
-                            player_i.last_placed_settlement_v_idx = v_idx
-                            placed_settlement_v_idx = v_idx
-                            settlement_placed_successfully = True
-                            player_i.feedback_status_for_next_state = "success"
-                            player_i.feedback_details_for_next_state = f"Successfully placed 2nd settlement at {v_idx}."
+                            if player_i.build_settlement(v_idx, self.board, setup_phase=True):
+                                player_i.last_placed_settlement_v_idx = v_idx
+                                placed_settlement_v_idx = v_idx
+                                settlement_placed_successfully = True
+                                player_i.feedback_status_for_next_state = "success"
+                                player_i.feedback_details_for_next_state = f"Successfully placed 2nd settlement at {v_idx}."
+                            else:
+                                player_i.feedback_status_for_next_state = "error_unknown_build_failure"
+                                player_i.feedback_details_for_next_state = "player.build_settlement returned False for 2nd setup settlement unexpectedly."
                         else:
                             player_i.feedback_status_for_next_state = "error_invalid_placement"
                             player_i.feedback_details_for_next_state = f"Vertex {v_idx} is not a valid setup settlement location for 2nd settlement. Valid are: {current_model_state_settlement.available_actions.get('build_settlement', [])}"
@@ -417,16 +490,15 @@ class catanAIGame():
                         player_i.feedback_details_for_next_state = f"Expected 'build_settlement' action with 'vertex_index' for 2nd settlement. Got: {action_settlement}"
 
                 if not settlement_placed_successfully:
-                    print(f"CRITICAL: {player_i.name} failed to place 2nd settlement after {max_settlement_placement_attempts} attempts. Halting setup.")
+                    if log.level <= WARNING:
+                        log.emit(WARNING, 'SETUP_FAILED', player=player_i.name, round=2, piece='SETTLEMENT', attempts=max_settlement_placement_attempts)
                     # Feedback on player_i obj will have the last error
                     player_i.last_placed_settlement_v_idx = None
 
-                self.boardView.displayGameScreen()
-                pygame.time.delay(500)
+                self.refresh_view(500)
 
                 # --- LLM places second road ---
                 if placed_settlement_v_idx is not None: # Only proceed if settlement was placed successfully
-                    print(f"{player_i.name} to place second road connected to settlement at {placed_settlement_v_idx}.")
                     road_placement_attempts = 0
                     road_placed_successfully = False
                     max_road_placement_attempts = 3
@@ -434,16 +506,17 @@ class catanAIGame():
 
                     while not road_placed_successfully and road_placement_attempts < max_road_placement_attempts:
                         road_placement_attempts += 1
-                        if road_placement_attempts > 1:
-                            print(f"Re-prompting {player_i.name} for 2nd road (attempt {road_placement_attempts})")
-                            # Feedback for retry is on player_i
+                        if log.level <= INFO:
+                            log.emit(INFO, 'SETUP_PROMPT', player=player_i.name, round=2, piece='ROAD', vertex=placed_settlement_v_idx, attempt=road_placement_attempts,
+                                     status=player_i.feedback_status_for_next_state if road_placement_attempts > 1 else None)
 
-                        current_model_state_road = modelState(self, player_i, # Will pick up feedback
-                                                              setup_road_placement_pending=True,
-                                                              last_settlement_vertex_index=placed_settlement_v_idx)
+                        current_model_state_road = self.build_model_state(player_i, # Will pick up feedback
+                                                                    setup_road_placement_pending=True,
+                                                                    last_settlement_vertex_index=placed_settlement_v_idx)
 
                         action_road = self.get_llm_response_non_blocking(player_i, current_model_state_road)
-                        print(f"{player_i.name} (Thoughts for 2nd road: {player_i.thoughts}) -> Action: {action_road}")
+                        if log.level <= INFO:
+                            log.emit(INFO, 'LLM_ACTION', player=player_i.name, phase='setup', step=road_placement_attempts, thoughts=player_i.thoughts, action=action_road)
                         action_type_road = action_road.get("type")
                         v1_idx_road = action_road.get("v1_index")
                         v2_idx_road = action_road.get("v2_index")
@@ -454,10 +527,7 @@ class catanAIGame():
                                 player_i.feedback_status_for_next_state = "error_invalid_placement"
                                 player_i.feedback_details_for_next_state = f"Road {chosen_road_pair} for 2nd settlement must connect to it at vertex {placed_settlement_v_idx}."
                             elif chosen_road_pair in current_model_state_road.available_actions.get("build_road", []):
-                                v1_coord = self.board.vertex_index_to_pixel_dict.get(v1_idx_road)
-                                v2_coord = self.board.vertex_index_to_pixel_dict.get(v2_idx_road)
-                                if player_i.build_road(v1_coord, v2_coord, self.board, setup_phase=True):
-                                    print(f"{player_i.name} built 2nd initial road from {v1_idx_road} to {v2_idx_road}.")
+                                if player_i.build_road(v1_idx_road, v2_idx_road, self.board, setup_phase=True):
                                     road_placed_successfully = True
                                     player_i.feedback_status_for_next_state = "success"
                                     player_i.feedback_details_for_next_state = f"Successfully built 2nd road {chosen_road_pair}."
@@ -472,21 +542,23 @@ class catanAIGame():
                             player_i.feedback_details_for_next_state = f"Expected 'build_road' action with 'v1_index' and 'v2_index' for 2nd road. Got: {action_road}"
 
                     if not road_placed_successfully:
-                        print(f"CRITICAL: {player_i.name} failed to place 2nd road after {max_road_placement_attempts} attempts.")
+                        if log.level <= WARNING:
+                            log.emit(WARNING, 'SETUP_FAILED', player=player_i.name, round=2, piece='ROAD', attempts=max_road_placement_attempts)
                         # player_i feedback will have the last error.
                 # else:
                     # print(f"{player_i.name} did not place second settlement, so no second road will be placed.")
 
             elif isinstance(player_i, heuristicAIPlayer): # Heuristic AI setup
-                print(f"{player_i.name} (Heuristic AI) performing initial setup (2nd round).")
-                player_i.initial_setup(self.board) # Heuristic AI places one settlement and one road
+                if log.level <= INFO:
+                    log.emit(INFO, 'MESSAGE', text=f"{player_i.name} (Heuristic AI) performing initial setup (2nd round).")
+                with self.timers.phase('ai_decision', player_i):
+                    player_i.initial_setup(self.board) # Heuristic AI places one settlement and one road
 
-            pygame.event.pump()
-            self.boardView.displayGameScreen()
-            pygame.time.delay(1000)
+            self.refresh_view(1000)
 
             # Initial resource generation for the second settlement for ALL player types
-            print(f"Player {player_i.name} built their second settlement. Collecting initial resources.")
+            if log.level <= INFO:
+                log.emit(INFO, 'MESSAGE', text=f"Player {player_i.name} built their second settlement. Collecting initial resources.")
             if player_i.buildGraph['SETTLEMENTS']: # Check if settlements list is not empty
                 last_settlement_coord = player_i.buildGraph['SETTLEMENTS'][-1]
                 for adjacentHex_idx in self.board.boardGraph[last_settlement_coord].adjacentHexList:
@@ -494,20 +566,24 @@ class catanAIGame():
                     resourceGenerated = hex_tile.resource.type
                     if resourceGenerated != 'DESERT':
                         player_i.resources[resourceGenerated] = player_i.resources.get(resourceGenerated, 0) + 1
-                        print(f"{player_i.name} collects 1 {resourceGenerated} from second settlement.")
+                        if log.level <= INFO:
+                            log.emit(INFO, 'SETUP_RESOURCE', player=player_i.name, resource=resourceGenerated)
             else:
-                print(f"WARNING: {player_i.name} has no settlements after second setup round to collect resources from.")
+                if log.level <= WARNING:
+                    log.emit(WARNING, 'MESSAGE', text=f"WARNING: {player_i.name} has no settlements after second setup round to collect resources from.")
         
-        pygame.time.delay(2000)
+        self.refresh_view(2000)
         self.gameSetup = False
-        print("\n--- Initial Setup Complete ---")
+        if log.level <= INFO:
+            log.emit(INFO, 'SETUP_COMPLETE')
 
     def execute_random_setup_settlement(self, player_obj):
         # Fallback: very basic random valid settlement placement
         # This is a simplified version of heuristicAIPlayer's initial_setup settlement logic
         possible_vertices = self.board.get_setup_settlements(player_obj)
         if not possible_vertices:
-            print(f"CRITICAL: No valid setup settlement spots for {player_obj.name}. This shouldn't happen.")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text=f"CRITICAL: No valid setup settlement spots for {player_obj.name}. This shouldn't happen.")
             # Potentially raise an error or find any vertex
             first_available = next(iter(self.board.boardGraph.keys()))
             player_obj.build_settlement(first_available, self.board) # Risky
@@ -530,32 +606,37 @@ class catanAIGame():
                 chosen_v_coord = v_coord_option
                 break
 
-        if chosen_v_coord:
+        if chosen_v_coord is not None:
             player_obj.build_settlement(chosen_v_coord, self.board)
-            print(f"{player_obj.name} (random fallback) built settlement at {chosen_v_coord}.")
+            if log.level <= INFO:
+                log.emit(INFO, 'MESSAGE', text=f"{player_obj.name} (random fallback) built settlement at {chosen_v_coord}.")
         else: # If all spots are too close (e.g. in a very crowded late setup for some reason)
             # This case should be rare in initial setup. Pick first possible if nothing else.
             chosen_v_coord = list(possible_vertices.keys())[0]
             player_obj.build_settlement(chosen_v_coord, self.board)
-            print(f"{player_obj.name} (random fallback, relaxed distance) built settlement at {chosen_v_coord}.")
+            if log.level <= INFO:
+                log.emit(INFO, 'MESSAGE', text=f"{player_obj.name} (random fallback, relaxed distance) built settlement at {chosen_v_coord}.")
 
 
     def execute_random_setup_road(self, player_obj):
         # Fallback: very basic random valid road placement
         if not player_obj.buildGraph['SETTLEMENTS']:
-            print(f"CRITICAL: {player_obj.name} has no settlements to build a road from in random setup.")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text=f"CRITICAL: {player_obj.name} has no settlements to build a road from in random setup.")
             return
 
         possible_roads = self.board.get_setup_roads(player_obj) # Needs player's last settlement
         if not possible_roads:
-            print(f"CRITICAL: No valid setup road spots for {player_obj.name}. This shouldn't happen.")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text=f"CRITICAL: No valid setup road spots for {player_obj.name}. This shouldn't happen.")
             # This implies the last settlement has no available road spots, which is unlikely.
             return
 
         # Extremely basic: pick the first valid one
         v1_coord, v2_coord = list(possible_roads.keys())[0]
         player_obj.build_road(v1_coord, v2_coord, self.board)
-        print(f"{player_obj.name} (random fallback) built road from {v1_coord} to {v2_coord}.")
+        if log.level <= INFO:
+            log.emit(INFO, 'MESSAGE', text=f"{player_obj.name} (random fallback) built road from {v1_coord} to {v2_coord}.")
 
 
     #Function to roll dice - Now uses GameLogicManager
@@ -572,9 +653,8 @@ class catanAIGame():
         if diceRoll != 7: # Collect resources if not a 7
             self.gameLogic.distribute_resources(diceRoll) # Use GameLogicManager
         else: # Dice roll is 7
-            print("---------------------------------------------------------------------------")
-            print("Dice roll is 7! Robber activates. Players with >7 cards must discard.")
-            print("---------------------------------------------------------------------------")
+            if log.level <= INFO:
+                log.emit(INFO, 'ROBBER_ACTIVATED')
 
 
             for p in list(self.playerQueue.queue):
@@ -582,19 +662,22 @@ class catanAIGame():
                 total_resources = sum(p.resources.values())
                 if total_resources > 7:
                     cards_to_discard_count = total_resources // 2
-                    print(f"Player {p.name} has {total_resources} resources and must discard {cards_to_discard_count}.")
+                    if log.level <= INFO:
+                        log.emit(INFO, 'MUST_DISCARD', player=p.name, total=total_resources, count=cards_to_discard_count)
                     p.pending_discard_count = cards_to_discard_count # Set it on the player object
 
             # Robber movement decision is now deferred to playCatan for LLMs
             if isinstance(currentPlayer, heuristicAIPlayer):
-                print(f"{currentPlayer.name} (Heuristic) is moving the robber (will be handled after discards).")
+                if log.level <= INFO:
+                    log.emit(INFO, 'MESSAGE', text=f"{currentPlayer.name} (Heuristic) is moving the robber (will be handled after discards).")
                 # Heuristic will move robber after discards in its own way if this flag is checked by it.
                 # For now, the robber movement for heuristic is also part of its .move() or a specific call.
                 # The original call to currentPlayer.heuristic_move_robber(self.board) is removed from here.
                 # Instead, it will be handled in the playCatan sequence.
                 self.player_to_move_robber = currentPlayer # Heuristic also uses this flag now for sequence.
             elif isinstance(currentPlayer, LLMPlayer):
-                print(f"{currentPlayer.name} (LLM) must move the robber. Action will be decided in their turn.")
+                if log.level <= INFO:
+                    log.emit(INFO, 'MESSAGE', text=f"{currentPlayer.name} (LLM) must move the robber. Action will be decided in their turn.")
                 self.player_to_move_robber = currentPlayer
             else:
                 self.player_to_move_robber = None
@@ -653,7 +736,8 @@ class catanAIGame():
         return None
 
     def _execute_random_discard(self, player_obj, num_to_discard):
-        print(f"{player_obj.name} (Fallback) randomly discarding {num_to_discard} cards.")
+        if log.level <= INFO:
+            log.emit(INFO, 'MESSAGE', text=f"{player_obj.name} (Fallback) randomly discarding {num_to_discard} cards.")
         discarded_count = 0
         # Create a flat list of available resources to make random choice easier
         available_for_discard = []
@@ -661,12 +745,13 @@ class catanAIGame():
             available_for_discard.extend([resource] * count)
 
         if not available_for_discard or len(available_for_discard) < num_to_discard:
-            print(f"Error: {player_obj.name} does not have enough cards to discard for random fallback.")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text=f"Error: {player_obj.name} does not have enough cards to discard for random fallback.")
             # This state should ideally not be reached if logic is correct.
             # As a last resort, discard all cards if less than num_to_discard.
             num_to_discard = len(available_for_discard)
 
-        np.random.shuffle(available_for_discard) # Shuffle for randomness
+        player_obj.rng.shuffle(available_for_discard) # Shuffle for randomness
 
         resources_actually_discarded = {}
         for i in range(num_to_discard):
@@ -675,18 +760,21 @@ class catanAIGame():
                 player_obj.resources[card_to_discard] -= 1
                 resources_actually_discarded[card_to_discard] = resources_actually_discarded.get(card_to_discard, 0) + 1
                 discarded_count += 1
-        print(f"{player_obj.name} (Fallback) discarded: {resources_actually_discarded}")
+        if log.level <= INFO:
+            log.emit(INFO, 'DISCARD', player=player_obj.name, kind='Fallback', resources=resources_actually_discarded)
 
 
     def _execute_random_robber_move(self, player_who_moves_robber):
-        print(f"{player_who_moves_robber.name} (LLM Fallback) making a random robber move.")
+        if log.level <= INFO:
+            log.emit(INFO, 'MESSAGE', text=f"{player_who_moves_robber.name} (LLM Fallback) making a random robber move.")
         # Simplified random robber placement logic (less sophisticated than heuristic's)
         possible_hexes = [h_idx for h_idx, h_tile in self.board.hexTileDict.items() if not h_tile.robber]
         if not possible_hexes: # Should not happen
-            print("Error: No valid hexes to move robber to.")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text="Error: No valid hexes to move robber to.")
             return
 
-        target_hex_idx = np.random.choice(possible_hexes)
+        target_hex_idx = possible_hexes[player_who_moves_robber.rng.integers(len(possible_hexes))]
 
         # Find players on the target hex (simplified)
         players_on_hex = []
@@ -730,10 +818,12 @@ class catanAIGame():
 
         player_to_rob_obj = None
         if players_on_hex:
-            player_to_rob_obj = np.random.choice(players_on_hex)
-            print(f"Robber randomly moved to hex {target_hex_idx}, targeting {player_to_rob_obj.name}.")
+            player_to_rob_obj = players_on_hex[player_who_moves_robber.rng.integers(len(players_on_hex))]
+            if log.level <= INFO:
+                log.emit(INFO, 'MESSAGE', text=f"Robber randomly moved to hex {target_hex_idx}, targeting {player_to_rob_obj.name}.")
         else:
-            print(f"Robber randomly moved to hex {target_hex_idx}, no one to rob there.")
+            if log.level <= INFO:
+                log.emit(INFO, 'MESSAGE', text=f"Robber randomly moved to hex {target_hex_idx}, no one to rob there.")
 
         outcome = player_who_moves_robber.move_robber(target_hex_idx, self.board, player_to_rob_obj)
         if player_to_rob_obj and outcome: # Successfully robbed
@@ -749,8 +839,9 @@ class catanAIGame():
 
         # Add opening message
         self.private_chat_histories[chat_key].append({"player": initiator.name, "message": opening_message})
-        print(f"[Private Chat | {initiator.name} to {recipient.name}]: {opening_message}")
-        self.boardView.displayGameScreen() # Update GUI to show chat status
+        if log.level <= INFO:
+            log.emit(INFO, 'CHAT', player=initiator.name, channel='private', to=recipient.name, text=opening_message)
+        self.refresh_view() # Update GUI to show chat status
 
         current_speaker = recipient # Recipient gets to respond first
         other_speaker = initiator
@@ -759,16 +850,18 @@ class catanAIGame():
         for exchange_num in range(max_exchanges * 2 -1): # Max messages after opener
             # Create a modelState indicating a private chat is active
             # The modelState needs to be created for the 'current_speaker'
-            chat_state = modelState(self, current_speaker, private_chat_active=True, communication_phase_active=False)
+            chat_state = self.build_model_state(current_speaker, private_chat_active=True, communication_phase_active=False)
 
-            print(f"--- Private Chat: {current_speaker.name}'s turn to speak to {other_speaker.name} ---")
+            if log.level <= INFO:
+                log.emit(INFO, 'MESSAGE', text=f"--- Private Chat: {current_speaker.name}'s turn to speak to {other_speaker.name} ---")
             response_action = self.get_llm_response_non_blocking(current_speaker, chat_state)
             action_type = response_action.get("type")
             message_content = response_action.get("message") # For send_private_message
 
             if action_type == "send_private_message" and message_content:
                 self.private_chat_histories[chat_key].append({"player": current_speaker.name, "message": message_content})
-                print(f"[Private Chat | {current_speaker.name} to {other_speaker.name}]: {message_content}")
+                if log.level <= INFO:
+                    log.emit(INFO, 'CHAT', player=current_speaker.name, channel='private', to=other_speaker.name, text=message_content)
                 # Swap speaker for next turn
                 current_speaker, other_speaker = other_speaker, current_speaker
 
@@ -776,36 +869,41 @@ class catanAIGame():
                  # TODO: Handle the trade logic. This is complex.
                  # Need to know what was proposed. This might require the LLM to re-state the trade.
                  # Or, the private chat context should make the trade clear.
-                 print(f"[Private Chat | {current_speaker.name}]: Accepted trade with {other_speaker.name}! (Trade execution logic TBD). Exiting chat.")
+                 if log.level <= INFO:
+                     log.emit(INFO, 'MESSAGE', text=f"[Private Chat | {current_speaker.name}]: Accepted trade with {other_speaker.name}! (Trade execution logic TBD). Exiting chat.")
                  # Potentially, the LLM that accepts should then make a formal "propose_trade" or "accept_trade" action
                  # that the game loop can process with resource validation.
                  # For now, just end the chat.
                  break
 
             elif action_type == "end_private_chat":
-                print(f"[Private Chat | {current_speaker.name}]: Ended chat with {other_speaker.name}.")
+                if log.level <= INFO:
+                    log.emit(INFO, 'MESSAGE', text=f"[Private Chat | {current_speaker.name}]: Ended chat with {other_speaker.name}.")
                 break
 
             else: # Any other action, or invalid action, ends the chat.
-                print(f"[Private Chat | {current_speaker.name}]: Action ({action_type}) ended chat with {other_speaker.name}.")
+                if log.level <= INFO:
+                    log.emit(INFO, 'MESSAGE', text=f"[Private Chat | {current_speaker.name}]: Action ({action_type}) ended chat with {other_speaker.name}.")
                 break
 
-            self.boardView.displayGameScreen() # Update GUI
-            pygame.time.delay(200) # Small delay for readability
+            self.refresh_view(200)
 
-        print(f"--- Private Chat between {initiator.name} and {recipient.name} concluded. ---")
+        if log.level <= INFO:
+            log.emit(INFO, 'MESSAGE', text=f"--- Private Chat between {initiator.name} and {recipient.name} concluded. ---")
         self.active_private_chat_participants = None # Clear active chat participants
-        self.boardView.displayGameScreen() # Final update
+        self.refresh_view() # Final update
 
     def handle_negotiation(self, initiator_player, target_player, numTurns_at_start):
         """
         Manages the negotiation loop between two players using NegotiationManager.
         """
         if not self.current_negotiation or not self.current_negotiation.is_active():
-            print("Error: No active negotiation to handle.")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text="Error: No active negotiation to handle.")
             return False
 
-        print(f"--- Negotiation Resumed with {self.current_negotiation.active_negotiator.name} ---")
+        if log.level <= INFO:
+            log.emit(INFO, 'MESSAGE', text=f"--- Negotiation Resumed with {self.current_negotiation.active_negotiator.name} ---")
         max_negotiation_actions = 6 # Max total actions (offers/counters/accept/reject) in a negotiation session
         actions_taken_this_session = 0
 
@@ -814,21 +912,24 @@ class catanAIGame():
             other_llm_negotiator = self.current_negotiation.initiator if current_llm_negotiator == self.current_negotiation.target else self.current_negotiation.target
 
             actions_taken_this_session +=1
-            print(f"Negotiation Action {actions_taken_this_session}: {current_llm_negotiator.name}'s turn.")
+            if log.level <= INFO:
+                log.emit(INFO, 'MESSAGE', text=f"Negotiation Action {actions_taken_this_session}: {current_llm_negotiator.name}'s turn.")
 
             # modelState will now use self.current_negotiation.get_context_for_player()
-            negotiation_model_state = modelState(self, current_llm_negotiator)
+            negotiation_model_state = self.build_model_state(current_llm_negotiator)
                                            # is_negotiation_turn=True, # No longer needed directly for modelState
                                            # negotiation_partner_name=other_llm_negotiator.name) # No longer needed
 
             action = self.get_llm_response_non_blocking(current_llm_negotiator, negotiation_model_state)
             action_type = action.get("type")
-            print(f"{current_llm_negotiator.name} (Negotiation Thoughts: {current_llm_negotiator.thoughts}) -> Action: {action}")
+            if log.level <= INFO:
+                log.emit(INFO, 'MESSAGE', text=f"{current_llm_negotiator.name} (Negotiation Thoughts: {current_llm_negotiator.thoughts}) -> Action: {action}")
 
             if action_type == "accept_trade":
                 last_offer = self.current_negotiation.get_last_offer()
                 if not last_offer:
-                    print(f"Error: {current_llm_negotiator.name} tried to accept, but no valid last offer found in history.")
+                    if log.level <= WARNING:
+                        log.emit(WARNING, 'MESSAGE', text=f"Error: {current_llm_negotiator.name} tried to accept, but no valid last offer found in history.")
                     current_llm_negotiator.feedback_status_for_next_state = "error_negotiation_no_offer_to_accept"
                     current_llm_negotiator.feedback_details_for_next_state = "There was no valid previous offer to accept."
                     self.current_negotiation.end_negotiation_by_system("Error: Tried to accept non-existent offer.", game_turn=numTurns_at_start + actions_taken_this_session)
@@ -855,9 +956,11 @@ class catanAIGame():
                             proposer_of_last_offer.resources[res] -= count
                             current_llm_negotiator.resources[res] += count
 
-                        print(f"Trade Accepted & Executed! Offer: {last_offer}")
-                        print(f"{current_llm_negotiator.name} resources: {current_llm_negotiator.resources}")
-                        print(f"{proposer_of_last_offer.name} resources: {proposer_of_last_offer.resources}")
+                        if log.level <= INFO:
+                            log.emit(INFO, 'PLAYER_TRADE', player=current_llm_negotiator.name, partner=proposer_of_last_offer.name, give=resources_acceptor_gives, get=resources_acceptor_receives)
+                            log.emit(INFO, 'MESSAGE', text=f"Trade Accepted & Executed! Offer: {last_offer}")
+                            log.emit(INFO, 'MESSAGE', text=f"{current_llm_negotiator.name} resources: {current_llm_negotiator.resources}")
+                            log.emit(INFO, 'MESSAGE', text=f"{proposer_of_last_offer.name} resources: {proposer_of_last_offer.resources}")
 
                         # Update reputation for accepted trade
                         self.update_reputation(current_llm_negotiator.name, proposer_of_last_offer.name, 2)
@@ -925,8 +1028,7 @@ class catanAIGame():
                 other_llm_negotiator.feedback_details_for_next_state = f"Negotiation with {current_llm_negotiator.name} ended due to their invalid action."
                 # Loop will terminate.
 
-            self.boardView.displayGameScreen() # Update view after each negotiation step
-            pygame.time.delay(200)
+            self.refresh_view(200)
 
             if not self.current_negotiation.is_active():
                 break # Exit if manager state changed to a non-active one
@@ -944,7 +1046,8 @@ class catanAIGame():
 
 
         final_negotiation_state = self.current_negotiation.current_state
-        print(f"--- Negotiation Session Concluded. Final State: {final_negotiation_state} ---")
+        if log.level <= INFO:
+            log.emit(INFO, 'MESSAGE', text=f"--- Negotiation Session Concluded. Final State: {final_negotiation_state} ---")
 
         negotiation_was_successful = (final_negotiation_state == "ACCEPTED")
 
@@ -953,16 +1056,18 @@ class catanAIGame():
             # Archive or log self.current_negotiation.history if needed
             self.current_negotiation = None
 
-        self.boardView.displayGameScreen()
+        self.refresh_view()
         return negotiation_was_successful
 
     def update_reputation(self, player1_name, player2_name, change):
         """Updates reputation score between two players."""
         if player1_name in self.reputation and player2_name in self.reputation[player1_name]:
             self.reputation[player1_name][player2_name] += change
-            print(f"Reputation updated: {player1_name}'s rep with {player2_name} is now {self.reputation[player1_name][player2_name]}.")
+            if log.level <= DEBUG:
+                log.emit(DEBUG, 'MESSAGE', text=f"Reputation updated: {player1_name}'s rep with {player2_name} is now {self.reputation[player1_name][player2_name]}.")
         else:
-            print(f"Warning: Could not update reputation. Player names not found in matrix: {player1_name}, {player2_name}")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text=f"Warning: Could not update reputation. Player names not found in matrix: {player1_name}, {player2_name}")
         # Symmetric change for player2's reputation with player1 could also be added if desired,
         # but the spec implies one-way changes for some actions (e.g. robber).
         # For accepted trade, it should be symmetric.
@@ -973,44 +1078,51 @@ class catanAIGame():
         while not self.gameOver:
             # --- Communication Phase (before any player takes their turn) ---
             if not self.gameSetup: # No communication phase during initial setup
-                print("--- Communication Phase ---")
+                if log.level <= INFO:
+                    log.emit(INFO, 'MESSAGE', text="--- Communication Phase ---")
                 self.communication_phase_active = True
                 for player_speaker in list(self.playerQueue.queue):
                     if isinstance(player_speaker, LLMPlayer):
-                        # Create a modelState specifically for this communication phase
-                        comm_state = modelState(self, player_speaker,
-                                                private_chat_active=False,
-                                                communication_phase_active=self.communication_phase_active)
-
-                        # Modify modelState to indicate communication phase.
-                        # This is a bit of a hack; ideally, modelState would take a phase parameter.
-                        # For now, we'll set a temporary attribute on comm_state if modelState doesn't directly support this.
-                        # Or, ensure LLMPlayer prompt construction correctly uses self.communication_phase_active from game.
-                        # The modelState now has private_chat_active, let's add communication_phase_active for clarity.
-                        # We will need to modify modelState to accept 'communication_phase_active'
-                        # For now, let's assume modelState correctly uses game.communication_phase_active via the 'self' (catan_game) passed.
-                        # The LLMPlayer's _construct_prompt already checks game_state_obj.communication_phase_active
-
-                        comm_action = self.get_llm_response_non_blocking(player_speaker, comm_state) # LLM decides if it wants to speak
-
-                        if comm_action and comm_action.get("type") == "send_global_message":
-                            message = comm_action.get("message")
-                            if message: # Ensure message is not empty
-                                print(f"[Global Chat | {player_speaker.name}]: {message}")
-                                self.global_chat_history.append({"player": player_speaker.name, "message": message})
-                                # self.boardView.displayGameScreen() # Update GUI - may cause too many updates if frequent
-                        elif comm_action and comm_action.get("type") != "end_turn":
-                             print(f"[Communication Phase | {player_speaker.name}]: Chose not to speak or invalid action ({comm_action.get('type')}).")
-                        # else: player chose end_turn (i.e. to say nothing) or action was None
+                        with self.timers.phase('communication', player_speaker):
+                            # Create a modelState specifically for this communication phase
+                            comm_state = self.build_model_state(player_speaker,
+                                                          private_chat_active=False,
+                                                          communication_phase_active=self.communication_phase_active)
+
+                            # Modify modelState to indicate communication phase.
+                            # This is a bit of a hack; ideally, modelState would take a phase parameter.
+                            # For now, we'll set a temporary attribute on comm_state if modelState doesn't directly support this.
+                            # Or, ensure LLMPlayer prompt construction correctly uses self.communication_phase_active from game.
+                            # The modelState now has private_chat_active, let's add communication_phase_active for clarity.
+                            # We will need to modify modelState to accept 'communication_phase_active'
+                            # For now, let's assume modelState correctly uses game.communication_phase_active via the 'self' (catan_game) passed.
+                            # The LLMPlayer's _construct_prompt already checks game_state_obj.communication_phase_active
+
+                            comm_action = self.get_llm_response_non_blocking(player_speaker, comm_state) # LLM decides if it wants to speak
+
+                            if comm_action and comm_action.get("type") == "send_global_message":
+                                message = comm_action.get("message")
+                                if message: # Ensure message is not empty
+                                    if log.level <= INFO:
+                                        log.emit(INFO, 'CHAT', player=player_speaker.name, channel='global', to=None, text=message)
+                                    self.global_chat_history.append({"player": player_speaker.name, "message": message})
+                                    # self.boardView.displayGameScreen() # Update GUI - may cause too many updates if frequent
+                            elif comm_action and comm_action.get("type") != "end_turn":
+                                 if log.level <= INFO:
+                                     log.emit(INFO, 'MESSAGE', text=f"[Communication Phase | {player_speaker.name}]: Chose not to speak or invalid action ({comm_action.get('type')}).")
+                            # else: player chose end_turn (i.e. to say nothing) or action was None
 
                 self.communication_phase_active = False # Reset flag after phase
-                self.boardView.displayGameScreen() # Update GUI once after communication phase
+                self.refresh_view() # Update GUI once after communication phase
 
             for currPlayer in list(self.playerQueue.queue): # Iterate on a copy if queue is modified
                 numTurns += 1
-                print("---------------------------------------------------------------------------")
+                self.numTurns = numTurns
+                log.turn = numTurns
+                turnStartTime = time.perf_counter()
                 # print(f"Current Player: {currPlayer.name} (Color: {currPlayer.color})") # Moved to after communication phase print
-                print(f"--- {currPlayer.name}'s Turn (Color: {currPlayer.color}) ---")
+                if log.level <= INFO:
+                    log.emit(INFO, 'TURN_START', player=currPlayer.name, color=currPlayer.color)
 
                 currPlayer.updateDevCards()
                 currPlayer.devCardPlayedThisTurn = False
@@ -1019,126 +1131,149 @@ class catanAIGame():
                 current_turn_last_action_status = None
                 current_turn_last_action_error_details = None
 
-                pygame.event.pump()
-                diceNum = self.gameLogic.roll_dice() # Use GameLogicManager
-                self.boardView.displayDiceRoll(diceNum) # Display dice roll on GUI if applicable
+                with self.timers.phase('dice', currPlayer):
+                    diceNum = self.gameLogic.roll_dice() # Use GameLogicManager
+                if self.boardView is not None:
+                    self.refresh_view()
+                    self.boardView.displayDiceRoll(diceNum) # Display dice roll on GUI if applicable
 
                 # update_playerResources now sets pending_discard_count on players and player_to_move_robber on self
-                self.update_playerResources(diceNum, currPlayer) # update_playerResources now uses gameLogic.distribute_resources
+                with self.timers.phase('distribution', currPlayer):
+                    self.update_playerResources(diceNum, currPlayer) # update_playerResources now uses gameLogic.distribute_resources
                 self.diceStats[diceNum] += 1; self.diceStats_list.append(diceNum)
 
                 # --- Card Discarding Phase (if a 7 was rolled) ---
                 if diceNum == 7:
-                    print("--- Card Discarding Phase ---")
+                    if log.level <= INFO:
+                        log.emit(INFO, 'MESSAGE', text="--- Card Discarding Phase ---")
                     for p_discarding in list(self.playerQueue.queue):
                         if hasattr(p_discarding, 'pending_discard_count') and p_discarding.pending_discard_count > 0:
-                            required_discard_num = p_discarding.pending_discard_count
-                            print(f"Player {p_discarding.name} must discard {required_discard_num} cards.")
-                            if isinstance(p_discarding, LLMPlayer):
-                                state_for_discard = modelState(self, p_discarding, discard_is_mandatory=True, num_cards_to_discard=required_discard_num)
-                                discard_action = self.get_llm_response_non_blocking(p_discarding, state_for_discard)
-                                print(f"{p_discarding.name} (Discard Thoughts: {p_discarding.thoughts}) -> Discard Action: {discard_action}")
-
-                                executed_discard = False
-                                if discard_action.get("type") == "discard_cards":
-                                    resources_to_discard = discard_action.get("resources", {})
-                                    actual_discarded_sum = sum(resources_to_discard.values())
-
-                                    valid_discard = True
-                                    if actual_discarded_sum != required_discard_num:
-                                        print(f"Error: {p_discarding.name} LLM proposed discarding {actual_discarded_sum} cards, but {required_discard_num} required.")
-                                        valid_discard = False
-                                    else:
-                                        for res, count in resources_to_discard.items():
-                                            if p_discarding.resources.get(res, 0) < count:
-                                                print(f"Error: {p_discarding.name} LLM tried to discard {count} {res}, but only has {p_discarding.resources.get(res, 0)}.")
-                                                valid_discard = False; break
+                            with self.timers.phase('discard', p_discarding):
+                                required_discard_num = p_discarding.pending_discard_count
+                                if log.level <= INFO:
+                                    log.emit(INFO, 'MESSAGE', text=f"Player {p_discarding.name} must discard {required_discard_num} cards.")
+                                if isinstance(p_discarding, LLMPlayer):
+                                    state_for_discard = self.build_model_state(p_discarding, discard_is_mandatory=True, num_cards_to_discard=required_discard_num)
+                                    discard_action = self.get_llm_response_non_blocking(p_discarding, state_for_discard)
+                                    if log.level <= DEBUG:
+                                        log.emit(DEBUG, 'LLM_ACTION', player=p_discarding.name, phase='discard', step=None, thoughts=p_discarding.thoughts, action=discard_action)
+
+                                    executed_discard = False
+                                    if discard_action.get("type") == "discard_cards":
+                                        resources_to_discard = discard_action.get("resources", {})
+                                        actual_discarded_sum = sum(resources_to_discard.values())
+
+                                        valid_discard = True
+                                        if actual_discarded_sum != required_discard_num:
+                                            if log.level <= WARNING:
+                                                log.emit(WARNING, 'MESSAGE', text=f"Error: {p_discarding.name} LLM proposed discarding {actual_discarded_sum} cards, but {required_discard_num} required.")
+                                            valid_discard = False
+                                        else:
+                                            for res, count in resources_to_discard.items():
+                                                if p_discarding.resources.get(res, 0) < count:
+                                                    if log.level <= WARNING:
+                                                        log.emit(WARNING, 'MESSAGE', text=f"Error: {p_discarding.name} LLM tried to discard {count} {res}, but only has {p_discarding.resources.get(res, 0)}.")
+                                                    valid_discard = False; break
 
-                                    if valid_discard:
-                                        for res, count in resources_to_discard.items():
-                                            p_discarding.resources[res] -= count
-                                        print(f"{p_discarding.name} (LLM) discarded: {resources_to_discard}")
-                                        executed_discard = True
+                                        if valid_discard:
+                                            for res, count in resources_to_discard.items():
+                                                p_discarding.resources[res] -= count
+                                            if log.level <= INFO:
+                                                log.emit(INFO, 'DISCARD', player=p_discarding.name, kind='LLM', resources=resources_to_discard)
+                                            executed_discard = True
 
-                                if not executed_discard: # Fallback if LLM action was invalid or wrong type
-                                    self._execute_random_discard(p_discarding, required_discard_num)
+                                    if not executed_discard: # Fallback if LLM action was invalid or wrong type
+                                        self._execute_random_discard(p_discarding, required_discard_num)
 
-                            elif isinstance(p_discarding, heuristicAIPlayer):
-                                print(f"{p_discarding.name} (Heuristic) discarding...")
-                                p_discarding.heuristic_discard() # Assumes it handles its own resource reduction
+                                elif isinstance(p_discarding, heuristicAIPlayer):
+                                    if log.level <= INFO:
+                                        log.emit(INFO, 'MESSAGE', text=f"{p_discarding.name} (Heuristic) discarding...")
+                                    p_discarding.heuristic_discard() # Assumes it handles its own resource reduction
 
-                            p_discarding.pending_discard_count = 0
-                            self.boardView.displayGameScreen()
-                            pygame.time.delay(100) # Small delay after each player discards
-                    print("--- Card Discarding Phase Complete ---")
+                                p_discarding.pending_discard_count = 0
+                                self.refresh_view(100)
+                    if log.level <= INFO:
+                        log.emit(INFO, 'MESSAGE', text="--- Card Discarding Phase Complete ---")
 
 
                 # --- Robber Movement Phase (if a 7 was rolled and pending for currPlayer) ---
                 if self.player_to_move_robber == currPlayer: # currPlayer is the one who rolled the 7
-                    print(f"{currPlayer.name} must move the robber.")
-                    if isinstance(currPlayer, LLMPlayer):
-                        state_for_robber = modelState(self, currPlayer, robber_movement_is_mandatory=True)
-                        robber_action = self.get_llm_response_non_blocking(currPlayer, state_for_robber)
-                        print(f"{currPlayer.name} (Robber Thoughts: {currPlayer.thoughts}) -> Robber Action: {robber_action}")
-                        # ... (rest of robber execution logic from previous step, including fallback)
-                        executed_robber_move = False
-                        if robber_action.get("type") == "move_robber":
-                            hex_idx = robber_action.get("hex_index")
-                            player_name_to_rob = robber_action.get("player_to_rob_name")
-                            player_to_rob_object = None
-                            if player_name_to_rob: player_to_rob_object = self._get_player_by_name(player_name_to_rob)
-
-                            if hex_idx is not None:
-                                # The move_robber method now calls steal_resource, which returns the stolen resource or None
-                                outcome = currPlayer.move_robber(hex_idx, self.board, player_to_rob_object) # player.py's move_robber calls steal_resource
-                                if player_to_rob_object and outcome: # If a player was specified and steal_resource returned a stolen item
-                                    print(f"{currPlayer.name} moved robber to hex {hex_idx} and robbed {player_name_to_rob}.")
-                                    self.update_reputation(currPlayer.name, player_to_rob_object.name, -3)
-                                elif player_to_rob_object and not outcome:
-                                    print(f"{currPlayer.name} moved robber to hex {hex_idx}, attempted to rob {player_name_to_rob} but they had no resources.")
-                                else: # No player to rob or other outcome
-                                    print(f"{currPlayer.name} moved robber to hex {hex_idx}.")
-                                executed_robber_move = True
-                            else:
-                                current_turn_last_action_status = "error_missing_input" # For feedback if this action fails
-                                current_turn_last_action_error_details = "Missing hex_index for move_robber."
-
-
-                        if not executed_robber_move: # Fallback if LLM action was invalid or move failed
-                            print(f"{currPlayer.name} (LLM) failed to provide valid 'move_robber' action or it failed. Randomly placing.")
-                            # _execute_random_robber_move itself calls move_robber, which calls steal_resource.
-                            # So, reputation update for fallback will be handled inside _execute_random_robber_move.
-                            self._execute_random_robber_move(currPlayer)
-
-                    elif isinstance(currPlayer, heuristicAIPlayer):
-                        print(f"{currPlayer.name} (Heuristic) moving robber...")
-                        # Heuristic's choose_player_to_rob returns (hex_idx, player_to_rob_obj)
-                        # We need to capture that to update reputation.
-                        # This requires refactoring heuristic_move_robber or how it's called.
-                        # For now, let's assume heuristic_move_robber will internally call an update or we modify it later.
-                        # A simpler approach for now:
-                        original_robber_hex = self.board.robber_hex # Store before heuristic moves it
-                        player_robbed_by_heuristic = currPlayer.heuristic_move_robber(self.board) # Modify to return player_robbed
-                        if player_robbed_by_heuristic:
-                             self.update_reputation(currPlayer.name, player_robbed_by_heuristic.name, -3)
-
-
-                    self.player_to_move_robber = None # Reset flag
-                    self.boardView.displayGameScreen(); pygame.time.delay(300)
+                    with self.timers.phase('robber', currPlayer):
+                        if log.level <= INFO:
+                            log.emit(INFO, 'MESSAGE', text=f"{currPlayer.name} must move the robber.")
+                        if isinstance(currPlayer, LLMPlayer):
+                            state_for_robber = self.build_model_state(currPlayer, robber_movement_is_mandatory=True)
+                            robber_action = self.get_llm_response_non_blocking(currPlayer, state_for_robber)
+                            if log.level <= DEBUG:
+                                log.emit(DEBUG, 'LLM_ACTION', player=currPlayer.name, phase='robber', step=None, thoughts=currPlayer.thoughts, action=robber_action)
+                            # ... (rest of robber execution logic from previous step, including fallback)
+                            executed_robber_move = False
+                            if robber_action.get("type") == "move_robber":
+                                hex_idx = robber_action.get("hex_index")
+                                player_name_to_rob = robber_action.get("player_to_rob_name")
+                                player_to_rob_object = None
+                                if player_name_to_rob: player_to_rob_object = self._get_player_by_name(player_name_to_rob)
+
+                                if hex_idx is not None:
+                                    # The move_robber method now calls steal_resource, which returns the stolen resource or None
+                                    outcome = currPlayer.move_robber(hex_idx, self.board, player_to_rob_object) # player.py's move_robber calls steal_resource
+                                    if player_to_rob_object and outcome: # If a player was specified and steal_resource returned a stolen item
+                                        if log.level <= INFO:
+                                            log.emit(INFO, 'MESSAGE', text=f"{currPlayer.name} moved robber to hex {hex_idx} and robbed {player_name_to_rob}.")
+                                        self.update_reputation(currPlayer.name, player_to_rob_object.name, -3)
+                                    elif player_to_rob_object and not outcome:
+                                        if log.level <= INFO:
+                                            log.emit(INFO, 'MESSAGE', text=f"{currPlayer.name} moved robber to hex {hex_idx}, attempted to rob {player_name_to_rob} but they had no resources.")
+                                    else: # No player to rob or other outcome
+                                        if log.level <= INFO:
+                                            log.emit(INFO, 'MESSAGE', text=f"{currPlayer.name} moved robber to hex {hex_idx}.")
+                                    executed_robber_move = True
+                                else:
+                                    current_turn_last_action_status = "error_missing_input" # For feedback if this action fails
+                                    current_turn_last_action_error_details = "Missing hex_index for move_robber."
+
+
+                            if not executed_robber_move: # Fallback if LLM action was invalid or move failed
+                                if log.level <= INFO:
+                                    log.emit(INFO, 'MESSAGE', text=f"{currPlayer.name} (LLM) failed to provide valid 'move_robber' action or it failed. Randomly placing.")
+                                # _execute_random_robber_move itself calls move_robber, which calls steal_resource.
+                                # So, reputation update for fallback will be handled inside _execute_random_robber_move.
+                                self._execute_random_robber_move(currPlayer)
+
+                        elif isinstance(currPlayer, heuristicAIPlayer):
+                            if log.level <= INFO:
+                                log.emit(INFO, 'MESSAGE', text=f"{currPlayer.name} (Heuristic) moving robber...")
+                            # Heuristic's choose_player_to_rob returns (hex_idx, player_to_rob_obj)
+                            # We need to capture that to update reputation.
+                            # This requires refactoring heuristic_move_robber or how it's called.
+                            # For now, let's assume heuristic_move_robber will internally call an update or we modify it later.
+                            # A simpler approach for now:
+                            original_robber_hex = self.board.robber_hex # Store before heuristic moves it
+                            with self.timers.phase('ai_decision', currPlayer):
+                                player_robbed_by_heuristic = currPlayer.heuristic_move_robber(self.board) # Modify to return player_robbed
+                            if player_robbed_by_heuristic:
+                                 self.update_reputation(currPlayer.name, player_robbed_by_heuristic.name, -3)
+
+
+                        self.player_to_move_robber = None # Reset flag
+                        self.refresh_view(300)
 
                 # --- Main Turn Actions ---
                 if isinstance(currPlayer, LLMPlayer):
-                    print(f"{currPlayer.name} taking main turn actions...")
+                    if log.level <= INFO:
+                        log.emit(INFO, 'MESSAGE', text=f"{currPlayer.name} taking main turn actions...")
                     actions_this_turn = 0
                     max_actions_per_turn = 10 # Safety break for LLM action loop
+                    currPlayer.begin_turn_states()
 
                     while actions_this_turn < max_actions_per_turn:
                         actions_this_turn += 1
                         # Create modelState for the current action. It picks up feedback from the *previous action in this turn*
                         # or from mandatory actions (discard/robber) if this is the first action in the multi-action loop.
-                        state_for_current_action = modelState(self, currPlayer, private_chat_active=False, communication_phase_active=False)
+                        state_for_current_action = self.build_model_state(currPlayer, private_chat_active=False, communication_phase_active=False)
                         action = self.get_llm_response_non_blocking(currPlayer, state_for_current_action)
-                        print(f"{currPlayer.name} (Turn Action {actions_this_turn}, Thoughts: {currPlayer.thoughts}) -> Action: {action}")
+                        if log.level <= DEBUG:
+                            log.emit(DEBUG, 'LLM_ACTION', player=currPlayer.name, phase='turn', step=actions_this_turn, thoughts=currPlayer.thoughts, action=action)
 
                         action_type = action.get("type")
                         current_turn_last_action_status = "no_action_taken" # Default for this specific action
@@ -1147,7 +1282,8 @@ class catanAIGame():
                         if action_type == "end_turn":
                             current_turn_last_action_status = "success_end_turn"
                             current_turn_last_action_error_details = "Player chose to end their turn."
-                            print(f"{currPlayer.name} ends their turn after {actions_this_turn-1} action(s).")
+                            if log.level <= INFO:
+                                log.emit(INFO, 'MESSAGE', text=f"{currPlayer.name} ends their turn after {actions_this_turn-1} action(s).")
                             currPlayer.feedback_status_for_next_state = current_turn_last_action_status
                             currPlayer.feedback_details_for_next_state = current_turn_last_action_error_details
                             break # Exit the multi-action while loop for this player's turn
@@ -1155,7 +1291,8 @@ class catanAIGame():
                         elif action_type == "send_global_message":
                             message = action.get("message")
                             if message:
-                                print(f"[Global Chat | {currPlayer.name}]: {message}")
+                                if log.level <= INFO:
+                                    log.emit(INFO, 'CHAT', player=currPlayer.name, channel='global', to=None, text=message)
                                 self.global_chat_history.append({"player": currPlayer.name, "message": message})
                                 current_turn_last_action_status = "success"
                                 current_turn_last_action_error_details = "Global message sent."
@@ -1170,8 +1307,10 @@ class catanAIGame():
 
                             if recipient_player and isinstance(recipient_player, LLMPlayer) and recipient_player != currPlayer:
                                 if opening_message:
-                                    print(f"{currPlayer.name} is starting a private chat with {recipient_name}.")
-                                    self.handle_private_chat(currPlayer, recipient_player, opening_message)
+                                    if log.level <= INFO:
+                                        log.emit(INFO, 'MESSAGE', text=f"{currPlayer.name} is starting a private chat with {recipient_name}.")
+                                    with self.timers.phase('communication', currPlayer):
+                                        self.handle_private_chat(currPlayer, recipient_player, opening_message)
                                     current_turn_last_action_status = "success"
                                     current_turn_last_action_error_details = f"Private chat with {recipient_name} was conducted."
                                 else:
@@ -1192,7 +1331,8 @@ class catanAIGame():
                             deal_desc = action.get("deal_description")
                             if target_name and deal_desc:
                                 log_message = f"[Diplomacy | {currPlayer.name} to {target_name}]: Offers non-binding deal: \"{deal_desc}\"."
-                                print(log_message)
+                                if log.level <= INFO:
+                                    log.emit(INFO, 'CHAT', player=currPlayer.name, channel='diplomacy', to=target_name, text=log_message)
                                 self.global_chat_history.append({"player": currPlayer.name, "type": "diplomatic_offer", "target": target_name, "message": log_message})
                                 current_turn_last_action_status = "success_diplomatic_action_logged"
                                 current_turn_last_action_error_details = "Non-binding deal offer logged."
@@ -1205,7 +1345,8 @@ class catanAIGame():
                             reason = action.get("reasoning")
                             if target_name and reason:
                                 log_message = f"[Diplomacy | {currPlayer.name}]: Proposes an embargo against {target_name}. Reason: \"{reason}\"."
-                                print(log_message)
+                                if log.level <= INFO:
+                                    log.emit(INFO, 'CHAT', player=currPlayer.name, channel='diplomacy', to=target_name, text=log_message)
                                 self.global_chat_history.append({"player": currPlayer.name, "type": "diplomatic_embargo_request", "target": target_name, "message": log_message})
                                 current_turn_last_action_status = "success_diplomatic_action_logged"
                                 current_turn_last_action_error_details = "Embargo request logged."
@@ -1217,7 +1358,8 @@ class catanAIGame():
                             info = action.get("information")
                             if info:
                                 log_message = f"[Diplomacy | {currPlayer.name}]: Shares information: \"{info}\"."
-                                print(log_message)
+                                if log.level <= INFO:
+                                    log.emit(INFO, 'CHAT', player=currPlayer.name, channel='diplomacy', to=None, text=log_message)
                                 self.global_chat_history.append({"player": currPlayer.name, "type": "diplomatic_info_share", "message": log_message})
                                 current_turn_last_action_status = "success_diplomatic_action_logged"
                                 current_turn_last_action_error_details = "Information shared and logged."
@@ -1238,15 +1380,14 @@ class catanAIGame():
                                 current_turn_last_action_status = "error_insufficient_resources"
                                 current_turn_last_action_error_details = f"Cannot build road: Insufficient resources. You have {currPlayer.resources}, need {required_resources}. Missing: {', '.join(missing_res_list)}."
                             else:
-                                v1_coord, v2_coord = self.board.vertex_index_to_pixel_dict.get(v1_idx), self.board.vertex_index_to_pixel_dict.get(v2_idx)
-                                if not v1_coord or not v2_coord:
+                                if v1_idx not in self.board.boardGraph or v2_idx not in self.board.boardGraph:
                                     current_turn_last_action_status = "error_invalid_input"
                                     current_turn_last_action_error_details = f"Invalid vertex indices for build_road: {v1_idx}, {v2_idx}. They do not exist on board."
                                 # Check if chosen road is in available_actions from the state the LLM used
                                 elif tuple(sorted((v1_idx, v2_idx))) not in state_for_current_action.available_actions.get("build_road", []):
                                     current_turn_last_action_status = "error_invalid_placement"
                                     current_turn_last_action_error_details = f"Road from {v1_idx} to {v2_idx} is not a valid placement according to available_actions. Valid roads: {state_for_current_action.available_actions.get('build_road', [])}."
-                                elif currPlayer.build_road(v1_coord, v2_coord, self.board): # player.build_road also checks resources again
+                                elif currPlayer.build_road(v1_idx, v2_idx, self.board): # player.build_road also checks resources again
                                     self.gameLogic.check_longest_road(currPlayer) # Use GameLogicManager
                                     current_turn_last_action_status = "success"
                                     current_turn_last_action_error_details = f"Successfully built road from {v1_idx} to {v2_idx}."
@@ -1267,14 +1408,13 @@ class catanAIGame():
                                 current_turn_last_action_status = "error_insufficient_resources"
                                 current_turn_last_action_error_details = f"Cannot build settlement: Insufficient resources. You have {currPlayer.resources}, need {required_resources}. Missing: {', '.join(missing_res_list)}."
                             else:
-                                v_coord = self.board.vertex_index_to_pixel_dict.get(v_idx)
-                                if not v_coord:
+                                if v_idx not in self.board.boardGraph:
                                     current_turn_last_action_status = "error_invalid_input"
                                     current_turn_last_action_error_details = f"Invalid vertex index for build_settlement: {v_idx}. Does not exist on board."
                                 elif v_idx not in state_for_current_action.available_actions.get("build_settlement", []):
                                     current_turn_last_action_status = "error_invalid_placement"
                                     current_turn_last_action_error_details = f"Settlement at {v_idx} is not a valid placement. Valid locations: {state_for_current_action.available_actions.get('build_settlement', [])}."
-                                elif currPlayer.build_settlement(v_coord, self.board):
+                                elif currPlayer.build_settlement(v_idx, self.board):
                                     current_turn_last_action_status = "success"
                                     current_turn_last_action_error_details = f"Successfully built settlement at {v_idx}."
                                 else:
@@ -1294,14 +1434,13 @@ class catanAIGame():
                                 current_turn_last_action_status = "error_insufficient_resources"
                                 current_turn_last_action_error_details = f"Cannot build city: Insufficient resources. You have {currPlayer.resources}, need {required_resources}. Missing: {', '.join(missing_res_list)}."
                             else:
-                                v_coord = self.board.vertex_index_to_pixel_dict.get(v_idx)
-                                if not v_coord:
+                                if v_idx not in self.board.boardGraph:
                                     current_turn_last_action_status = "error_invalid_input"
                                     current_turn_last_action_error_details = f"Invalid vertex index for build_city: {v_idx}. Does not exist on board."
                                 elif v_idx not in state_for_current_action.available_actions.get("build_city", []):
                                     current_turn_last_action_status = "error_invalid_placement"
                                     current_turn_last_action_error_details = f"City at {v_idx} is not a valid placement (must be on existing settlement). Valid locations: {state_for_current_action.available_actions.get('build_city', [])}."
-                                elif currPlayer.build_city(v_coord, self.board): # Assumes player.build_city checks if it's a settlement of the player
+                                elif currPlayer.build_city(v_idx, self.board): # Assumes player.build_city checks if it's a settlement of the player
                                     current_turn_last_action_status = "success"
                                     current_turn_last_action_error_details = f"Successfully built city at {v_idx}."
                                 else:
@@ -1358,7 +1497,8 @@ class catanAIGame():
                                 current_turn_last_action_status = "error_missing_input"
                                 current_turn_last_action_error_details = f"Invalid propose_trade: Missing partner_player_name, resources_offered, or resources_requested. Got: partner='{partner_name}', offered='{offered}', requested='{requested}'"
                             else:
-                                print(f"{currPlayer.name} proposes a trade with {partner_name}. Offering: {offered}, Requesting: {requested}.")
+                                if log.level <= INFO:
+                                    log.emit(INFO, 'MESSAGE', text=f"{currPlayer.name} proposes a trade with {partner_name}. Offering: {offered}, Requesting: {requested}.")
                                 target_player = self._get_player_by_name(partner_name)
                                 if not target_player:
                                     current_turn_last_action_status = "error_invalid_target"
@@ -1373,13 +1513,15 @@ class catanAIGame():
                                     current_turn_last_action_error_details = f"Cannot propose trade: You don't have the resources you're offering. Missing: {', '.join(missing_offered_res)}."
                                 else:
                                     if isinstance(target_player, LLMPlayer):
-                                        print(f"Prompting {target_player.name} to respond to the trade offer...")
+                                        if log.level <= INFO:
+                                            log.emit(INFO, 'MESSAGE', text=f"Prompting {target_player.name} to respond to the trade offer...")
                                         # Feedback for the target_player will be handled by their own modelState generation
                                         # when they are prompted for the trade_response_action.
                                         # So, no direct feedback setting here for target_player from proposer's action.
 
                                         # --- START OF NEGOTIATION INITIATION using NegotiationManager ---
-                                        print(f"Initiating negotiation between {currPlayer.name} and {target_player.name} using NegotiationManager.")
+                                        if log.level <= INFO:
+                                            log.emit(INFO, 'MESSAGE', text=f"Initiating negotiation between {currPlayer.name} and {target_player.name} using NegotiationManager.")
                                         self.current_negotiation = NegotiationManager(game_turn_started=numTurns)
                                         initial_offer_details_nm = {
                                             "from_player": currPlayer.name,
@@ -1392,7 +1534,8 @@ class catanAIGame():
                                         if self.current_negotiation.start_negotiation(currPlayer, target_player, initial_offer_details_nm, game_turn=numTurns):
                                             # --- CALL REFACTORED HANDLE_NEGOTIATION ---
                                             # The handle_negotiation now uses self.current_negotiation
-                                            trade_was_successful = self.handle_negotiation(currPlayer, target_player, numTurns) # Pass current turn
+                                            with self.timers.phase('negotiation', currPlayer):
+                                                trade_was_successful = self.handle_negotiation(currPlayer, target_player, numTurns) # Pass current turn
 
                                             if trade_was_successful:
                                                 current_turn_last_action_status = "success_negotiation_trade_accepted"
@@ -1412,7 +1555,8 @@ class catanAIGame():
                                             self.current_negotiation = None # Clear if start failed
 
                                     elif isinstance(target_player, heuristicAIPlayer):
-                                        print(f"Heuristic AI {target_player.name} automatically rejects trade with {currPlayer.name} for now.")
+                                        if log.level <= INFO:
+                                            log.emit(INFO, 'MESSAGE', text=f"Heuristic AI {target_player.name} automatically rejects trade with {currPlayer.name} for now.")
                                         current_turn_last_action_status = "info_trade_rejected_heuristic"
                                         current_turn_last_action_error_details = f"Trade with Heuristic AI {target_player.name} was automatically rejected."
                                     else:
@@ -1424,7 +1568,8 @@ class catanAIGame():
                             if currPlayer.devCards.get("KNIGHT", 0) > 0:
                                 # currPlayer.playKnightCard(self.board) # This method needs to exist and handle robber movement prompt
                                 # For now, just acknowledge and set placeholder feedback
-                                print(f"{currPlayer.name} wants to play a KNIGHT card.")
+                                if log.level <= INFO:
+                                    log.emit(INFO, 'MESSAGE', text=f"{currPlayer.name} wants to play a KNIGHT card.")
                                 current_turn_last_action_status = "info_knight_played_concept" # Placeholder
                                 current_turn_last_action_error_details = "Knight card play initiated (robber movement part not fully detailed here for LLM feedback yet)."
                                 # This is a simplification. Full implementation of play_knight_card is complex.
@@ -1444,7 +1589,8 @@ class catanAIGame():
                         else: # Handles unknown actions
                             current_turn_last_action_status = "error_unknown_action"
                             current_turn_last_action_error_details = f"Unknown or unsupported main action type: '{action_type}'. Action ignored."
-                            print(f"Unknown or unsupported main action type: {action_type} for {currPlayer.name}. Action ignored, player can try another action or end turn.")
+                            if log.level <= INFO:
+                                log.emit(INFO, 'MESSAGE', text=f"Unknown or unsupported main action type: {action_type} for {currPlayer.name}. Action ignored, player can try another action or end turn.")
 
                         # Store feedback for the LLM player's next modelState generation (within this turn's loop)
                         # This feedback is for the *next action decision* by the LLM in the same turn.
@@ -1464,24 +1610,91 @@ class catanAIGame():
                         currPlayer.add_memory_entry(memory_entry)
 
                         # Print the feedback that will be available for the next state
-                        print(f"Feedback for {currPlayer.name}'s next state: Status='{currPlayer.feedback_status_for_next_state}', Details='{currPlayer.feedback_details_for_next_state}'")
+                        if log.level <= DEBUG:
+                            log.emit(DEBUG, 'MESSAGE', text=f"Feedback for {currPlayer.name}'s next state: Status='{currPlayer.feedback_status_for_next_state}', Details='{currPlayer.feedback_details_for_next_state}'")
                         # print(f"Memory for {currPlayer.name}: {currPlayer.memory}") # Optional: for debugging
+                    currPlayer.end_turn_states()
 
                 elif isinstance(currPlayer, heuristicAIPlayer):
-                    print(f"{currPlayer.name} (Heuristic) is making moves...")
-                    currPlayer.move(self.board) # Heuristic AI makes all its moves in one go.
+                    if log.level <= INFO:
+                        log.emit(INFO, 'MESSAGE', text=f"{currPlayer.name} (Heuristic) is making moves...")
+                    with self.timers.phase('ai_decision', currPlayer):
+                        currPlayer.move(self.board) # Heuristic AI makes all its moves in one go.
 
                     # Check for game conditions after heuristic player's move
                     self.gameLogic.check_longest_road(currPlayer)
                     self.gameLogic.check_largest_army(currPlayer) # Assuming heuristic might play knights
 
                 # ... (common turn finalization, victory check, etc. as before) ...
-                print(f"Player:{currPlayer.name}, Resources:{currPlayer.resources}, Points: {currPlayer.victoryPoints}")
-                self.boardView.displayGameScreen()
-                if not self.gameOver : pygame.time.delay(300)
+                self.timers.record('turn', currPlayer, time.perf_counter() - turnStartTime)
+                if log.level <= INFO:
+                    log.emit(INFO, 'TURN_END', player=currPlayer.name, resources=dict(currPlayer.resources), points=currPlayer.victoryPoints)
+                self.refresh_view(0 if self.gameOver else 300)
                 if currPlayer.victoryPoints >= self.maxPoints: self.gameOver = True; break
+                if self.maxTurns is not None and numTurns >= self.maxTurns: # Turn cap reached - game ends without a winner
+                    if log.level <= INFO:
+                        log.emit(INFO, 'TURN_LIMIT', maxTurns=self.maxTurns)
+                    self.gameOver = True; break
             if self.gameOver: break
+
+    #Function to get the outcome of a finished game
+    def get_result(self):
+        players = list(self.playerQueue.queue)
+        winner = next((p.name for p in players if p.victoryPoints >= self.maxPoints), None)
+        return {
+            "winner": winner, # None if the turn limit was reached first
+            "victory_points": {p.name: p.victoryPoints for p in players},
+            "turns": self.numTurns,
+            "dice_histogram": dict(self.diceStats),
+        }
+
+
+#Function to play a complete game without GUI, delays or prompts and return its result
+#roster: list of player types in seat order, seed: seed of the game, maxTurns: cap on player turns
+#verbose=False turns the event log off, so no game events are built at all - LLM diagnostics that still print are discarded
+#recordPath: optional game record file the game is appended to, see gameRecord.py
+#timers: optional PhaseTimers to time the game's phases into - untimed by default
+#stateDeltas: send LLM players diffs of the game state after the first decision of a turn
+def simulate(roster=('heuristic',)*4, seed=None, maxTurns=1000, verbose=False, recordPath=None, timers=None, stateDeltas=False):
+    with contextlib.ExitStack() as stack:
+        sinks = [ConsoleSink()] if verbose else []
+        if recordPath is not None:
+            sinks.append(GameRecordSink(recordPath))
+        stack.enter_context(log.configured(level=DEBUG if verbose else INFO if sinks else OFF, sinks=sinks))
+        if not verbose:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+        game = catanAIGame(headless=True, roster=list(roster), seed=seed, maxTurns=maxTurns,
+                           timers=timers if timers is not None else PhaseTimers(enabled=False), stateDeltas=stateDeltas)
+    return game.get_result()
                                    
 # Initialize new game and run
 if __name__ == "__main__":
-    newGame_AI = catanAIGame()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Settlers of Catan with AI players")
+    parser.add_argument("--headless", action="store_true", help="Run without the pygame view")
+    parser.add_argument("--roster", nargs="+", help="Player types in seat order, e.g. heuristic heuristic heuristic")
+    parser.add_argument("--games", type=int, default=1, help="Number of headless games to simulate with --roster")
+    parser.add_argument("--seed", type=int, help="Seed of the first game, later games use seed+1, seed+2, ...")
+    parser.add_argument("--max-turns", type=int, default=1000, help="Cap on player turns per simulated game")
+    parser.add_argument("--record", help="Game record file to append the simulated games to")
+    parser.add_argument("--state-deltas", action="store_true", help="Send LLM players only what changed in the game state after the first decision of a turn")
+    parser.add_argument("--timings", help="JSON file to export the phase latencies to at the end - the table is printed too")
+    args = parser.parse_args()
+
+    #Phase latencies of all games, printed to stderr at any point with: kill -USR1 <pid>
+    timers = PhaseTimers()
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, lambda signalNumber, frame: timers.print_summary(sys.stderr))
+
+    if args.headless and args.roster:
+        startTime = time.perf_counter()
+        for gameIndex in range(args.games):
+            seed = None if args.seed is None else args.seed + gameIndex
+            print(simulate(args.roster, seed=seed, maxTurns=args.max_turns, recordPath=args.record, timers=timers if args.timings else None, stateDeltas=args.state_deltas))
+        elapsed = time.perf_counter() - startTime
+        print("{} games in {:.2f}s ({:.1f} games/s)".format(args.games, elapsed, args.games/elapsed))
+    else:
+        newGame_AI = catanAIGame(headless=args.headless, roster=args.roster, seed=args.seed, timers=timers, stateDeltas=args.state_deltas)
+
+    if args.timings:
+        timers.print_summary()
+        timers.export(args.timings)
\ No newline at end of file
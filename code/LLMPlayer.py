@@ -2,11 +2,15 @@ import os
 import json
 import re # For stripping markdown
 from player import player
-from google import genai
+from eventLog import log, DEBUG, WARNING
+from stateDelta import StateDeltaEncoder
+from promptStats import PromptStats
+from modelState import MODEL_STATE_FIELDS, STATIC_BOARD_FIELDS
+#google.genai is imported on first Gemini call so headless games don't pay for the SDK import
 
 
 class LLMPlayer(player):
-    def __init__(self, playerName, playerColor, llm_type, persona=None): # Added persona
+    def __init__(self, playerName, playerColor, llm_type, persona=None, state_deltas=False): # Added persona
         super().__init__(playerName, playerColor)
         self.llm_type = llm_type
         self.thoughts = ""
@@ -16,6 +20,20 @@ class LLMPlayer(player):
         self.memory = [] # Added memory attribute
         self.persona = persona # Added persona attribute
         self.max_memory_entries = 5 # Max recent memories to include in prompt
+        # With state_deltas, each prompt of a turn carries the state at the start of the turn right after the prompt prefix,
+        # byte-identical for the whole turn, and only what changed since then at the end (see stateDelta.py)
+        self.state_deltas = StateDeltaEncoder() if state_deltas else None
+        self.prompt_stats = PromptStats() # Prompt prefix/suffix sizes and prefix hits, see promptStats.py
+        self._prompt_prefix = None # (static board, prefix) - the prefix is rebuilt only for another board
+
+    def begin_turn_states(self):
+        """Starts the turn's state diffs - the next state is the base the turn's later prompts diff against."""
+        if self.state_deltas is not None:
+            self.state_deltas.begin_turn()
+
+    def end_turn_states(self):
+        if self.state_deltas is not None:
+            self.state_deltas.end_turn()
 
     def add_memory_entry(self, entry_summary: str):
         """Adds a new memory entry and keeps the list to a maximum size."""
@@ -31,7 +49,26 @@ class LLMPlayer(player):
         return text_response # Return original if no markdown wrapper
 
     def _construct_prompt(self, game_state_obj):
-        game_state_json = game_state_obj.to_json() # Serialize here for the prompt content
+        # Serialize here for the prompt content, without whitespace the LLM doesn't need
+        # The fixed board facts are in the prompt prefix, so they are left out here
+        if self.state_deltas is not None:
+            base_state_json, state_delta_json = self.state_deltas.encode(game_state_obj, static_board=False)
+        else:
+            base_state_json, state_delta_json = game_state_obj.to_json(compact=True, static_board=False), None
+        turn_state_section = ""
+        if self.state_deltas is not None and self.state_deltas.active:
+            # Stable for the rest of the turn (until the encoder rebases), so it extends the cacheable prompt prefix
+            turn_state_section = ("\n--- YOUR TURN ---\n"
+                                  "Here is the game state at the start of your turn. Each decision below says what changed since: "
+                                  "'resources' has new card counts, 'new_pieces' the pieces built (a city replaces the settlement on its vertex), "
+                                  "'players', 'board' and 'changed' the new values of other fields, "
+                                  "and 'feedback' the outcome of your last action.\n" + base_state_json + "\n")
+            if state_delta_json is None:
+                game_state_section = "The game state is the one given at the start of your turn, unchanged."
+            else:
+                game_state_section = "Here is what changed in the game state since the start of your turn:\n" + state_delta_json
+        else:
+            game_state_section = "Here is the current game state:\n" + base_state_json
 
         previous_action_feedback = ""
         if hasattr(game_state_obj, 'last_action_status') and game_state_obj.last_action_status:
@@ -217,13 +254,36 @@ class LLMPlayer(player):
 
 
 
-        # --- Memory and Persona Section ---
+        # --- Memory Section ---
         memory_prompt_section = ""
         if self.memory:
             # self.memory already contains the last N entries due to add_memory_entry logic
             recent_memories_str = "\n".join([f"- {mem}" for mem in self.memory])
             memory_prompt_section = f"Your Recent History (last {len(self.memory)} actions/events):\n{recent_memories_str}\n\n"
 
+        # The prompt is a prefix that stays byte-identical for the whole game, so providers can serve it from their
+        # prompt cache, and a suffix with everything that changes from call to call
+        prompt_prefix = self._get_prompt_prefix(game_state_obj)
+        prompt_suffix = f"""
+--- CURRENT DECISION ---
+{game_state_section}
+
+{memory_prompt_section}{previous_action_feedback}{communication_instructions}{private_chat_instructions}{negotiation_instructions_text}{instructions}
+{possible_actions}
+{example_str}
+Ensure your entire response is a single valid JSON object.
+"""
+        self.prompt_stats.add(prompt_prefix + turn_state_section, prompt_suffix)
+        return prompt_prefix + turn_state_section + prompt_suffix
+
+    def _get_prompt_prefix(self, game_state_obj):
+        """
+        Returns the part of the prompt that is the same for every call of a game: rules, response format,
+        game state fields, persona and the fixed board facts. Built once per board.
+        """
+        if self._prompt_prefix is not None and self._prompt_prefix[0] is game_state_obj.static_board:
+            return self._prompt_prefix[1]
+
         persona_prompt_section = ""
         if self.persona:
             persona_guidance = {
@@ -238,28 +298,29 @@ class LLMPlayer(player):
             else: # Generic if persona string is custom/unknown but provided
                 persona_prompt_section = f"Your guiding persona is: '{self.persona}'. Let this influence your decisions and play style.\n\n"
 
-        return f"""
+        static_board_json = json.dumps({field: game_state_obj.static_board[field] for field in STATIC_BOARD_FIELDS}, separators=(',', ':'))
+        prompt_prefix = f"""
 You are an expert Settlers of Catan player.
-{persona_prompt_section}Here is the current game state:
-{game_state_json}
-
-{memory_prompt_section}{previous_action_feedback}
---- CRITICAL INSTRUCTIONS ---
+{persona_prompt_section}--- CRITICAL INSTRUCTIONS ---
 1. Your response MUST be a single valid JSON object that conforms to the required schema.
 2. The "action" you choose MUST be a valid move based on the "available_actions" provided in the game state.
 3. For any building action (settlement, road, city), the vertex or edge indices you provide in your action (e.g., "vertex_index") MUST be one of the integers or pairs listed in the corresponding array in "available_actions".
 4. DO NOT choose an index that is not explicitly listed in "available_actions" for the action type you are performing. Your primary guide for valid moves is the "available_actions" section.
 
-{communication_instructions}{private_chat_instructions}{negotiation_instructions_text}{instructions}
-{possible_actions}
 Refer to the 'available_actions' section within the game state JSON to see currently valid locations for building (if applicable to current phase).
 The 'action_costs' section lists the resource costs for standard building actions (if applicable).
 The 'current_player_bank_trade_ratios' section details your current exchange rates with the bank, including any port benefits. Use this when considering a 'trade_with_bank' action (if applicable).
 Provide your reasoning in a 'thoughts' field, your strategic goals for the next 2-3 turns in a 'long_term_plan' field (e.g., 'Secure ore access, build a city, then aim for longest road'), a 'turn_plan' field listing the sequence of actions you intend for this turn (e.g., ["propose_trade", "build_road", "end_turn"]), and the chosen action in an 'action' field in JSON format. The 'action' field should correspond to the *first applicable action* from your 'turn_plan'.
 When communicating (global or private chat), you must base any statement about your resources or game state strictly on the information provided in the JSON. Do not hallucinate or misrepresent your hand.
-{example_str}
-Ensure your entire response is a single valid JSON object.
+
+The game state JSON has these fields: {", ".join(MODEL_STATE_FIELDS)}.
+
+--- BOARD (fixed for the whole game) ---
+Hex resources, roll numbers and probability dots, ports and choke points. The game state's 'board' only has what changes: hex control, the robber and the best open settlement spots.
+{static_board_json}
 """
+        self._prompt_prefix = (game_state_obj.static_board, prompt_prefix)
+        return prompt_prefix
 
     def get_llm_move(self, game_state): # game_state is an instance of modelState
         # Pass the game_state object directly to _construct_prompt
@@ -294,8 +355,7 @@ Ensure your entire response is a single valid JSON object.
                     available_cards_flat = []
                     for resource, count in my_resources_dict.items():
                         available_cards_flat.extend([resource] * count)
-                    import random
-                    random.shuffle(available_cards_flat)
+                    self.rng.shuffle(available_cards_flat)
                     cards_chosen_for_discard = available_cards_flat[:num_to_discard]
                     for card in cards_chosen_for_discard:
                         resources_to_discard_placeholder[card] = resources_to_discard_placeholder.get(card, 0) + 1
@@ -306,21 +366,26 @@ Ensure your entire response is a single valid JSON object.
                 api_key = os.environ.get("GEMINI_API_KEY")
                 if not api_key:
                     self.thoughts = "Gemini API Key not found. Please set GEMINI_API_KEY."
-                    print(f"ERROR FOR {self.name}: {self.thoughts}")
+                    if log.level <= WARNING:
+                        log.emit(WARNING, 'LLM_ERROR', player=self.name, error=self.thoughts)
                     llm_response_json_str = json.dumps({"thoughts": self.thoughts, "long_term_plan": "Error handling.", "turn_plan": ["end_turn"], "action": {"type": "end_turn"}})
                 else:
                     if not self.gemini_client:
                         try:
+                            from google import genai
                             self.gemini_client = genai.Client(api_key=api_key)
-                            print(f"Gemini client initialized for {self.name}")
+                            if log.level <= DEBUG:
+                                log.emit(DEBUG, 'LLM_CALL', player=self.name, stage='client')
                         except Exception as e:
                             self.thoughts = f"Failed to initialize Gemini client: {e}"
-                            print(f"ERROR FOR {self.name}: {self.thoughts}")
+                            if log.level <= WARNING:
+                                log.emit(WARNING, 'LLM_ERROR', player=self.name, error=self.thoughts)
                             llm_response_json_str = json.dumps({"thoughts": self.thoughts, "long_term_plan": "Error handling.", "turn_plan": ["end_turn"], "action": {"type": "end_turn"}})
                             self.gemini_client = None
 
                     if self.gemini_client:
-                        print(f"Attempting Gemini API call for {self.name} using genai.Client pattern...")
+                        if log.level <= DEBUG:
+                            log.emit(DEBUG, 'LLM_CALL', player=self.name, stage='request')
                         try:
                             current_gemini_model_name = "gemini-2.5-flash" # User specified, ensure this model exists or use "gemini-1.5-flash-latest" / "gemini-1.5-pro-latest"
                             response = self.gemini_client.models.generate_content(
@@ -385,10 +450,12 @@ Ensure your entire response is a single valid JSON object.
                             raw_llm_response_text_for_thoughts = response.text
                             llm_response_json_str = self._strip_markdown_json(raw_llm_response_text_for_thoughts)
                             self.thoughts = f"Gemini ({self.name}) response: {llm_response_json_str[:200]}..." # Truncate for print
-                            print(f"SUCCESS: Gemini API call for {self.name} completed using genai.Client.")
+                            if log.level <= DEBUG:
+                                log.emit(DEBUG, 'LLM_CALL', player=self.name, stage='response')
                         except Exception as e:
                             self.thoughts = f"Error during Gemini API call for {self.name} (genai.Client): {e}"
-                            print(f"ERROR FOR {self.name}: {self.thoughts}")
+                            if log.level <= WARNING:
+                                log.emit(WARNING, 'LLM_ERROR', player=self.name, error=self.thoughts)
                             llm_response_json_str = json.dumps({"thoughts": self.thoughts, "long_term_plan": "Error handling.", "turn_plan": ["end_turn"], "action": {"type": "end_turn"}})
 
             elif self.llm_type == 'chatgpt':
@@ -408,7 +475,8 @@ Ensure your entire response is a single valid JSON object.
             if llm_response_json_str is None:
                 # This case should ideally be caught by the API key / client init checks for Gemini,
                 # or by placeholder logic for other LLMs.
-                print(f"CRITICAL ERROR: llm_response_json_str is None for {self.name} before parsing. This indicates a failure in prior LLM call or placeholder logic.")
+                if log.level <= WARNING:
+                    log.emit(WARNING, 'LLM_ERROR', player=self.name, error="llm_response_json_str is None before parsing. This indicates a failure in prior LLM call or placeholder logic.")
                 self.thoughts = "Internal error: No response string generated by LLM or placeholder."
                 # Return a minimal valid JSON structure to avoid crashing AIGame.py further down the line
                 return {"type": "end_turn"}
@@ -423,7 +491,8 @@ Ensure your entire response is a single valid JSON object.
             raw_content_for_debug = raw_llm_response_text_for_thoughts if self.llm_type == 'gemini' and raw_llm_response_text_for_thoughts else llm_response_json_str
 
             self.thoughts = f"JSON Decode Error: Failed to decode. Raw content: '{raw_content_for_debug}'"
-            print(f"{error_message} Raw content for {self.name}: '{raw_content_for_debug}'")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'LLM_ERROR', player=self.name, error=f"{error_message} Raw content: '{raw_content_for_debug}'")
             return {"type": "end_turn"}
 
 if __name__ == '__main__':
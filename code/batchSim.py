@@ -0,0 +1,147 @@
+#Settlers of Catan
+#Vectorized resource production for many games in lockstep
+
+import numpy as np
+from boardGenerator import RESOURCE_TYPES
+from gameRNG import GameRNG, DICE_BLOCK_SIZE
+
+#Resource order of the last tensor axis - same order as player.resources
+RESOURCES = RESOURCE_TYPES[1:]
+ROLLS = tuple(range(2, 13)) #Roll numbers, axis 1 of the production tensor holds roll - 2
+
+
+#Function to draw the dice of numRolls turns for each game, shape (numGames, numRolls, 2)
+#Game i reads the dice stream of GameRNG(seeds[i]) block by block, exactly like GameLogicManager.roll_dice
+#does for a board created with seed=seeds[i]
+def draw_dice(seeds, numRolls):
+    numBlocks = -(-numRolls // DICE_BLOCK_SIZE)
+    dice = np.empty((len(seeds), numRolls, 2), dtype=np.int8)
+    for gameIndex, seed in enumerate(seeds):
+        gameRNG = GameRNG(seed)
+        dice[gameIndex] = np.concatenate([gameRNG.next_dice_block() for block in range(numBlocks)])[:numRolls]
+    return dice
+
+
+#Class to hold the production of N games as tensors
+#hexProduction[n, h, p, r] - amount of resource r player p collects when hex h of game n is rolled
+#production[n, roll-2, p, r] - the same summed per roll number, with the robbed hex masked out
+class BatchProduction():
+    'Production of N games as a (games x 11 rolls x players x 5 resources) tensor'
+
+    def __init__(self, boards, playerLists):
+        numGames, numHexes = len(boards), boards[0].topology.num_hexes
+        numPlayers = max(len(players) for players in playerLists)
+
+        self.hexProduction = np.zeros((numGames, numHexes, numPlayers, len(RESOURCES)), dtype=np.int16)
+        self.hexRollOneHot = np.zeros((numGames, numHexes, len(ROLLS)), dtype=np.int16) #Roll number of each hex, desert all zero
+        self.robberHex = np.empty(numGames, dtype=np.intp)
+
+        #Copy the per hex buildings out of each board's production table
+        for gameIndex, (board, players) in enumerate(zip(boards, playerLists)):
+            table = board.production
+            for hexIndex in range(numHexes):
+                if table.hexRoll[hexIndex] is None:
+                    continue
+                self.hexRollOneHot[gameIndex, hexIndex, table.hexRoll[hexIndex] - 2] = 1
+                resourceIndex = RESOURCES.index(table.hexResource[hexIndex])
+                for seat, player_i in enumerate(players):
+                    self.hexProduction[gameIndex, hexIndex, seat, resourceIndex] = table.hexBuildings[hexIndex].get(player_i, 0)
+            self.robberHex[gameIndex] = board.robber_hex
+
+        self.update_production()
+
+        return None
+
+
+    #Function to rebuild the per roll tensor from the per hex production and robber positions
+    def update_production(self):
+        notRobbed = np.ones(self.hexProduction.shape[:2], dtype=np.int16)
+        notRobbed[np.arange(len(notRobbed)), self.robberHex] = 0
+        self.production = np.einsum('nhk,nh,nhpr->nkpr', self.hexRollOneHot, notRobbed, self.hexProduction)
+
+
+    #Function to move the robber of every game, robberHex is an array of hex indices
+    def move_robber(self, robberHex):
+        self.robberHex = np.asarray(robberHex, dtype=np.intp)
+        self.update_production()
+
+
+    #Function to get the payouts of one roll per game, shape (games, players, resources)
+    #A 7 pays nothing - the robber is handled by the game loop
+    def get_payouts(self, rolls):
+        rolls = np.asarray(rolls)
+        payouts = self.production[np.arange(len(rolls)), np.clip(rolls, 2, 12) - 2]
+        payouts[rolls == 7] = 0
+        return payouts
+
+
+    #Function to roll one turn of dice for every game and distribute the resources
+    #dice: (games, 2) array, resources: (games, players, resources) array updated in place
+    def step(self, dice, resources):
+        rolls = dice.sum(axis=1)
+        resources += self.get_payouts(rolls)
+        return rolls
+
+
+    #Function to get the total production of a fixed board over many rolls at once
+    #dice: (games, rolls, 2) array as from draw_dice - returns (games, players, resources)
+    def total_production(self, dice):
+        rolls = dice.sum(axis=2, dtype=np.intp)
+        rollCounts = np.zeros((len(rolls), len(ROLLS) + 2), dtype=np.int64)
+        np.add.at(rollCounts, (np.arange(len(rolls))[:, None], rolls), 1)
+        rollCounts[:, 7] = 0
+        return np.einsum('nk,nkpr->npr', rollCounts[:, 2:13], self.production)
+
+
+if __name__ == '__main__':
+    import contextlib, io, time
+    from board import catanBoard
+    from player import player
+    from gamelogic import GameLogicManager
+
+    numGames, numPlayers, numRolls = 200, 4, 300
+    seeds = list(range(numGames))
+
+    #Set up boards with random settlements, a city each and a moved robber
+    boards, playerLists = [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for seed in seeds:
+            setupRng = np.random.RandomState(seed + 100000)
+            board = catanBoard(seed=seed)
+            players = [player('Player{}'.format(i), 'black') for i in range(numPlayers)]
+            for player_i in players + players[::-1]:
+                v = setupRng.choice(list(board.get_setup_settlements(player_i)))
+                player_i.buildGraph['SETTLEMENTS'].append(int(v))
+                board.updateBoardGraph_settlement(int(v), player_i)
+            for player_i in players:
+                v = player_i.buildGraph['SETTLEMENTS'][0]
+                player_i.buildGraph['CITIES'].append(v)
+                board.updateBoardGraph_city(v, player_i)
+            board.updateBoardGraph_robber(int(setupRng.randint(0, 19)))
+            boards.append(board)
+            playerLists.append(players)
+
+    batch = BatchProduction(boards, playerLists)
+
+    #Vectorized - every game rolls and collects in lockstep
+    startTime = time.perf_counter()
+    dice = draw_dice(seeds, numRolls)
+    batchResources = np.zeros(batch.production.shape[0:1] + batch.production.shape[2:], dtype=np.int64)
+    for turn in range(numRolls):
+        batch.step(dice[:, turn], batchResources)
+    print("Batch: {} games x {} rolls in {:.3f}s".format(numGames, numRolls, time.perf_counter() - startTime))
+
+    #Reference - GameLogicManager one game at a time with the same seeds
+    startTime = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for board, players, seed in zip(boards, playerLists, seeds):
+            gameLogic = GameLogicManager(board, lambda: players)
+            for turn in range(numRolls):
+                diceRoll = gameLogic.roll_dice()
+                if diceRoll != 7:
+                    gameLogic.distribute_resources(diceRoll)
+    print("Sequential: {} games x {} rolls in {:.3f}s".format(numGames, numRolls, time.perf_counter() - startTime))
+
+    sequentialResources = np.array([[[player_i.resources[r] for r in RESOURCES] for player_i in players] for players in playerLists])
+    print("Batch matches GameLogicManager:", np.array_equal(batchResources, sequentialResources))
+    print("Totals match:", np.array_equal(batch.total_production(dice), sequentialResources))
@@ -0,0 +1,238 @@
+#Settlers of Catan
+#Benchmarks of the engine hot paths with fixed seeds, compared against a stored baseline
+
+import argparse, contextlib, gc, json, os, platform, sys, time, tracemalloc
+import numpy as np
+from board import catanBoard
+from heuristicAIPlayer import heuristicAIPlayer
+from gamelogic import GameLogicManager
+from modelState import modelState
+from AIGame import catanAIGame, simulate
+from eventLog import log, OFF
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarkBaseline.json')
+MIN_TIME = 1.0 #Seconds each benchmark is timed for
+REPEATS = 5 #Timed rounds, the fastest counts
+ALLOCATION_RUNS = 10 #Ops traced by tracemalloc for the allocation figures
+TOLERANCE = 0.2 #Slowdown against the baseline that counts as a regression
+
+
+#Function to get a mid-game position: a headless heuristic game of 40 turns on seed 0
+def get_mid_game():
+    return catanAIGame(headless=True, roster=['heuristic']*4, seed=0, maxTurns=40)
+
+
+#Function to build a road network of one player from the edges of the given hexes, optionally cut by an opponent settlement
+def get_road_network(hexes, blockedVertex=None):
+    board = catanBoard(seed=0)
+    player_i, opponent = heuristicAIPlayer('Player1', 'black'), heuristicAIPlayer('Player2', 'darkslateblue')
+    topology = board.topology
+    hexVertices = set(v for hexIndex in hexes for v in topology.hex_vertices[hexIndex])
+    for v1, v2 in topology.edge_vertices:
+        if v1 in hexVertices and v2 in hexVertices and (set(topology.vertex_hexes[v1]) & set(topology.vertex_hexes[v2])) & set(hexes):
+            board.updateBoardGraph_road(v1, v2, player_i)
+    if blockedVertex is not None:
+        board.updateBoardGraph_settlement(blockedVertex, opponent)
+    return board, player_i
+
+
+#Benchmarks - each function sets up its position and returns the op that is timed
+def bench_board_construction(game):
+    seeds = iter(range(1 << 30))
+    return lambda: catanBoard(seed=next(seeds))
+
+def bench_potential_roads(game):
+    players = list(game.playerQueue.queue)
+    return lambda: [game.board.get_potential_roads(player_i) for player_i in players]
+
+def bench_potential_settlements(game):
+    players = list(game.playerQueue.queue)
+    return lambda: [game.board.get_potential_settlements(player_i) for player_i in players]
+
+def bench_setup_settlements(game):
+    players = list(game.playerQueue.queue)
+    return lambda: [game.board.get_setup_settlements(player_i) for player_i in players]
+
+#Longest road with the cached trail lengths cleared, so every call searches the whole network
+def road_length_op(board, player_i):
+    componentLength = board.longestRoad.componentLength
+    def op():
+        for componentId in componentLength:
+            componentLength[componentId] = None
+        return player_i.get_road_length(board)
+    return op
+
+def bench_road_length_honeycomb(game):
+    #Every edge of the 3 hexes around vertex 20 - 15 roads, as many as a player has, with the most cycles
+    topology = catanBoard(seed=0).topology
+    return road_length_op(*get_road_network(topology.vertex_hexes[20]))
+
+def bench_road_length_ring(game):
+    #Both rings of the centre hex and a neighbour - 11 roads
+    topology = catanBoard(seed=0).topology
+    return road_length_op(*get_road_network((9,) + topology.hex_neighbors[9][:1]))
+
+def bench_road_length_blocked(game):
+    #The honeycomb with an opponent settlement on its centre vertex, splitting the trails
+    topology = catanBoard(seed=0).topology
+    return road_length_op(*get_road_network(topology.vertex_hexes[20], blockedVertex=20))
+
+def bench_distribute_resources(game):
+    gameLogic = GameLogicManager(game.board, lambda: list(game.playerQueue.queue))
+    def op():
+        for diceRoll in (2, 3, 4, 5, 6, 8, 9, 10, 11, 12):
+            gameLogic.distribute_resources(diceRoll)
+    return op
+
+def bench_model_state(game):
+    player_i = list(game.playerQueue.queue)[0]
+    return lambda: modelState(game, player_i)
+
+#The board changed since the last state, so only the static board sections are reused
+def bench_model_state_board_changed(game):
+    player_i = list(game.playerQueue.queue)[0]
+    def op():
+        game.board.stateVersion += 1
+        return modelState(game, player_i)
+    return op
+
+def bench_model_state_to_json(game):
+    state = modelState(game, list(game.playerQueue.queue)[0])
+    return state.to_json
+
+def bench_model_state_to_json_compact(game):
+    state = modelState(game, list(game.playerQueue.queue)[0])
+    return lambda: state.to_json(compact=True)
+
+def bench_heuristic_game(game):
+    seeds = iter(range(1 << 30))
+    return lambda: simulate(seed=next(seeds))
+
+
+#name: (setup function, what one op is)
+BENCHMARKS = {
+    'board_construction': (bench_board_construction, "catanBoard() on a new seed"),
+    'potential_roads': (bench_potential_roads, "get_potential_roads for the 4 players of a game after 40 turns"),
+    'potential_settlements': (bench_potential_settlements, "get_potential_settlements for the 4 players"),
+    'setup_settlements': (bench_setup_settlements, "get_setup_settlements for the 4 players"),
+    'road_length_honeycomb': (bench_road_length_honeycomb, "get_road_length of 15 roads round 3 hexes, uncached"),
+    'road_length_ring': (bench_road_length_ring, "get_road_length of 11 roads round 2 hexes, uncached"),
+    'road_length_blocked': (bench_road_length_blocked, "get_road_length of the honeycomb cut by a settlement, uncached"),
+    'distribute_resources': (bench_distribute_resources, "distribute_resources for each roll but 7"),
+    'model_state': (bench_model_state, "modelState(game, player) after 40 turns"),
+    'model_state_board_changed': (bench_model_state_board_changed, "modelState(game, player) with a new board state version"),
+    'model_state_to_json': (bench_model_state_to_json, "modelState.to_json()"),
+    'model_state_to_json_compact': (bench_model_state_to_json_compact, "modelState.to_json(compact=True), as sent to LLM players"),
+    'heuristic_game': (bench_heuristic_game, "simulate() of a 4 heuristic AI game on a new seed"),
+}
+
+
+#Function to time an op in REPEATS rounds of at least minTime/REPEATS seconds, returns (ops, seconds) of the fastest round
+#Like timeit, the best round is the one least disturbed by the rest of the machine. Each round runs doubling
+#batches of the op so the clock isn't read every op
+def time_op(op, minTime, repeats=REPEATS):
+    op() #Warm up caches
+    best = None
+    for repeat in range(repeats):
+        ops, elapsed, batch = 0, 0.0, 1
+        while elapsed < minTime/repeats:
+            startTime = time.perf_counter()
+            for i in range(batch):
+                op()
+            elapsed += time.perf_counter() - startTime
+            ops += batch
+            batch *= 2
+        if best is None or ops/elapsed > best[0]/best[1]:
+            best = ops, elapsed
+    return best
+
+
+#Function to get the allocations of an op - CPython has no count of every allocation, so this is
+#the memory blocks an op leaves allocated (sys.getallocatedblocks) and the peak it allocates on top (tracemalloc)
+def trace_allocations(op, runs):
+    gc.collect()
+    gc.disable()
+    try:
+        blocksBefore = sys.getallocatedblocks()
+        for i in range(runs):
+            op()
+        gc.collect() #Reference cycles the ops left are garbage, not kept memory
+        blocks = (sys.getallocatedblocks() - blocksBefore)/runs
+
+        tracemalloc.start()
+        peakBytes = 0
+        for i in range(runs):
+            tracemalloc.reset_peak()
+            startBytes = tracemalloc.get_traced_memory()[0]
+            op()
+            peakBytes = max(peakBytes, tracemalloc.get_traced_memory()[1] - startBytes)
+        tracemalloc.stop()
+    finally:
+        gc.enable()
+    return blocks, peakBytes
+
+
+#Function to run benchmarks by name, returns the machine-readable results
+def run_benchmarks(names=None, minTime=MIN_TIME, allocationRuns=ALLOCATION_RUNS):
+    results = {}
+    #Engine prints are discarded like in simulate(), stdout is kept for the results
+    with log.configured(level=OFF), open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for name in names or BENCHMARKS:
+            setup, description = BENCHMARKS[name]
+            ops, elapsed = time_op(setup(get_mid_game()), minTime) #Each run on a new position, ops may change it
+            blocks, peakBytes = trace_allocations(setup(get_mid_game()), min(ops, allocationRuns))
+            results[name] = {'ops': ops, 'seconds': round(elapsed, 4), 'ops_per_sec': round(ops/elapsed, 1),
+                             'us_per_op': round(elapsed/ops*1e6, 2), 'blocks_per_op': round(blocks, 1), 'peak_bytes': peakBytes,
+                             'description': description}
+
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(), 'benchmarks': results}
+
+
+#Function to compare results with a baseline, returns {name: ops/sec relative to the baseline}
+def compare(results, baseline):
+    return {name: round(result['ops_per_sec']/baseline['benchmarks'][name]['ops_per_sec'], 3)
+            for name, result in results['benchmarks'].items() if name in baseline['benchmarks']}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks of the Catan engine hot paths")
+    parser.add_argument("names", nargs="*", help="Benchmarks to run, all by default: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="Seconds each benchmark is timed for")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline results to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="Slowdown against the baseline reported as a regression")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if any benchmark regressed")
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error("unknown benchmark '{}'".format(name))
+
+    results = run_benchmarks(args.names, minTime=args.min_time)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as baselineFile:
+            results['baseline'] = compare(results, json.load(baselineFile))
+        regressions = [name for name, ratio in results['baseline'].items() if ratio < 1 - args.tolerance]
+        results['regressions'] = regressions
+
+    #Human readable table on stderr, JSON on stdout
+    for name, result in results['benchmarks'].items():
+        ratio = results.get('baseline', {}).get(name)
+        print("{:<24} {:>12.1f} ops/s {:>12.2f} us/op {:>10.1f} blocks {:>10} peak bytes {}".format(
+            name, result['ops_per_sec'], result['us_per_op'], result['blocks_per_op'], result['peak_bytes'],
+            "" if ratio is None else "x{:.2f} baseline{}".format(ratio, " REGRESSION" if name in regressions else "")), file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as outputFile:
+            outputFile.write(output + '\n')
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as baselineFile:
+            baselineFile.write(output + '\n')
+
+    if args.check and regressions:
+        sys.exit(1)
@@ -0,0 +1,227 @@
+#Settlers of Catan
+#Bitboard game state - pieces stored as integer bitmasks over vertex and edge ids
+
+from boardTopology import *
+
+#Function to iterate over the indices of the set bits of a mask, lowest first
+def iter_bits(mask):
+    while mask:
+        lowBit = mask & -mask
+        yield lowBit.bit_length() - 1
+        mask ^= lowBit
+
+#Function to count the set bits of a mask
+def bit_count(mask):
+    return bin(mask).count('1')
+
+
+#Class to hold the precomputed masks of a board topology
+#Bit v of a vertex mask is vertex id v, bit e of an edge mask is edge id e of the topology
+class BitboardMasks():
+    'Precomputed neighbor masks for bitwise legality checks'
+
+    def __init__(self, topology):
+        self.topology = topology
+        self.all_vertices = (1 << topology.num_vertices) - 1
+        self.all_edges = (1 << topology.num_edges) - 1
+
+        #vertex -> mask of its neighbor vertices, and of the edges touching it
+        self.vertex_neighbor_mask = tuple(sum(1 << n for n in topology.vertex_neighbors[v]) for v in range(topology.num_vertices))
+        self.vertex_edge_mask = tuple(sum(1 << e for e in topology.vertex_edges[v]) for v in range(topology.num_vertices))
+        #vertex -> mask of the vertex itself and its neighbors, i.e. what a settlement there blocks by the distance rule
+        self.vertex_block_mask = tuple((1 << v) | self.vertex_neighbor_mask[v] for v in range(topology.num_vertices))
+
+        #edge -> mask of its 2 vertices
+        self.edge_vertex_mask = tuple((1 << v1) | (1 << v2) for v1, v2 in topology.edge_vertices)
+
+
+_standardMasks = None
+
+def get_standard_masks():
+    'Return the process-wide BitboardMasks of the standard board'
+    global _standardMasks
+    if _standardMasks is None:
+        _standardMasks = BitboardMasks(get_standard_topology())
+    return _standardMasks
+
+
+#Class to store the pieces of every seat as bitmasks
+#Seats are player positions 0..numPlayers-1. The masks needed by the legality checks are kept up to date
+#as pieces are placed, so each check is a couple of bitwise ops
+class BitboardState():
+    'Per-seat settlement, city and road bitmasks with incremental legality masks'
+
+    def __init__(self, numPlayers, masks=None):
+        self.masks = masks if masks is not None else get_standard_masks()
+        self.numPlayers = numPlayers
+
+        self.settlements = [0]*numPlayers #Vertex masks
+        self.cities = [0]*numPlayers #Vertex masks
+        self.roads = [0]*numPlayers #Edge masks
+
+        self.occupied = 0 #Vertices with a settlement or city of any seat
+        self.blocked = 0 #Vertices that can't be settled by the distance rule
+        self.allRoads = 0 #Edges with a road of any seat
+        self.roadVertices = [0]*numPlayers #Vertices touched by each seat's roads
+        self.reachEdges = [0]*numPlayers #Edges touching a vertex each seat can extend a road from
+
+        return None
+
+
+    #Function to add an empty seat, returns its seat number
+    def add_seat(self):
+        for attr in ('settlements', 'cities', 'roads', 'roadVertices', 'reachEdges'):
+            getattr(self, attr).append(0)
+        self.numPlayers += 1
+        return self.numPlayers - 1
+
+
+    #Function to get the vertices a seat has built on
+    def buildings(self, seat):
+        return self.settlements[seat] | self.cities[seat]
+
+
+    #Function to place a settlement of seat on vertex v
+    def place_settlement(self, seat, v):
+        vertexBit = 1 << v
+        self.settlements[seat] |= vertexBit
+        self.occupied |= vertexBit
+        self.blocked |= self.masks.vertex_block_mask[v]
+        self.reachEdges[seat] |= self.masks.vertex_edge_mask[v]
+
+        #Other seats can no longer extend their roads through v
+        for otherSeat in range(self.numPlayers):
+            if otherSeat != seat and self.roadVertices[otherSeat] & vertexBit:
+                self.update_reach(otherSeat)
+
+
+    #Function to upgrade the settlement of seat on vertex v to a city
+    def place_city(self, seat, v):
+        vertexBit = 1 << v
+        self.settlements[seat] &= ~vertexBit
+        self.cities[seat] |= vertexBit
+
+
+    #Function to place a road of seat on edge id e
+    def place_road(self, seat, e):
+        self.roads[seat] |= 1 << e
+        self.allRoads |= 1 << e
+
+        newVertices = self.masks.edge_vertex_mask[e] & ~self.roadVertices[seat]
+        self.roadVertices[seat] |= newVertices
+        #Only vertices not colonised by another seat let the road continue
+        for v in iter_bits(newVertices & ~(self.occupied & ~self.buildings(seat))):
+            self.reachEdges[seat] |= self.masks.vertex_edge_mask[v]
+
+
+    #Helper function to rebuild the reach of a seat after a vertex on its roads was colonised
+    def update_reach(self, seat):
+        openVertices = (self.roadVertices[seat] & ~(self.occupied & ~self.buildings(seat))) | self.buildings(seat)
+        reachEdges = 0
+        for v in iter_bits(openVertices):
+            reachEdges |= self.masks.vertex_edge_mask[v]
+        self.reachEdges[seat] = reachEdges
+
+
+    #Function to get the mask of vertices open for a settlement during the setup phase
+    def legal_setup_settlements(self):
+        return self.masks.all_vertices & ~self.blocked
+
+    #Function to get the mask of vertices a seat can build a settlement on - at the end of one of its roads
+    def legal_settlements(self, seat):
+        return self.roadVertices[seat] & ~self.blocked
+
+    #Function to get the mask of vertices a seat can build a city on
+    def legal_cities(self, seat):
+        return self.settlements[seat]
+
+    #Function to get the mask of edges a seat can build a road on
+    def legal_roads(self, seat):
+        return self.reachEdges[seat] & ~self.allRoads
+
+    #Function to get the mask of edges a seat can build a road on from its setup settlement on vertex v
+    def legal_setup_roads(self, v):
+        return self.masks.vertex_edge_mask[v] & ~self.allRoads
+
+
+    #Function to check if vertex v is free by the distance rule
+    def is_legal_settlement(self, seat, v):
+        return bool(self.legal_settlements(seat) >> v & 1)
+
+    #Function to check if seat can build a road on edge id e
+    def is_legal_road(self, seat, e):
+        return bool(self.legal_roads(seat) >> e & 1)
+
+
+    #Function to get an independent copy of the state, e.g. for search
+    def copy(self):
+        newState = BitboardState.__new__(BitboardState)
+        newState.__dict__.update(self.__dict__)
+        for attr in ('settlements', 'cities', 'roads', 'roadVertices', 'reachEdges'):
+            setattr(newState, attr, list(getattr(self, attr)))
+        return newState
+
+
+    #Function to get an immutable snapshot of the state
+    def snapshot(self):
+        return (tuple(self.settlements), tuple(self.cities), tuple(self.roads), tuple(self.roadVertices), tuple(self.reachEdges),
+                self.occupied, self.blocked, self.allRoads)
+
+
+    #Function to return to a snapshot
+    def restore(self, snapshot):
+        settlements, cities, roads, roadVertices, reachEdges, self.occupied, self.blocked, self.allRoads = snapshot
+        self.settlements, self.cities, self.roads = list(settlements), list(cities), list(roads)
+        self.roadVertices, self.reachEdges = list(roadVertices), list(reachEdges)
+        self.numPlayers = len(settlements)
+
+
+    #Function to build the bitboard of a catanBoard, with seats in the order of the players list
+    @classmethod
+    def from_board(cls, board, players):
+        state = cls(len(players))
+        for seat, player_i in enumerate(players):
+            for v in player_i.buildGraph['SETTLEMENTS']:
+                state.place_settlement(seat, v)
+            for v in player_i.buildGraph['CITIES']:
+                state.place_settlement(seat, v)
+                state.place_city(seat, v)
+        for seat, player_i in enumerate(players):
+            for v1, v2 in player_i.buildGraph['ROADS']:
+                state.place_road(seat, board.topology.edge_index[(v1, v2)])
+
+        return state
+
+
+    #Function to write the pieces of the bitboard that are missing from a catanBoard and its players
+    #Only the pieces are placed - resources, piece counts and victory points stay with the player objects
+    def apply_to_board(self, board, players):
+        for seat, player_i in enumerate(players):
+            for v in iter_bits(self.buildings(seat)):
+                if board.boardGraph[v].state['Player'] is None:
+                    player_i.buildGraph['SETTLEMENTS'].append(v)
+                    board.updateBoardGraph_settlement(v, player_i)
+
+            for v in iter_bits(self.cities[seat]):
+                if not board.boardGraph[v].state['City']:
+                    player_i.buildGraph['CITIES'].append(v)
+                    board.updateBoardGraph_city(v, player_i)
+
+        for seat, player_i in enumerate(players):
+            for e in iter_bits(self.roads[seat]):
+                v1, v2 = board.topology.edge_vertices[e]
+                indx = board.topology.vertex_edges[v1].index(e) #edgeState is aligned with the vertex's edge ids
+                if not board.boardGraph[v1].edgeState[indx][1]:
+                    player_i.buildGraph['ROADS'].append((v1, v2))
+                    board.updateBoardGraph_road(v1, v2, player_i)
+
+
+if __name__ == '__main__':
+    state = BitboardState(2)
+    topology = state.masks.topology
+    state.place_settlement(0, 0)
+    state.place_road(0, topology.get_edge(0, topology.vertex_neighbors[0][0]))
+    state.place_settlement(1, 10)
+    print("Open setup vertices:", bit_count(state.legal_setup_settlements()))
+    print("Seat 0 legal roads:", [topology.edge_vertices[e] for e in iter_bits(state.legal_roads(0))])
+    print("Seat 0 legal settlements:", list(iter_bits(state.legal_settlements(0))))
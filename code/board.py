@@ -5,156 +5,105 @@ from string import *
 import numpy as np
 from hexTile import *
 from hexLib import *
+from boardTopology import *
+from boardGenerator import *
+from longestRoad import *
+from bitboard import *
+from productionTable import *
+from gameRNG import *
+from devCardDeck import *
+from eventLog import log, INFO
 from player import *
 #import networkx as nx
 #import matplotlib.pyplot as plt
-import pygame
-
-pygame.init()
+#No pygame here - the board logic runs headless, drawing is done by gameView
 
 #Class to implement Catan board logic
 #Use a graph representation for the board
 class catanBoard(hexTile, Vertex):
     'Class Definition for Catan Board Logic'
     #Object Creation - creates a random board configuration with hexTiles
-    def __init__(self):
+    #layout: optional BoardLayout of a single board (see boardGenerator), otherwise one is generated from seed
+    #rng: optional GameRNG of the game, otherwise one is created from seed - the board owns the game's random streams
+    def __init__(self, layout=None, seed=None, rng=None):
         self.hexTileDict = {} #Dict to store all hextiles, with hexIndex as key
         self.vertex_index_to_pixel_dict = {} #Dict to store the Vertices coordinates with vertex indices as keys
-        self.boardGraph = {} #Dict to store the vertex objects with the pixelCoordinates as keys
+        self.boardGraph = {} #Dict to store the vertex objects with the vertex indices as keys
 
         self.edgeLength = 80 #Specify for hex size
         self.size = self.width, self.height = 1000, 800
-        self.flat = Layout(layout_flat, Point(self.edgeLength, self.edgeLength), Point(self.width/2, self.height/2)) #specify Layout
+        #Board geometry is shared by every board in the process - only the resources, numbers and ports are randomized
+        self.topology = get_standard_topology()
+        self.flat = self.topology.layout #specify Layout
 
-        ##INITIALIZE BOARD##
-        print("Initializing Catan Game Board...")
-        self.resourcesList = self.getRandomResourceList() #Assign resources numbers randomly
+        self.rng = rng if rng is not None else GameRNG(seed)
 
-        #Get a random permutation of indices 0-18 to use with the resource list
-        randomIndices = np.random.permutation([i for i in range(len(self.resourcesList))])
-        
-        reinitializeCount = 0
-        #Initialize a valid resource list that does not allow adjacent 6's and 8's
-        while(self.checkHexNeighbors(randomIndices) == False):
-            reinitializeCount += 1
-            randomIndices = np.random.permutation([i for i in range(len(self.resourcesList))])
-
-        print("Re-initialized random board {} times".format(reinitializeCount))
-        
-        hexIndex_i = 0 #initialize hexIndex at 0
-        #Neighbors are specified in adjacency matrix - hard coded
-        
-        #Generate the hexes and the graphs with the Index, Centers and Resources defined
-        for rand_i in randomIndices:
-            #Get the coordinates of the new hex, indexed by hexIndex_i
-            hexCoords = self.getHexCoords(hexIndex_i)
+        ##INITIALIZE BOARD##
+        if log.level <= INFO:
+            log.emit(INFO, 'MESSAGE', text="Initializing Catan Game Board...")
+        if layout is None: #Draw a valid random layout - no adjacent 6's and 8's
+            layout = get_board_layout(generate_boards(1, self.rng.board), 0)
+        self.layout = layout
+
+        #Generate the hexes with the Index, Centers and Resources defined
+        for hexIndex_i in range(len(layout.resources)):
+            resourceType = RESOURCE_TYPES[layout.resources[hexIndex_i]]
+            if(resourceType != 'DESERT'):
+                hexResource = Resource(resourceType, int(layout.numbers[hexIndex_i]))
+            else:
+                hexResource = Resource(resourceType, None)
 
-            #Create the new hexTile with index and append + increment index
-            newHexTile = hexTile(hexIndex_i, self.resourcesList[rand_i], hexCoords)
+            #Create the new hexTile with index and coordinates
+            newHexTile = hexTile(hexIndex_i, hexResource, self.getHexCoords(hexIndex_i))
             if(newHexTile.resource.type == 'DESERT'): #Initialize robber on Desert
                 newHexTile.robber = True
+                self.robber_hex = hexIndex_i
 
             self.hexTileDict[hexIndex_i] = newHexTile
-            hexIndex_i += 1
 
-        #Create the vertex graph
-        self.vertexIndexCount = 0 #initialize vertex index count to 0
+        #Create the vertex graph from the integer board topology
+        self.vertexIndexCount = self.topology.num_vertices
         self.generateVertexGraph()
 
-        self.updatePorts() #Add the ports to the graph
-
-        #Initialize DevCardStack
-        self.devCardStack = {'KNIGHT':15, 'VP':5, 'MONOPOLY':2, 'ROADBUILDER':2, 'YEAROFPLENTY':2}
+        self.updatePorts(layout.ports) #Add the ports to the graph
 
-        return None
+        #Road networks of all players for incremental longest road tracking
+        self.longestRoad = LongestRoadEngine(self.topology)
 
+        #Payouts of each dice roll, kept up to date as buildings and the robber change
+        self.production = ProductionTable(self)
+        self.production.move_robber(self.robber_hex)
 
-    def getHexCoords(self, hexInd):
-        #Dictionary to store Axial Coordinates (q, r) by hexIndex
-        coordDict = {0:Axial_Point(0,0), 1:Axial_Point(0,-1), 2:Axial_Point(1,-1), 3:Axial_Point(1,0), 4:Axial_Point(0,1), 5:Axial_Point(-1,1), 6:Axial_Point(-1,0), 7:Axial_Point(0,-2), 8:Axial_Point(1,-2), 9:Axial_Point(2,-2), 10:Axial_Point(2,-1),
-                        11:Axial_Point(2,0), 12:Axial_Point(1,1), 13:Axial_Point(0,2), 14:Axial_Point(-1,2), 15:Axial_Point(-2,2), 16:Axial_Point(-2,1), 17:Axial_Point(-2,0), 18:Axial_Point(-1,-1)}
-        return coordDict[hexInd]
-
-
-    #Function to generate a random permutation of resources
-    def getRandomResourceList(self):
-        #Define Resources as a dict
-        Resource_Dict = {'DESERT':1, 'ORE':3, 'BRICK':3, 'WHEAT':4, 'WOOD':4, 'SHEEP':4}
-        #Get a random permutation of the numbers
-        NumberList = np.random.permutation([2,3,3,4,4,5,5,6,6,8,8,9,9,10,10,11,11,12])
-        numIndex = 0
-
-        resourceList = [] 
-        for r in Resource_Dict.keys():
-            numberofResource = Resource_Dict[r]
-            if(r != 'DESERT'):
-                for n in range(numberofResource):
-                    resourceList.append(Resource(r, NumberList[numIndex]))
-                    numIndex += 1
-            else:
-                resourceList.append(Resource(r, None))
+        #Legal move index - bitboard of all pieces kept up to date by the updateBoardGraph functions
+        self.bitboard = BitboardState(0)
+        self.playerSeats = {} #player -> seat in the bitboard, assigned when the player places a first piece
+        self.seatPlayers = [] #seat -> player
 
-        return resourceList
+        #Initialize DevCardStack - shuffled once from the game's deck stream
+        self.devCardStack = DevCardDeck(self.rng.deck)
 
-    #Function to check neighboring hexTiles
-    #Takes a list of rnadom indices as an input, and the resource list
-    def checkHexNeighbors(self, randomIndices):
-        #store a list of neighbors as per the axial coordinate -> numeric indexing system
-        hexNeighborIndexList = {0: [1,2,3,4,5,6], 1: [0,2,6,7,8,18], 2: [0,1,3,8,9,10],
-                                   3: [0,2,4,10,11,12], 4: [0,3,5,12,13,14], 5: [0,4,6,14,15,16],
-                                   6: [0,1,5,16,17,18], 7: [1,8,18], 8: [1,2,7,9],
-                                   9: [2,8,10], 10: [2,3,9,11], 11: [3,10,12],
-                                   12: [3,4,11,13], 13: [4,12,14], 14: [4,5,13,15],
-                                   15: [5,14,16], 16: [5,6,15,17], 17: [6,16,18], 18: [1,6,7,17]}
+        #Version of the pieces and robber on the board, bumped by every updateBoardGraph function and restore
+        #Views derived from the board (e.g. modelState sections) are cached against it
+        self.stateVersion = 0
 
-        #Check each position, random index pair for its resource roll value
-        for pos, random_Index in enumerate(randomIndices):
-            rollValueOnHex = self.resourcesList[random_Index].num
+        return None
 
-            #Check each neighbor in the position and check if number is legal
-            for neighbor_index in hexNeighborIndexList[pos]:
-                rollValueOnNeighbor = self.resourcesList[randomIndices[neighbor_index]].num
-                if rollValueOnHex in [6,8] and rollValueOnNeighbor in [6,8]:
-                    return False
 
-        #Return true if it legal for all hexes
-        return True
+    def getHexCoords(self, hexInd):
+        #Axial Coordinates (q, r) by hexIndex
+        return HEX_AXIAL_COORDS[hexInd]
 
 
     #Function to generate the entire board graph
+    #Vertices are keyed by vertex index, edgeList holds neighbor vertex indices in ascending order
     def generateVertexGraph(self):
-        for hexTile in self.hexTileDict.values():
-            hexTileCorners = polygon_corners(self.flat, hexTile.hex) #Get vertices of each hex
-            #Create vertex graph with this list of corners
-            self.updateVertexGraph(hexTileCorners, hexTile.index)
-
-        #Once all hexTiles have been added  get edges
-        self.updateGraphEdges()
-
-
-    #Function to update a graph of the board with each vertex as a node
-    def updateVertexGraph(self, vertexCoordList, hexIndx):
-        for v in vertexCoordList:
-            #Check if vertex already exists - update adjacentHexList if it does
-            if v in self.vertex_index_to_pixel_dict.values():
-                for existingVertex in self.boardGraph.keys():
-                    if(existingVertex == v):
-                        self.boardGraph[v].adjacentHexList.append(hexIndx)
-
-            else:#Create new vertex if it doesn't exist
-                #print('Adding Vertex:', v)
-                newVertex = Vertex(v, hexIndx, self.vertexIndexCount)
-                self.vertex_index_to_pixel_dict[self.vertexIndexCount] = v #Create the index-pixel key value pair
-                self.boardGraph[v] = newVertex
-                self.vertexIndexCount += 1 #Increment index for future
-
-    
-    #Function to add adges to graph given all vertices
-    def updateGraphEdges(self):
-        for v1 in self.boardGraph.keys():
-            for v2 in self.boardGraph.keys():
-                if(self.vertexDistance(v1, v2) == self.edgeLength):
-                    self.boardGraph[v1].edgeList.append(v2)
+        #Only the per-board vertex state is created here, the geometry comes from the cached topology
+        for v, vertexPixel in enumerate(self.topology.vertex_pixels):
+            newVertex = Vertex(vertexPixel, self.topology.vertex_hexes[v][0], v)
+            newVertex.adjacentHexList = list(self.topology.vertex_hexes[v])
+            newVertex.edgeList = list(self.topology.vertex_neighbors[v])
+            self.boardGraph[v] = newVertex
+        self.vertex_index_to_pixel_dict = dict(enumerate(self.topology.vertex_pixels)) #index-pixel key value pairs
 
 
     @staticmethod
@@ -166,35 +115,14 @@ class catanBoard(hexTile, Vertex):
     def printGraph(self):
         print(len(self.boardGraph))
         for node in self.boardGraph.keys():
-            print("Pixel:{}, Index:{}, NeighborVertexCount:{}, AdjacentHexes:{}".format(node, self.boardGraph[node].vertexIndex, len(self.boardGraph[node].edgeList), self.boardGraph[node].adjacentHexList))
+            print("Pixel:{}, Index:{}, NeighborVertexCount:{}, AdjacentHexes:{}".format(self.boardGraph[node].pixelCoordinates, node, len(self.boardGraph[node].edgeList), self.boardGraph[node].adjacentHexList))
 
     #Update Board vertices with Port info
-    def updatePorts(self):
-        #list of vertex indices of all port pairs
-        port_pair_list = [[43,44], [33,34], [45,49], [27,53], [24,29], [30,31], [36,39], [41,42], [51,52]]
-
-        #Get a random permutation of indices of ports
-        randomPortIndices = np.random.permutation([i for i in range(len(port_pair_list))])
-        randomPortIndex_counter = 0
-
-        #Initialize port dictionary with counts
-        #Also use this dictionary to map vertex indices to specific ports as per the game board 
-        port_dict = {'2:1 BRICK':1, '2:1 SHEEP':1, '2:1 WOOD':1, '2:1 WHEAT':1, '2:1 ORE':1, '3:1 PORT':4}
-
-        #Assign random port vertex pairs for each port type
-        for portType, portVertexPair_count in port_dict.items():
-            portVertices = []
-            for i in range(portVertexPair_count): #Number of ports to assign
-                portVertices += port_pair_list[randomPortIndices[randomPortIndex_counter]] #Add randomized port
-                randomPortIndex_counter += 1
-
-            port_dict[portType] = portVertices
-
-        #Iterate thru each port and update vertex info
-        for portType, portVertexIndex_list in port_dict.items():
-            for v_index in portVertexIndex_list: #Each vertex
-                vertexPixel = self.vertex_index_to_pixel_dict[v_index] #Get the pixel coordinates to update the boardgraph
-                self.boardGraph[vertexPixel].port = portType #Update the port type
+    #portLayout[slot] is the port type code of the harbour at PORT_VERTEX_PAIRS[slot]
+    def updatePorts(self, portLayout):
+        for portSlot, portCode in enumerate(portLayout):
+            for v_index in PORT_VERTEX_PAIRS[portSlot]: #Each vertex of the harbour
+                self.boardGraph[v_index].port = PORT_TYPES[portCode] #Update the port type
 
     
     #Function to Display Catan Board Info
@@ -203,82 +131,43 @@ class catanBoard(hexTile, Vertex):
             tile.displayHexInfo()
         return None
 
+    #Function to get the bitboard seat of a player, adding one the first time a player is seen
+    def get_seat(self, player):
+        seat = self.playerSeats.get(player)
+        if seat is None:
+            seat = self.bitboard.add_seat()
+            self.playerSeats[player] = seat
+            self.seatPlayers.append(player)
+        return seat
+
     #Function to get the list of potential roads a player can build.
-    #Return these roads as a dictionary where key=vertex coordinates and values is the rect
+    #Return these roads as a dictionary where key=vertex coordinates (v1 < v2) and values is the rect
     def get_potential_roads(self, player):
-        colonisableRoads = {}
-        #Check potential roads from each road the player already has
-        for existingRoad in player.buildGraph['ROADS']:
-            for vertex_i in existingRoad: #Iterate over both vertices of this road
-                #Check neighbors from this vertex
-                for indx, v_i in enumerate(self.boardGraph[vertex_i].edgeList):
-                    if((self.boardGraph[vertex_i].edgeState[indx][1] == False) and (self.boardGraph[vertex_i].state['Player'] in [None, player])): #Edge currently does not have a road and vertex isn't colonised by another player
-                        if((v_i, vertex_i) not in colonisableRoads.keys() and (vertex_i, v_i) not in colonisableRoads.keys()): #If the edge isn't already there in both its regular + opposite orientation
-                            #Use boolean to keep track of potential roads
-                            colonisableRoads[(vertex_i, v_i)] = True
-                            #print(vertex_i, v_i)
-
-        return colonisableRoads
+        if player not in self.playerSeats: #Player has no pieces yet
+            return {}
+        edgeVertices = self.topology.edge_vertices
+        return {edgeVertices[e]: True for e in iter_bits(self.bitboard.legal_roads(self.playerSeats[player]))}
 
     
     #Function to get available settlements for colonisation for a particular player
     #Return these settlements as a dict of vertices with their Rects
     def get_potential_settlements(self, player):
-        colonisableVertices = {}
-        #Check starting from each road the player already has
-        for existingRoad in player.buildGraph['ROADS']:
-            for vertex_i in existingRoad: #Iterate over both vertices of this road
-                #Check if vertex isn't already in the potential settlements - to remove double checks
-                if(vertex_i not in colonisableVertices.keys()):
-                    if(self.boardGraph[vertex_i].isColonised): #Check if this vertex is already colonised
-                        break
-                    
-                    canColonise = True
-                    for v_neighbor in self.boardGraph[vertex_i].edgeList: #Check each of the neighbors from this vertex
-                        if(self.boardGraph[v_neighbor].isColonised):
-                            canColonise = False
-                            break
-                    
-                #If all checks are good add this vertex and its rect as the value
-                if(canColonise):
-                    #colonisableVertices[vertex_i] = self.draw_possible_settlement(vertex_i, player.color)
-                    colonisableVertices[vertex_i] = True
-
-        return colonisableVertices
+        if player not in self.playerSeats:
+            return {}
+        return {v: True for v in iter_bits(self.bitboard.legal_settlements(self.playerSeats[player]))}
 
 
     #Function to get available cities for colonisation for a particular player
     #Return these cities as a dict of vertex-vertexRect key value pairs
     def get_potential_cities(self, player):
-        colonisableVertices = {}
-        #Check starting from each settlement the player already has
-        for existingSettlement in player.buildGraph['SETTLEMENTS']:
-            #colonisableVertices[existingSettlement] = self.draw_possible_city(existingSettlement, player.color)
-            colonisableVertices[existingSettlement] = True
-
-        return colonisableVertices
+        if player not in self.playerSeats:
+            return {}
+        return {v: True for v in iter_bits(self.bitboard.legal_cities(self.playerSeats[player]))}
 
     #Special function to get potential first settlements during setup phase
+    #Every vertex not blocked by the distance rule
     def get_setup_settlements(self, player):
-        colonisableVertices = {}
-        #Check every vertex and every neighbor of that vertex, amd if both are open then we can build a settlement there
-        for vertexCoord in self.boardGraph.keys():
-            canColonise = True
-            potentialVertex = self.boardGraph[vertexCoord]
-            if(potentialVertex.isColonised):  #First check if vertex is colonised
-                canColonise = False
-            
-            #Check each neighbor
-            for v_neighbor in potentialVertex.edgeList:
-                if(self.boardGraph[v_neighbor].isColonised):  #Check if any of first neighbors are colonised
-                    canColonise = False
-                    break
-
-            if(canColonise): #If the vertex is colonisable add it to the dict with its Rect
-                #colonisableVertices[vertexCoord] = self.draw_possible_settlement(vertexCoord, player.color)
-                colonisableVertices[vertexCoord] = True
-
-        return colonisableVertices
+        return {v: True for v in iter_bits(self.bitboard.legal_setup_settlements())}
 
 
     #Special function to get potential first roads during setup phase
@@ -308,6 +197,9 @@ class catanBoard(hexTile, Vertex):
                 self.boardGraph[v_coord2].edgeState[indx][0] = player
                 self.boardGraph[v_coord2].edgeState[indx][1] = True
 
+        self.longestRoad.add_road(player, v_coord1, v_coord2)
+        self.bitboard.place_road(self.get_seat(player), self.topology.edge_index[(v_coord1, v_coord2)])
+        self.stateVersion += 1
         #self.draw_road([v_coord1, v_coord2], player.color) #Draw the settlement
 
 
@@ -317,6 +209,11 @@ class catanBoard(hexTile, Vertex):
         self.boardGraph[v_coord].state['Settlement'] = True
         self.boardGraph[v_coord].isColonised = True 
 
+        self.longestRoad.add_settlement(player, v_coord) #May split opponent road networks
+        self.bitboard.place_settlement(self.get_seat(player), v_coord)
+        self.production.add_building(player, v_coord)
+        self.stateVersion += 1
+
         #self.draw_settlement(v_coord, player.color) #Draw the settlement
     
     #Function to update boardGraph with settlement on vertex v
@@ -327,14 +224,18 @@ class catanBoard(hexTile, Vertex):
 
         #Remove settlement from player's buildGraph
         player.buildGraph['SETTLEMENTS'].remove(v_coord)
+        self.bitboard.place_city(self.get_seat(player), v_coord)
+        self.production.add_building(player, v_coord) #A city collects 1 more than the settlement it replaces
+        self.stateVersion += 1
 
     #Function to update boardGraph with Robber on hexTile
     def updateBoardGraph_robber(self, hexIndex):
-        #Set all flags to false
-        for hex_tile in self.hexTileDict.values():
-            hex_tile.robber = False
-
+        #Only the old and new robber hexes change
+        self.hexTileDict[self.robber_hex].robber = False
         self.hexTileDict[hexIndex].robber = True
+        self.robber_hex = hexIndex
+        self.production.move_robber(hexIndex)
+        self.stateVersion += 1
 
     #Function to get possible robber hexTiles
     #Return robber hex spots with their hexIndex - rect representations as key-value pairs
@@ -347,19 +248,15 @@ class catanBoard(hexTile, Vertex):
 
         return robberHexDict
 
-    #Get a Dict of players to rob based on the hexIndex of the robber, with the circle Rect as the value
+    #Get a Dict of players to rob based on the hexIndex of the robber, with a vertex index of theirs on the hex as the value
     def get_players_to_rob(self, hexIndex):
-        #Extract all 6 vertices of this hexTile
-        hexTile = self.hexTileDict[hexIndex]
-        vertexList = polygon_corners(self.flat, hexTile.hex)
-
         playersToRobDict = {}
 
-        for vertex in vertexList:
+        #Check all 6 vertices of this hexTile
+        for vertex in self.topology.hex_vertices[hexIndex]:
             if(self.boardGraph[vertex].state['Player'] != None): #There is a settlement on this vertex
                 playerToRob = self.boardGraph[vertex].state['Player']
                 if(playerToRob not in playersToRobDict.keys()): #only add a player once with his/her first settlement/city
-                    #playersToRobDict[playerToRob] = self.draw_possible_players_to_rob(vertex)
                     playersToRobDict[playerToRob] = vertex
 
         return playersToRobDict
@@ -372,4 +269,60 @@ class catanBoard(hexTile, Vertex):
             if hexTile.resource.num == diceRollNum:
                 hexesRolled.append(hexTile.index)
 
-        return hexesRolled
\ No newline at end of file
+        return hexesRolled
+
+
+    #Function to get an immutable snapshot of the board state - pieces, robber and dev card stack
+    #Every derived structure (bitboard, longest road, production) snapshots itself
+    def snapshot(self):
+        return (self.bitboard.snapshot(), tuple(self.seatPlayers), self.robber_hex,
+                self.longestRoad.snapshot(), self.production.snapshot(), self.devCardStack.snapshot())
+
+
+    #Function to return the board to a snapshot
+    #Only the vertices and edges whose pieces differ from the snapshot are rewritten in the boardGraph
+    def restore(self, snapshot):
+        bitboardSnapshot, seatPlayers, robberHex, longestRoadSnapshot, productionSnapshot, devCardSnapshot = snapshot
+        settlements, cities, roads = bitboardSnapshot[0:3]
+
+        #Find the changed vertices and edges from the bitboards, seat by seat
+        changedVertices, changedEdges = 0, 0
+        for seat in range(max(len(settlements), self.bitboard.numPlayers)):
+            if seat >= len(settlements):
+                changedVertices |= self.bitboard.buildings(seat)
+                changedEdges |= self.bitboard.roads[seat]
+            elif seat >= self.bitboard.numPlayers:
+                changedVertices |= settlements[seat] | cities[seat]
+                changedEdges |= roads[seat]
+            else:
+                changedVertices |= (self.bitboard.settlements[seat] ^ settlements[seat]) | (self.bitboard.cities[seat] ^ cities[seat])
+                changedEdges |= self.bitboard.roads[seat] ^ roads[seat]
+
+        for v in iter_bits(changedVertices):
+            vertex = self.boardGraph[v]
+            vertex.state = {'Player': None, 'Settlement':False, 'City':False}
+            for seat, player_i in enumerate(seatPlayers):
+                if (settlements[seat] | cities[seat]) >> v & 1:
+                    vertex.state = {'Player': player_i, 'Settlement': bool(settlements[seat] >> v & 1), 'City': bool(cities[seat] >> v & 1)}
+            vertex.isColonised = vertex.state['Player'] is not None
+
+        for e in iter_bits(changedEdges):
+            roadOwner = None
+            for seat, player_i in enumerate(seatPlayers):
+                if roads[seat] >> e & 1:
+                    roadOwner = player_i
+            for v in self.topology.edge_vertices[e]:
+                self.boardGraph[v].edgeState[self.topology.vertex_edges[v].index(e)] = [roadOwner, roadOwner is not None]
+
+        if robberHex != self.robber_hex:
+            self.hexTileDict[self.robber_hex].robber = False
+            self.hexTileDict[robberHex].robber = True
+            self.robber_hex = robberHex
+
+        self.seatPlayers = list(seatPlayers)
+        self.playerSeats = {player_i: seat for seat, player_i in enumerate(seatPlayers)}
+        self.bitboard.restore(bitboardSnapshot)
+        self.longestRoad.restore(longestRoadSnapshot)
+        self.production.restore(productionSnapshot)
+        self.devCardStack.restore(devCardSnapshot)
+        self.stateVersion += 1 #Versions only go up, so a view cached before the snapshot is never taken for the restored board
@@ -0,0 +1,77 @@
+#Settlers of Catan
+#Vectorized generator of valid random board layouts
+
+import collections
+import numpy as np
+from boardTopology import *
+
+#Resource codes used in the layout arrays, with the number of tiles of each
+RESOURCE_TYPES = ('DESERT', 'ORE', 'BRICK', 'WHEAT', 'WOOD', 'SHEEP')
+RESOURCE_COUNTS = (1, 3, 3, 4, 4, 4)
+DESERT = 0
+
+#Number tokens placed on the 18 non-desert hexes
+NUMBER_TOKENS = (2, 3, 3, 4, 4, 5, 5, 6, 6, 8, 8, 9, 9, 10, 10, 11, 11, 12)
+
+#Port codes used in the layout arrays, with the number of harbours of each
+PORT_TYPES = ('2:1 BRICK', '2:1 SHEEP', '2:1 WOOD', '2:1 WHEAT', '2:1 ORE', '3:1 PORT')
+PORT_COUNTS = (1, 1, 1, 1, 1, 4)
+
+RESOURCE_TILES = np.repeat(np.arange(len(RESOURCE_TYPES), dtype=np.int8), RESOURCE_COUNTS)
+PORT_TILES = np.repeat(np.arange(len(PORT_TYPES), dtype=np.int8), PORT_COUNTS)
+
+#resources[hexIndex] is a RESOURCE_TYPES code, numbers[hexIndex] the roll number (0 on the desert)
+#and ports[slot] the PORT_TYPES code of the harbour on PORT_VERTEX_PAIRS[slot].
+#generate_boards returns these as (n, 19), (n, 19) and (n, 9) arrays, a single board layout holds 1-D rows
+BoardLayout = collections.namedtuple("BoardLayout", ["resources", "numbers", "ports"])
+
+
+def generate_boards(n, seed=None):
+    '''Generate n random board layouts with no two 6/8 number tokens on adjacent hexes
+    Candidates are drawn and checked as whole batches, so there is no per-board retry loop
+    args: n - number of boards, seed - int seed or np.random.Generator
+    returns: BoardLayout of int8 arrays with a leading board axis of size n
+    '''
+    rng = np.random.default_rng(seed)
+    hexA, hexB = (np.array(h) for h in get_standard_topology().hex_neighbor_pairs)
+    numHexes = len(RESOURCE_TILES)
+
+    resources = np.empty((n, numHexes), dtype=np.int8)
+    numbers = np.empty((n, numHexes), dtype=np.int8)
+    filled = 0
+    while filled < n:
+        #Only about one candidate in seven is valid, so oversample the boards still needed
+        batchSize = max(64, 8*(n - filled))
+        batchResources = rng.permuted(np.tile(RESOURCE_TILES, (batchSize, 1)), axis=1)
+        #Lay the shuffled tokens on the non-desert hexes of each row in hex order
+        batchNumbers = np.zeros((batchSize, numHexes), dtype=np.int8)
+        batchNumbers[batchResources != DESERT] = rng.permuted(np.tile(np.array(NUMBER_TOKENS, dtype=np.int8), (batchSize, 1)), axis=1).ravel()
+
+        #Reject any layout where a 6/8 hex neighbors another 6/8 hex
+        redNumber = (batchNumbers == 6) | (batchNumbers == 8)
+        valid = ~(redNumber[:, hexA] & redNumber[:, hexB]).any(axis=1)
+
+        accepted = np.flatnonzero(valid)[:n - filled]
+        resources[filled:filled + len(accepted)] = batchResources[accepted]
+        numbers[filled:filled + len(accepted)] = batchNumbers[accepted]
+        filled += len(accepted)
+
+    ports = rng.permuted(np.tile(PORT_TILES, (n, 1)), axis=1)
+
+    return BoardLayout(resources, numbers, ports)
+
+
+#Function to get the layout of a single board out of a batch
+def get_board_layout(layouts, boardIndex):
+    return BoardLayout(layouts.resources[boardIndex], layouts.numbers[boardIndex], layouts.ports[boardIndex])
+
+
+if __name__ == '__main__':
+    import time
+    startTime = time.perf_counter()
+    layouts = generate_boards(10000, seed=0)
+    print("Generated {} boards in {:.3f}s".format(len(layouts.resources), time.perf_counter() - startTime))
+    firstBoard = get_board_layout(layouts, 0)
+    for hexIndex in range(len(firstBoard.resources)):
+        print("Hex:{}, Resource:{}, Number:{}".format(hexIndex, RESOURCE_TYPES[firstBoard.resources[hexIndex]], firstBoard.numbers[hexIndex]))
+    print("Ports:", [PORT_TYPES[p] for p in firstBoard.ports])
@@ -0,0 +1,105 @@
+#Settlers of Catan
+#Static board topology with integer vertex, edge and hex ids
+
+from hexLib import *
+
+#Axial Coordinates (q, r) of each hexTile, indexed by hexIndex
+HEX_AXIAL_COORDS = (Axial_Point(0,0), Axial_Point(0,-1), Axial_Point(1,-1), Axial_Point(1,0), Axial_Point(0,1), Axial_Point(-1,1), Axial_Point(-1,0),
+                    Axial_Point(0,-2), Axial_Point(1,-2), Axial_Point(2,-2), Axial_Point(2,-1), Axial_Point(2,0), Axial_Point(1,1), Axial_Point(0,2),
+                    Axial_Point(-1,2), Axial_Point(-2,2), Axial_Point(-2,1), Axial_Point(-2,0), Axial_Point(-1,-1))
+
+#Vertex index pairs of the 9 harbour locations around the coast
+PORT_VERTEX_PAIRS = ((43,44), (33,34), (45,49), (27,53), (24,29), (30,31), (36,39), (41,42), (51,52))
+
+#Layout of the standard board - hex size 80 centered on a 1000x800 screen
+STANDARD_LAYOUT = Layout(layout_flat, Point(80, 80), Point(500, 400))
+
+
+#Class to hold the fixed adjacency of the board as flat integer tables
+#Vertex ids follow the order in which hex corners are first visited (hexIndex 0-18, corners 0-5),
+#so the ids match the vertex indices used by the port list, modelState and the LLM prompts
+class BoardTopology():
+    'Precomputed vertex/edge/hex adjacency for the standard 19 hex board'
+
+    def __init__(self, layout=STANDARD_LAYOUT, hexCoordsList=HEX_AXIAL_COORDS):
+        self.layout = layout
+        pixelToVertex = {}
+        vertexPixels = []
+        vertexHexes = []
+        hexVertices = []
+        edgeSet = set()
+
+        for hexIndex, axialCoords in enumerate(hexCoordsList):
+            cornerIds = []
+            for corner in polygon_corners(layout, Axial_Hex(axialCoords)):
+                v = pixelToVertex.get(corner)
+                if v is None: #First time this corner is seen - assign the next vertex id
+                    v = len(vertexPixels)
+                    pixelToVertex[corner] = v
+                    vertexPixels.append(corner)
+                    vertexHexes.append([])
+                vertexHexes[v].append(hexIndex)
+                cornerIds.append(v)
+
+            hexVertices.append(tuple(cornerIds))
+            #Consecutive corners of a hex are joined by an edge
+            for i in range(6):
+                v1, v2 = cornerIds[i], cornerIds[(i+1) % 6]
+                edgeSet.add((min(v1, v2), max(v1, v2)))
+
+        self.num_vertices = len(vertexPixels)
+        self.num_hexes = len(hexVertices)
+
+        #edge id <-> (v1, v2) with v1 < v2, ids in sorted vertex pair order
+        self.edge_vertices = tuple(sorted(edgeSet))
+        self.num_edges = len(self.edge_vertices)
+        self.edge_index = {}
+        for e, (v1, v2) in enumerate(self.edge_vertices):
+            self.edge_index[(v1, v2)] = e
+            self.edge_index[(v2, v1)] = e
+
+        #vertex -> neighbor vertices (ascending) and the matching edge ids
+        neighbors = [[] for v in range(self.num_vertices)]
+        for v1, v2 in self.edge_vertices:
+            neighbors[v1].append(v2)
+            neighbors[v2].append(v1)
+        self.vertex_neighbors = tuple(tuple(sorted(n)) for n in neighbors)
+        self.vertex_edges = tuple(tuple(self.edge_index[(v, n)] for n in self.vertex_neighbors[v]) for v in range(self.num_vertices))
+
+        self.vertex_hexes = tuple(tuple(h) for h in vertexHexes)
+        self.hex_vertices = tuple(hexVertices)
+
+        #hex -> neighboring hexes (hexes sharing a corner are adjacent on a hex grid)
+        hexNeighbors = [set() for h in range(self.num_hexes)]
+        for adjHexes in self.vertex_hexes:
+            for h in adjHexes:
+                hexNeighbors[h].update(adjHexes)
+        self.hex_neighbors = tuple(tuple(sorted(n - {h})) for h, n in enumerate(hexNeighbors))
+        #Each adjacent hex pair once, as two aligned lists (h1 < h2) for vectorized checks
+        hexPairs = [(h1, h2) for h1 in range(self.num_hexes) for h2 in self.hex_neighbors[h1] if h1 < h2]
+        self.hex_neighbor_pairs = (tuple(p[0] for p in hexPairs), tuple(p[1] for p in hexPairs))
+        self.vertex_pixels = tuple(vertexPixels)
+        self.pixel_to_vertex = pixelToVertex
+
+
+    #Function to get the edge id of the road between two vertices, None if they aren't adjacent
+    def get_edge(self, v1, v2):
+        return self.edge_index.get((v1, v2))
+
+
+#The geometry is identical for every standard board, so build it once per process and share it
+_standardTopology = None
+
+def get_standard_topology():
+    'Return the process-wide BoardTopology of the standard board'
+    global _standardTopology
+    if _standardTopology is None:
+        _standardTopology = BoardTopology()
+    return _standardTopology
+
+
+if __name__ == '__main__':
+    topology = get_standard_topology()
+    print("Vertices:{}, Edges:{}, Hexes:{}".format(topology.num_vertices, topology.num_edges, topology.num_hexes))
+    for v in range(topology.num_vertices):
+        print("Vertex:{}, Neighbors:{}, AdjacentHexes:{}".format(v, topology.vertex_neighbors[v], topology.vertex_hexes[v]))
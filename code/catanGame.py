@@ -59,7 +59,6 @@ class catanGame():
         max_action_attempts = 5 # Max attempts for a single setup placement
         placed_successfully = False
 
-        vertex_index_to_pixel_map = self.board.vertex_index_to_pixel_dict
         last_action_status = None # Initialize here
         last_action_error_details = None # Initialize here
 
@@ -90,27 +89,21 @@ class catanGame():
                 if v_idx is not None:
                     potential_settlements_indices = current_model_state.available_actions.get("build_settlement", [])
                     if v_idx in potential_settlements_indices:
-                        target_v_coord = vertex_index_to_pixel_map.get(v_idx)
-                        if target_v_coord:
+                        target_v_coord = v_idx
+                        if target_v_coord in self.board.boardGraph:
                             # Simplified direct update for setup settlement:
                             # Check again directly as a safeguard, though available_actions should be source of truth
                             if self.board.boardGraph[target_v_coord].isColonised:
                                 last_action_status = "invalid_placement"
                                 last_action_error_details = "Setup settlement spot is already taken (checked again)."
                             else:
-                                llm_player.buildGraph['SETTLEMENTS'].append(target_v_coord)
-                                llm_player.settlementsLeft -=1
-                                llm_player.victoryPoints +=1 # VP for setup settlements
-                                self.board.updateBoardGraph_settlement(target_v_coord, llm_player)
-                                if((self.board.boardGraph[target_v_coord].port != False) and (self.board.boardGraph[target_v_coord].port not in llm_player.portList)):
-                                    llm_player.portList.append(self.board.boardGraph[target_v_coord].port)
-                                    print(f"{llm_player.name} acquired port: {self.board.boardGraph[target_v_coord].port}")
+                                llm_player.build_settlement(target_v_coord, self.board, setup_phase=True)
                                 print(f"LLM {llm_player.name} (Setup) placed settlement at VI {v_idx}.")
                                 # placed_successfully = True # Not needed, direct return
                                 return v_idx # Return the index of the placed settlement
                         else:
                             last_action_status = "internal_error"
-                            last_action_error_details = f"Invalid vertex index {v_idx} for setup settlement (no pixel map)."
+                            last_action_error_details = f"Invalid vertex index {v_idx} for setup settlement (not on board)."
                     else:
                         last_action_status = "invalid_placement"
                         last_action_error_details = f"Proposed setup settlement VI {v_idx} is invalid (not in available actions: {potential_settlements_indices})."
@@ -132,9 +125,8 @@ class catanGame():
                     else:
                         potential_roads_idx_pairs = current_model_state.available_actions.get("build_road", [])
                         if chosen_road_pair in potential_roads_idx_pairs:
-                            target_v1_coord = vertex_index_to_pixel_map.get(v1_idx)
-                            target_v2_coord = vertex_index_to_pixel_map.get(v2_idx)
-                            if target_v1_coord and target_v2_coord:
+                            target_v1_coord, target_v2_coord = v1_idx, v2_idx
+                            if target_v1_coord in self.board.boardGraph and target_v2_coord in self.board.boardGraph:
                                 if llm_player.build_road(target_v1_coord, target_v2_coord, self.board, setup_phase=True):
                                     print(f"LLM {llm_player.name} (Setup) built road {v1_idx}-{v2_idx}.")
                                     placed_successfully = True
@@ -143,7 +135,7 @@ class catanGame():
                                     last_action_error_details = "Failed to build setup road despite valid inputs (player.build_road returned False unexpectedly)."
                             else:
                                 last_action_status = "internal_error"
-                                last_action_error_details = f"Invalid vertex indices {v1_idx}, {v2_idx} for setup road (no pixel map)."
+                                last_action_error_details = f"Invalid vertex indices {v1_idx}, {v2_idx} for setup road (not on board)."
                         else:
                             last_action_status = "invalid_placement"
                             last_action_error_details = f"Proposed setup road {chosen_road_pair} is invalid (not in available actions: {potential_roads_idx_pairs})."
@@ -185,6 +177,8 @@ class catanGame():
         self.playerQueue.put(test_AI_player)
 
         playerList = list(self.playerQueue.queue)
+        for player_i in playerList:
+            player_i.rng = self.board.rng.agent_rng() #Independent random stream per seat
 
         self.boardView.displayGameScreen() #display the initial gameScreen
         print("Displaying Initial GAMESCREEN!")
@@ -454,7 +448,6 @@ class catanGame():
 
             valid_action_executed_this_step = False # Tracks if *this specific action* was valid and done
 
-            vertex_index_to_pixel_map = self.board.vertex_index_to_pixel_dict
 
             if action_type == "build_settlement":
                 # This action is only valid in main game phase here. Setup is separate.
@@ -466,8 +459,8 @@ class catanGame():
                     if v_idx is not None:
                         potential_settlements_indices = current_model_state.available_actions.get("build_settlement", [])
                         if v_idx in potential_settlements_indices:
-                            target_v_coord = vertex_index_to_pixel_map.get(v_idx)
-                            if target_v_coord:
+                            target_v_coord = v_idx
+                            if target_v_coord in self.board.boardGraph:
                                 if llm_player.build_settlement(target_v_coord, self.board):
                                     print(f"LLM {llm_player.name} built settlement at vertex index {v_idx}.")
                                     valid_action_executed_this_step = True
@@ -477,7 +470,7 @@ class catanGame():
                                     last_action_error_details = f"Cannot build settlement: {llm_player.name} lacks resources or settlement pieces."
                             else:
                                 last_action_status = "internal_error"
-                                last_action_error_details = f"Invalid vertex index {v_idx} (no pixel map)."
+                                last_action_error_details = f"Invalid vertex index {v_idx} (not on board)."
                         else:
                             last_action_status = "invalid_placement"
                             last_action_error_details = "Proposed settlement location is invalid (occupied, too close, or not connected)."
@@ -498,9 +491,8 @@ class catanGame():
                         chosen_road_pair = tuple(sorted((v1_idx, v2_idx)))
 
                         if chosen_road_pair in potential_roads_idx_pairs:
-                            target_v1_coord = vertex_index_to_pixel_map.get(v1_idx)
-                            target_v2_coord = vertex_index_to_pixel_map.get(v2_idx)
-                            if target_v1_coord and target_v2_coord:
+                            target_v1_coord, target_v2_coord = v1_idx, v2_idx
+                            if target_v1_coord in self.board.boardGraph and target_v2_coord in self.board.boardGraph:
                                 if llm_player.build_road(target_v1_coord, target_v2_coord, self.board, setup_phase=False): # setup_phase is False here
                                     print(f"LLM {llm_player.name} built road between vertex indices {v1_idx} and {v2_idx}.")
                                     valid_action_executed_this_step = True
@@ -511,7 +503,7 @@ class catanGame():
                                     last_action_error_details = f"Cannot build road: {llm_player.name} lacks resources or road pieces."
                             else:
                                 last_action_status = "internal_error"
-                                last_action_error_details = f"Invalid vertex indices {v1_idx}, {v2_idx} (no pixel map)."
+                                last_action_error_details = f"Invalid vertex indices {v1_idx}, {v2_idx} (not on board)."
                         else:
                             last_action_status = "invalid_placement"
                             last_action_error_details = "Proposed road location is invalid (occupied, not connected, or rule violation)."
@@ -524,8 +516,8 @@ class catanGame():
                 if v_idx is not None:
                     potential_cities_indices = current_model_state.available_actions.get("build_city", [])
                     if v_idx in potential_cities_indices:
-                        target_v_coord = vertex_index_to_pixel_map.get(v_idx)
-                        if target_v_coord:
+                        target_v_coord = v_idx
+                        if target_v_coord in self.board.boardGraph:
                             if llm_player.build_city(target_v_coord, self.board):
                                 print(f"LLM {llm_player.name} built city at vertex index {v_idx}.")
                                 valid_action_executed_this_step = True
@@ -535,7 +527,7 @@ class catanGame():
                                 last_action_error_details = f"Cannot build city: {llm_player.name} lacks resources or city pieces, or no settlement to upgrade."
                         else:
                             last_action_status = "internal_error"
-                            last_action_error_details = f"Invalid vertex index {v_idx} (no pixel map)."
+                            last_action_error_details = f"Invalid vertex index {v_idx} (not on board)."
                     else:
                         last_action_status = "invalid_placement"
                         last_action_error_details = "Proposed city location is invalid (no settlement to upgrade or rule violation)."
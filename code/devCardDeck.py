@@ -0,0 +1,56 @@
+#Settlers of Catan
+#Development card deck
+
+#Cards in the standard deck
+DEV_CARD_COUNTS = {'KNIGHT':15, 'VP':5, 'MONOPOLY':2, 'ROADBUILDER':2, 'YEAROFPLENTY':2}
+
+
+#Class for the development card deck - shuffled once when the game starts, then drawn from the top
+#The card order is an immutable tuple and drawing only moves a pointer, so a snapshot is just the pointer
+class DevCardDeck():
+    'Shuffled development card deck with O(1) draws'
+
+    #rng: numpy Generator the deck is shuffled with - the deck stream of the game's GameRNG
+    def __init__(self, rng, cardCounts=DEV_CARD_COUNTS):
+        cards = [cardName for cardName, cardAmount in cardCounts.items() for i in range(cardAmount)]
+        self.cards = tuple(cards[i] for i in rng.permutation(len(cards)))
+        self.top = 0 #Index of the next card to draw
+        self.remaining = dict(cardCounts) #Cards left by type
+
+        return None
+
+
+    #Number of cards left in the deck
+    def __len__(self):
+        return len(self.cards) - self.top
+
+
+    #Function to draw the top card, returns None when the deck is empty
+    def draw(self):
+        if self.top == len(self.cards):
+            return None
+        cardDrawn = self.cards[self.top]
+        self.top += 1
+        self.remaining[cardDrawn] -= 1
+        return cardDrawn
+
+
+    #Function to get the number of cards left of each type
+    def remaining_counts(self):
+        return dict(self.remaining)
+
+
+    #Function to reshuffle the cards not drawn yet - e.g. for search, where the real order is unknown to the player
+    def shuffle_remaining(self, rng):
+        undrawnCards = self.cards[self.top:]
+        self.cards = self.cards[:self.top] + tuple(undrawnCards[i] for i in rng.permutation(len(undrawnCards)))
+
+
+    #Function to get an immutable snapshot of the deck
+    def snapshot(self):
+        return (self.cards, self.top, tuple(self.remaining.items()))
+
+    #Function to return the deck to a snapshot
+    def restore(self, snapshot):
+        self.cards, self.top, remaining = snapshot
+        self.remaining = dict(remaining)
@@ -0,0 +1,264 @@
+#Settlers of Catan
+#Structured game event log with level gating, a ring buffer and pluggable sinks
+
+import collections, contextlib, json, marshal, struct, sys
+
+#Event levels, same values as the logging module
+DEBUG, INFO, WARNING, OFF = 10, 20, 30, 100
+
+#One logged event - fields is a dict of plain values (names, ints, strings) so every sink can serialize it
+Event = collections.namedtuple('Event', ['turn', 'level', 'type', 'fields'])
+
+
+#Console text of the failure events, keyed by (piece, reason)
+BUILD_FAILED_TEXT = {
+    ('ROAD', 'NO_PIECES_SETUP'): "{player} has no roads left to build during setup.",
+    ('ROAD', 'NO_PIECES'): "{player} has no roads available to build.",
+    ('ROAD', 'NO_RESOURCES'): "{player} has insufficient Resources to Build Road - Need 1 BRICK, 1 WOOD.",
+    ('SETTLEMENT', 'NO_PIECES'): "No settlements available to build",
+    ('SETTLEMENT', 'NO_RESOURCES'): "Insufficient Resources to Build Settlement. Build Cost: 1 BRICK, 1 WOOD, 1 WHEAT, 1 SHEEP",
+    ('CITY', 'NO_PIECES'): "No cities available to build",
+    ('CITY', 'NO_RESOURCES'): "Insufficient Resources to Build City. Build Cost: 3 ORE, 2 WHEAT",
+    ('DEVCARD', 'NO_RESOURCES'): "Insufficient Resources for Dev Card. Cost: 1 ORE, 1 WHEAT, 1 SHEEP",
+    ('DEVCARD', 'NO_PIECES'): "No Dev Cards Left!",
+}
+
+def payout_text(fields):
+    paid = ", ".join("{} {} to {}".format(amount, resource, name) for name, resource, amount in fields['payouts'])
+    return "GameLogicManager: Dice roll {} pays {}\nGameLogicManager: Resource distribution complete.".format(fields['roll'], paid or 'nothing')
+
+def steal_text(fields):
+    if fields['victim'] is None:
+        return "No Player on this hex to Rob"
+    if fields['resource'] is None:
+        return "Player {victim} has no resources to steal.".format(**fields)
+    return "{player} stole 1 {resource} from Player {victim}".format(**fields)
+
+def bank_trade_text(fields):
+    if fields['ratio'] == 2:
+        return "Traded 2 {give} for 1 {get} using {give} Port".format(**fields)
+    if fields['ratio'] == 3:
+        return "Traded 3 {give} for 1 {get} using 3:1 Port".format(**fields)
+    return "Traded 4 {give} for 1 {get}".format(**fields)
+
+def heuristic_robber_text(fields):
+    if fields['victim'] is None:
+        return "{player} (Heuristic) moved robber to hex {hex}, no player was robbed.".format(**fields)
+    if fields['resource'] is None:
+        return "{player} (Heuristic) moved robber to hex {hex} and targeted {victim}, but they had no resources.".format(**fields)
+    return "{player} (Heuristic) successfully robbed {victim} of a {resource} at hex {hex}.".format(**fields)
+
+def chat_text(fields):
+    if fields['channel'] == 'global':
+        return "[Global Chat | {player}]: {text}".format(**fields)
+    if fields['channel'] == 'private':
+        return "[Private Chat | {player} to {to}]: {text}".format(**fields)
+    return fields['text'] #Diplomacy lines carry their full text
+
+def llm_action_text(fields):
+    if fields['phase'] == 'setup':
+        return "{player} (Setup Thoughts: {thoughts}) -> Action: {action}".format(**fields)
+    if fields['phase'] == 'turn':
+        return "{player} (Turn Action {step}, Thoughts: {thoughts}) -> Action: {action}".format(**fields)
+    if fields['phase'] == 'robber':
+        return "{player} (Robber Thoughts: {thoughts}) -> Robber Action: {action}".format(**fields)
+    return "{player} (Discard Thoughts: {thoughts}) -> Discard Action: {action}".format(**fields)
+
+#Console text of the LLM API call stages
+LLM_CALL_TEXT = {
+    'client': "Gemini client initialized for {player}",
+    'request': "Attempting Gemini API call for {player} using genai.Client pattern...",
+    'response': "SUCCESS: Gemini API call for {player} completed using genai.Client.",
+}
+
+SETUP_ORDINALS = {1: 'first', 2: 'second'}
+
+def setup_prompt_text(fields):
+    ordinal, piece = SETUP_ORDINALS[fields['round']], fields['piece'].lower()
+    if fields['attempt'] > 1:
+        return "Re-prompting {} for {} {} (attempt {}, last attempt: {})".format(fields['player'], ordinal, piece, fields['attempt'], fields['status'])
+    if fields['piece'] == 'ROAD':
+        return "{} to place {} road connected to settlement at {}.".format(fields['player'], ordinal, fields['vertex'])
+    return "{} to place {} settlement.".format(fields['player'], ordinal)
+
+def setup_failed_text(fields):
+    return "CRITICAL: {} failed to place {} {} after {} attempts.".format(fields['player'], SETUP_ORDINALS[fields['round']], fields['piece'].lower(), fields['attempts'])
+
+#Console text of each event type - reproduces the messages the game printed before it had an event log
+#A format string, a function of the fields, or None for events with no console message
+CONSOLE_FORMATS = {
+    'GAME_START': None,
+    'GAME_END': None,
+    'PHASE_TIMES': None, #Phase latency summary at the end of a game, see phaseTimers.py
+    'PROMPT_STATS': None, #Prompt prefix/suffix sizes and prefix hits of the LLM players at the end of a game, see promptStats.py
+    'NEW_PLAYER': "Added new AI Player: {player}",
+    'SETUP_PHASE': "\n--- Initial Setup Phase ---",
+    'SETUP_TURN': "\nSetup Turn {round}: {player}",
+    'SETUP_PROMPT': setup_prompt_text, #An LLM player is asked for a setup piece - vertex: the settlement a road connects to, status: why the last attempt was rejected
+    'SETUP_FAILED': setup_failed_text,
+    'SETUP_RESOURCE': "{player} collects 1 {resource} from second settlement.",
+    'SETUP_COMPLETE': "\n--- Initial Setup Complete ---",
+    'TURN_START': "---------------------------------------------------------------------------\n--- {player}'s Turn (Color: {color}) ---",
+    'DICE_ROLL': "GameLogicManager: Dice Roll = {roll} ({dice_1}, {dice_2})",
+    'PAYOUT': payout_text,
+    'DISTRIBUTE_ON_SEVEN': "GameLogicManager: distribute_resources called with 7, but it should be handled by main game loop's 7-roll logic.",
+    'ROBBER_ACTIVATED': "---------------------------------------------------------------------------\nDice roll is 7! Robber activates. Players with >7 cards must discard.\n---------------------------------------------------------------------------",
+    'MUST_DISCARD': "Player {player} has {total} resources and must discard {count}.",
+    'DISCARD': "{player} ({kind}) discarded: {resources}",
+    'MOVE_ROBBER': None,
+    'STEAL': steal_text,
+    'HEURISTIC_ROBBER': heuristic_robber_text,
+    'AI_PLAYING': "AI Player {player} playing...",
+    'BUILD_ROAD': "{player} Built a Road. MaxRoadLength: {length}",
+    'BUILD_SETTLEMENT': "{player} Built a Settlement",
+    'PORT_ACCESS': "{player} now has {port} Port access",
+    'BUILD_CITY': "{player} Built a City",
+    'BUILD_FAILED': lambda fields: BUILD_FAILED_TEXT[fields['piece'], fields['reason']].format(**fields),
+    'DRAW_DEV_CARD': "{player} drew a {card} from Development Card Stack",
+    'PLAY_DEV_CARD': "Playing Dev Card: {card}",
+    'DEV_CARD_RESOURCES': None,
+    'BANK_TRADE': bank_trade_text,
+    'BANK_TRADE_FAILED': "Insufficient resource {give} to trade with Bank",
+    'LONGEST_ROAD_LOST': "GameLogicManager: {player} loses Longest Road.",
+    'LONGEST_ROAD': "GameLogicManager: {player} now has Longest Road with length {length}.",
+    'LARGEST_ARMY_LOST': "GameLogicManager: {player} loses Largest Army.",
+    'LARGEST_ARMY': "GameLogicManager: {player} now has Largest Army with {knights} knights.",
+    'TURN_END': "Player:{player}, Resources:{resources}, Points: {points}",
+    'TURN_LIMIT': "Turn limit of {maxTurns} reached.",
+    'CHAT': chat_text,
+    'LLM_ACTION': llm_action_text,
+    'LLM_WAIT': "Waiting for {player} ({llm_type}) to respond...",
+    'LLM_CALL': lambda fields: LLM_CALL_TEXT[fields['stage']].format(**fields),
+    'LLM_ERROR': "ERROR FOR {player}: {error}",
+    'NEGOTIATION': "{text}",
+    'PLAYER_TRADE': None, #Printed as the negotiation's messages
+    'MESSAGE': "{text}", #Free form diagnostics
+}
+
+
+#Sink that prints each event as the game's console text
+class ConsoleSink():
+    'Prints events as the original console messages'
+
+    def __init__(self, stream=None):
+        self.stream = stream #None follows sys.stdout, so redirect_stdout still applies
+
+    def write(self, event):
+        text = CONSOLE_FORMATS.get(event.type)
+        if text is None:
+            return
+        print(text(event.fields) if callable(text) else text.format(**event.fields), file=self.stream or sys.stdout)
+
+    def close(self):
+        pass
+
+
+#Sink that writes one JSON object per event - {"turn", "level", "type", **fields}
+class JsonlSink():
+    'Writes events as JSON lines'
+
+    def __init__(self, path):
+        self.file = open(path, 'w')
+
+    def write(self, event):
+        self.file.write(json.dumps(dict(event.fields, turn=event.turn, level=event.level, type=event.type)))
+        self.file.write('\n')
+
+    def close(self):
+        self.file.close()
+
+
+#Sink that writes events with marshal, a list of up to chunkSize events at a time behind its byte length
+#Chunks keep the per call overhead of marshal off each event - smaller than JSON lines and several times faster to read back
+class BinarySink():
+    'Writes events as marshalled chunks'
+
+    def __init__(self, path, chunkSize=256):
+        self.file = open(path, 'wb')
+        self.chunkSize = chunkSize
+        self.chunk = []
+
+    def write(self, event):
+        self.chunk.append(tuple(event))
+        if len(self.chunk) == self.chunkSize:
+            self.flush()
+
+    def flush(self):
+        if self.chunk:
+            data = marshal.dumps(self.chunk)
+            self.file.write(struct.pack('<I', len(data)))
+            self.file.write(data)
+            self.chunk = []
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+#Function to read the events of a JSON lines log
+def read_jsonl(path):
+    with open(path) as logFile:
+        for line in logFile:
+            fields = json.loads(line)
+            yield Event(fields.pop('turn'), fields.pop('level'), fields.pop('type'), fields)
+
+#Function to read the events of a binary log
+def read_binary(path):
+    with open(path, 'rb') as logFile:
+        data = logFile.read()
+    offset = 0
+    while offset < len(data):
+        chunkLength, = struct.unpack_from('<I', data, offset)
+        offset += 4
+        for event in marshal.loads(data[offset:offset + chunkLength]):
+            yield Event(*event)
+        offset += chunkLength
+
+
+#Class for the game event log
+#Call sites check the level before building the event, so a disabled level costs one comparison:
+#    if log.level <= INFO:
+#        log.emit(INFO, 'BUILD_CITY', player=self.name, vertex=vCoord)
+#Every emitted event goes to a bounded ring buffer of the latest events and then to each sink
+class EventLog():
+    'Level gated structured game events'
+
+    def __init__(self, level=DEBUG, capacity=4096, sinks=None):
+        self.level = level
+        self.buffer = collections.deque(maxlen=capacity)
+        self.sinks = [ConsoleSink()] if sinks is None else list(sinks)
+        self.turn = 0 #Turn the game is on, stamped on every event
+
+        return None
+
+    #Function to record an event - the caller has already checked the level
+    def emit(self, level, eventType, **fields):
+        event = Event(self.turn, level, eventType, fields)
+        self.buffer.append(event)
+        for sink in self.sinks:
+            sink.write(event)
+
+    #Function to get the latest n events from the ring buffer
+    def tail(self, n=20):
+        return list(self.buffer)[-n:]
+
+    #Context manager to use a level and sinks for a block, e.g. one simulated game
+    #The previous level and sinks come back afterwards, the sinks of the block are closed
+    @contextlib.contextmanager
+    def configured(self, level=None, sinks=None):
+        previous = self.level, self.sinks
+        if level is not None:
+            self.level = level
+        if sinks is not None:
+            self.sinks = list(sinks)
+        try:
+            yield self
+        finally:
+            if sinks is not None:
+                for sink in self.sinks:
+                    sink.close()
+            self.level, self.sinks = previous
+
+
+#The event log of the process - engine modules emit to it
+log = EventLog()
@@ -0,0 +1,52 @@
+#Settlers of Catan
+#Per-game random number streams
+
+import numpy as np
+
+#Number of dice rolls generated at a time
+DICE_BLOCK_SIZE = 256
+
+
+#Class to hold the random number generators of one game
+#The game seed is split with SeedSequence.spawn into independent sub-streams for the dice, the dev card deck,
+#the board layout and the agents, so a draw in one never shifts the others - e.g. an AI making an extra
+#random choice doesn't change the dice that follow. Dice are served from pre-generated blocks, and the deck
+#stream shuffles the dev card deck once (see devCardDeck.py)
+class GameRNG():
+    'Independent dice, deck, board and agent random streams of a game'
+
+    #seed: int, SeedSequence or None for fresh entropy
+    #diceSeed: optional separate seed of the dice stream, to replay the same dice with everything else varied
+    def __init__(self, seed=None, diceSeed=None):
+        self.seedSequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        diceSequence, deckSequence, boardSequence, self.agentSequence = self.seedSequence.spawn(4)
+        if diceSeed is not None:
+            diceSequence = np.random.SeedSequence(diceSeed)
+
+        self.dice = np.random.default_rng(diceSequence)
+        self.deck = np.random.default_rng(deckSequence)
+        self.board = np.random.default_rng(boardSequence)
+
+        self.diceBlock, self.diceIndex = [], 0
+
+        return None
+
+
+    #Function to generate the next block of dice, shape (DICE_BLOCK_SIZE, 2)
+    #Every consumer of the dice stream (roll_dice, batchSim.draw_dice) reads it block by block so they stay identical
+    def next_dice_block(self):
+        return self.dice.integers(1, 7, size=(DICE_BLOCK_SIZE, 2), dtype=np.int8)
+
+
+    #Function to roll two dice - returns (dice_1, dice_2)
+    def roll_dice(self):
+        if self.diceIndex == len(self.diceBlock):
+            self.diceBlock, self.diceIndex = [tuple(dice) for dice in self.next_dice_block().tolist()], 0
+        dice = self.diceBlock[self.diceIndex]
+        self.diceIndex += 1
+        return dice
+
+
+    #Function to get an independent generator for the next agent of the game, in seating order
+    def agent_rng(self):
+        return np.random.default_rng(self.agentSequence.spawn(1)[0])
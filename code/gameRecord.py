@@ -0,0 +1,330 @@
+#Settlers of Catan
+#Compact append-only binary game records
+
+import json, os, struct
+import numpy as np
+from boardGenerator import RESOURCE_TYPES, BoardLayout
+from boardTopology import get_standard_topology
+from devCardDeck import DEV_CARD_COUNTS
+from eventLog import Event, DEBUG, INFO
+
+#File layout: a 16 byte header, then fixed 8 byte records - any number of games back to back
+#A record is (type u8, seat u8, turn u16, a u16, b u16), little endian. Free text (names, chat, LLM thoughts)
+#follows its record as TEXT continuation records, each a type byte and 7 bytes of UTF-8
+HEADER = struct.Struct('<8sHHI') #magic, version, record size, reserved
+MAGIC, VERSION = b'CATANREC', 1
+RECORD = struct.Struct('<BBHHH')
+RECORD_DTYPE = np.dtype([('type', '<u1'), ('seat', '<u1'), ('turn', '<u2'), ('a', '<u2'), ('b', '<u2')])
+TEXT_BYTES = RECORD.size - 1
+
+NONE = 0xFF #No seat / no resource in a u8 or packed u8 slot
+NO_VALUE = 0xFFFF #No value in a u16 slot
+
+#Record types, code = position. Fields of each type:
+#  GAME_START     seat: number of players. Followed by the PLAYER, HEX, PORT and DECK_CARD records of the game
+#  PLAYER         seat, a: PLAYER_KINDS code, b: name length - name as TEXT
+#  HEX            seat: hex, a: RESOURCE_TYPES code, b: roll number (0 desert)
+#  PORT           seat: port slot, a: PORT_TYPES code
+#  DECK_CARD      seat: position in the shuffled deck, a: DEV_CARD_TYPES code
+#  TURN_START     seat
+#  DICE_ROLL      a: die 1, b: die 2
+#  PAYOUT         seat, a: resource, b: amount - one record per player and resource of a roll
+#  SETUP_RESOURCE seat, a: resource
+#  BUILD_ROAD     seat, a: edge id, b: 1 in setup
+#  BUILD_SETTLEMENT seat, a: vertex, b: 1 in setup
+#  BUILD_CITY     seat, a: vertex
+#  MOVE_ROBBER    seat, a: hex
+#  STEAL          seat, a: victim seat or NO_VALUE, b: resource or NO_VALUE
+#  DISCARD        seat, a: resource, b: amount
+#  DRAW_DEV_CARD  seat, a: card
+#  PLAY_DEV_CARD  seat, a: card
+#  DEV_CARD_RESOURCES seat, a: card, b: resources chosen, first | second << 8 (NONE if unused)
+#  BANK_TRADE     seat, a: resource given | ratio << 8, b: resource received
+#  PLAYER_TRADE   seat: giving player, a: resource | receiving seat << 8, b: amount - one record per resource moved
+#  LONGEST_ROAD   seat, a: road length
+#  LARGEST_ARMY   seat, a: knights played
+#  CHAT           seat, a: CHAT_CHANNELS code | recipient seat << 8, b: text length
+#  NEGOTIATION    seat, a: NEGOTIATION_STATES code, b: text length - the offer history entry as JSON
+#  LLM_ACTION     seat, a: LLM_PHASES code, b: text length - {"step", "thoughts", "action"} as JSON
+#  GAME_END       seat: winner or NONE
+#  TEXT           7 bytes of the text of the record before
+RECORD_TYPES = ('GAME_START', 'PLAYER', 'HEX', 'PORT', 'DECK_CARD', 'TURN_START', 'DICE_ROLL', 'PAYOUT', 'SETUP_RESOURCE',
+                'BUILD_ROAD', 'BUILD_SETTLEMENT', 'BUILD_CITY', 'MOVE_ROBBER', 'STEAL', 'DISCARD', 'DRAW_DEV_CARD',
+                'PLAY_DEV_CARD', 'DEV_CARD_RESOURCES', 'BANK_TRADE', 'PLAYER_TRADE', 'LONGEST_ROAD', 'LARGEST_ARMY',
+                'CHAT', 'NEGOTIATION', 'LLM_ACTION', 'GAME_END', 'TEXT')
+RECORD_CODES = {recordType: code for code, recordType in enumerate(RECORD_TYPES)}
+
+PLAYER_KINDS = ('heuristic', 'chatgpt', 'gemini', 'claude', 'deepseek', 'human', 'mcts')
+DEV_CARD_TYPES = tuple(DEV_CARD_COUNTS)
+CHAT_CHANNELS = ('global', 'private', 'diplomacy')
+NEGOTIATION_STATES = ("IDLE", "PROPOSED", "COUNTERED", "ACCEPTED", "REJECTED", "ENDED_BY_PLAYER", "ENDED_SYSTEM")
+LLM_PHASES = ('turn', 'robber', 'discard', 'setup')
+
+RESOURCE_CODES = {resource: code for code, resource in enumerate(RESOURCE_TYPES)}
+DEV_CARD_CODES = {card: code for code, card in enumerate(DEV_CARD_TYPES)}
+
+
+#Function to write a new file header, or check the header of a file being appended to
+def check_header(recordFile, path):
+    recordFile.seek(0, os.SEEK_END)
+    if recordFile.tell() == 0:
+        recordFile.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0))
+        return
+    recordFile.seek(0)
+    magic, version, recordSize, reserved = HEADER.unpack(recordFile.read(HEADER.size))
+    if magic != MAGIC or version != VERSION or recordSize != RECORD.size:
+        raise ValueError("{} is not a version {} game record".format(path, VERSION))
+    recordFile.seek(0, os.SEEK_END)
+
+
+#Event log sink that encodes the events of games as records - see eventLog.py
+#Records are collected in a bytearray and written in blocks of about bufferSize bytes
+#An existing record file is appended to, so one file can hold any number of games
+class GameRecordSink():
+    'Writes game events as compact binary records'
+
+    def __init__(self, path, bufferSize=1 << 16):
+        self.path = path
+        self.file = open(path, 'a+b')
+        check_header(self.file, path)
+        self.buffer = bytearray()
+        self.bufferSize = bufferSize
+        self.topology = get_standard_topology()
+        self.seats = {} #player name -> seat of the current game
+
+        return None
+
+    #Function to add one record to the buffer
+    def add(self, recordType, seat, turn, a=0, b=0):
+        self.buffer += RECORD.pack(RECORD_CODES[recordType], seat, turn, a, b)
+
+    #Function to add a record followed by its text
+    def add_text(self, recordType, seat, turn, a, text):
+        data = text.encode('utf-8')
+        if len(data) > NO_VALUE: #Longer text is cut to what the length field holds, on a character boundary
+            data = data[:NO_VALUE].decode('utf-8', 'ignore').encode('utf-8')
+        self.add(recordType, seat, turn, a, len(data))
+        textCode = RECORD_CODES['TEXT']
+        for start in range(0, len(data), TEXT_BYTES):
+            self.buffer.append(textCode)
+            self.buffer += data[start:start + TEXT_BYTES].ljust(TEXT_BYTES, b'\0')
+
+    def seat(self, name):
+        return self.seats.get(name, NONE)
+
+    def write(self, event):
+        turn, level, eventType, fields = event
+        if eventType == 'GAME_START':
+            self.seats = {name: seat for seat, name in enumerate(fields['players'])}
+            self.add('GAME_START', len(fields['players']), turn)
+            for seat, (name, kind) in enumerate(zip(fields['players'], fields['kinds'])):
+                self.add_text('PLAYER', seat, turn, PLAYER_KINDS.index(kind) if kind in PLAYER_KINDS else NO_VALUE, name)
+            for hexIndex, (resource, number) in enumerate(zip(fields['resources'], fields['numbers'])):
+                self.add('HEX', hexIndex, turn, resource, number)
+            for slot, port in enumerate(fields['ports']):
+                self.add('PORT', slot, turn, port)
+            for position, card in enumerate(fields['deck']):
+                self.add('DECK_CARD', position, turn, DEV_CARD_CODES[card])
+        elif eventType == 'TURN_START':
+            self.add('TURN_START', self.seat(fields['player']), turn)
+        elif eventType == 'DICE_ROLL':
+            self.add('DICE_ROLL', NONE, turn, fields['dice_1'], fields['dice_2'])
+        elif eventType == 'PAYOUT':
+            for name, resource, amount in fields['payouts']:
+                self.add('PAYOUT', self.seat(name), turn, RESOURCE_CODES[resource], amount)
+        elif eventType == 'SETUP_RESOURCE':
+            self.add('SETUP_RESOURCE', self.seat(fields['player']), turn, RESOURCE_CODES[fields['resource']])
+        elif eventType == 'BUILD_ROAD':
+            self.add('BUILD_ROAD', self.seat(fields['player']), turn, self.topology.get_edge(fields['v1'], fields['v2']), int(fields['setup']))
+        elif eventType == 'BUILD_SETTLEMENT':
+            self.add('BUILD_SETTLEMENT', self.seat(fields['player']), turn, fields['vertex'], int(fields['setup']))
+        elif eventType == 'BUILD_CITY':
+            self.add('BUILD_CITY', self.seat(fields['player']), turn, fields['vertex'])
+        elif eventType == 'MOVE_ROBBER':
+            self.add('MOVE_ROBBER', self.seat(fields['player']), turn, fields['hex'])
+        elif eventType == 'STEAL':
+            victim = NO_VALUE if fields['victim'] is None else self.seat(fields['victim'])
+            resource = NO_VALUE if fields['resource'] is None else RESOURCE_CODES[fields['resource']]
+            self.add('STEAL', self.seat(fields['player']), turn, victim, resource)
+        elif eventType == 'DISCARD':
+            for resource, amount in fields['resources'].items():
+                self.add('DISCARD', self.seat(fields['player']), turn, RESOURCE_CODES[resource], amount)
+        elif eventType == 'DRAW_DEV_CARD':
+            self.add('DRAW_DEV_CARD', self.seat(fields['player']), turn, DEV_CARD_CODES[fields['card']])
+        elif eventType == 'PLAY_DEV_CARD':
+            self.add('PLAY_DEV_CARD', self.seat(fields['player']), turn, DEV_CARD_CODES[fields['card']])
+        elif eventType == 'DEV_CARD_RESOURCES':
+            codes = [RESOURCE_CODES[resource] for resource in fields['resources']] + [NONE, NONE]
+            self.add('DEV_CARD_RESOURCES', self.seat(fields['player']), turn, DEV_CARD_CODES[fields['card']], codes[0] | codes[1] << 8)
+        elif eventType == 'BANK_TRADE':
+            self.add('BANK_TRADE', self.seat(fields['player']), turn, RESOURCE_CODES[fields['give']] | fields['ratio'] << 8, RESOURCE_CODES[fields['get']])
+        elif eventType == 'PLAYER_TRADE':
+            player, partner = self.seat(fields['player']), self.seat(fields['partner'])
+            for resource, amount in fields['give'].items():
+                self.add('PLAYER_TRADE', player, turn, RESOURCE_CODES[resource] | partner << 8, amount)
+            for resource, amount in fields['get'].items():
+                self.add('PLAYER_TRADE', partner, turn, RESOURCE_CODES[resource] | player << 8, amount)
+        elif eventType == 'LONGEST_ROAD':
+            self.add('LONGEST_ROAD', self.seat(fields['player']), turn, fields['length'])
+        elif eventType == 'LARGEST_ARMY':
+            self.add('LARGEST_ARMY', self.seat(fields['player']), turn, fields['knights'])
+        elif eventType == 'CHAT':
+            recipient = NONE if fields['to'] is None else self.seat(fields['to'])
+            self.add_text('CHAT', self.seat(fields['player']), turn, CHAT_CHANNELS.index(fields['channel']) | recipient << 8, fields['text'])
+        elif eventType == 'NEGOTIATION':
+            player = NONE if fields['player'] is None else self.seat(fields['player'])
+            self.add_text('NEGOTIATION', player, turn, NEGOTIATION_STATES.index(fields['state']), json.dumps(fields['entry'], default=str))
+        elif eventType == 'LLM_ACTION':
+            text = json.dumps({'step': fields['step'], 'thoughts': fields['thoughts'], 'action': fields['action']}, default=str)
+            self.add_text('LLM_ACTION', self.seat(fields['player']), turn, LLM_PHASES.index(fields['phase']), text)
+        elif eventType == 'GAME_END':
+            self.add('GAME_END', NONE if fields['winner'] is None else self.seat(fields['winner']), turn)
+        else: #Console only events
+            return
+
+        if len(self.buffer) >= self.bufferSize:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.buffer = bytearray()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+#Class to read a record file - the records are a read only numpy memmap, so files of millions of games
+#open instantly and whole columns can be analysed without decoding, e.g. every roll of every game:
+#    diceRolls = record.records[record.records['type'] == RECORD_CODES['DICE_ROLL']]
+class GameRecord():
+    'Memory mapped game records'
+
+    def __init__(self, path):
+        with open(path, 'rb') as recordFile:
+            magic, version, recordSize, reserved = HEADER.unpack(recordFile.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or recordSize != RECORD.size:
+            raise ValueError("{} is not a version {} game record".format(path, VERSION))
+        if os.path.getsize(path) == HEADER.size:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        else:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size)
+        self.gameStarts = np.flatnonzero(self.records['type'] == RECORD_CODES['GAME_START'])
+
+        return None
+
+    #Number of games in the file
+    def __len__(self):
+        return len(self.gameStarts)
+
+    #Function to get the records of one game
+    def game_records(self, gameIndex):
+        end = self.gameStarts[gameIndex + 1] if gameIndex + 1 < len(self.gameStarts) else len(self.records)
+        return self.records[self.gameStarts[gameIndex]:end]
+
+    #Function to get the text that follows record i of a record array
+    def text(self, records, i):
+        numBytes = int(records['b'][i])
+        numRecords = -(-numBytes // TEXT_BYTES)
+        data = records[i + 1:i + 1 + numRecords].view(np.uint8).reshape(-1, RECORD.size)[:, 1:].tobytes()
+        return data[:numBytes].decode('utf-8')
+
+    #Function to get the player names and kinds, board layout and deck order a game started with
+    def game_setup(self, gameIndex):
+        records = self.game_records(gameIndex)
+        types = records['type']
+        playerRows = np.flatnonzero(types == RECORD_CODES['PLAYER'])
+        hexRows = np.flatnonzero(types == RECORD_CODES['HEX'])
+        portRows = np.flatnonzero(types == RECORD_CODES['PORT'])
+        deckRows = np.flatnonzero(types == RECORD_CODES['DECK_CARD'])
+
+        players = [self.text(records, i) for i in playerRows]
+        kinds = [PLAYER_KINDS[code] if code < len(PLAYER_KINDS) else None for code in records['a'][playerRows].tolist()]
+        layout = BoardLayout(records['a'][hexRows].astype(np.int8), records['b'][hexRows].astype(np.int8), records['a'][portRows].astype(np.int8))
+        deck = tuple(DEV_CARD_TYPES[code] for code in records['a'][deckRows].tolist())
+        return players, kinds, layout, deck
+
+    #Function to decode one game back into event log Events, e.g. to print it with a ConsoleSink or convert it to JSON
+    #Only the fields kept in the record come back - console text such as MaxRoadLength of a road is not stored
+    def events(self, gameIndex):
+        records = self.game_records(gameIndex)
+        players, kinds, layout, deck = self.game_setup(gameIndex)
+        name = lambda seat: None if seat >= len(players) else players[seat]
+        resource = lambda code: None if code >= len(RESOURCE_TYPES) else RESOURCE_TYPES[code]
+        edgeVertices = get_standard_topology().edge_vertices
+
+        yield Event(0, INFO, 'GAME_START', {'players': players, 'kinds': kinds, 'resources': layout.resources.tolist(),
+                                          'numbers': layout.numbers.tolist(), 'ports': layout.ports.tolist(), 'deck': list(deck)})
+        for i, (code, seat, turn, a, b) in enumerate(records.tolist()):
+            recordType = RECORD_TYPES[code]
+            if recordType == 'TURN_START':
+                yield Event(turn, INFO, 'TURN_START', {'player': name(seat)})
+            elif recordType == 'DICE_ROLL':
+                yield Event(turn, INFO, 'DICE_ROLL', {'roll': a + b, 'dice_1': a, 'dice_2': b})
+            elif recordType == 'PAYOUT':
+                yield Event(turn, INFO, 'PAYOUT', {'payouts': [(name(seat), resource(a), b)]})
+            elif recordType == 'SETUP_RESOURCE':
+                yield Event(turn, INFO, 'SETUP_RESOURCE', {'player': name(seat), 'resource': resource(a)})
+            elif recordType == 'BUILD_ROAD':
+                v1, v2 = edgeVertices[a]
+                yield Event(turn, INFO, 'BUILD_ROAD', {'player': name(seat), 'v1': v1, 'v2': v2, 'setup': bool(b)})
+            elif recordType == 'BUILD_SETTLEMENT':
+                yield Event(turn, INFO, 'BUILD_SETTLEMENT', {'player': name(seat), 'vertex': a, 'setup': bool(b)})
+            elif recordType == 'BUILD_CITY':
+                yield Event(turn, INFO, 'BUILD_CITY', {'player': name(seat), 'vertex': a})
+            elif recordType == 'MOVE_ROBBER':
+                yield Event(turn, INFO, 'MOVE_ROBBER', {'player': name(seat), 'hex': a})
+            elif recordType == 'STEAL':
+                yield Event(turn, INFO, 'STEAL', {'player': name(seat), 'victim': None if a == NO_VALUE else name(a), 'resource': resource(b)})
+            elif recordType == 'DISCARD':
+                yield Event(turn, INFO, 'DISCARD', {'player': name(seat), 'resources': {resource(a): b}})
+            elif recordType == 'DRAW_DEV_CARD':
+                yield Event(turn, INFO, 'DRAW_DEV_CARD', {'player': name(seat), 'card': DEV_CARD_TYPES[a]})
+            elif recordType == 'PLAY_DEV_CARD':
+                yield Event(turn, INFO, 'PLAY_DEV_CARD', {'player': name(seat), 'card': DEV_CARD_TYPES[a]})
+            elif recordType == 'DEV_CARD_RESOURCES':
+                chosen = [resource(code) for code in (b & 0xFF, b >> 8) if code != NONE]
+                yield Event(turn, INFO, 'DEV_CARD_RESOURCES', {'player': name(seat), 'card': DEV_CARD_TYPES[a], 'resources': chosen})
+            elif recordType == 'BANK_TRADE':
+                yield Event(turn, INFO, 'BANK_TRADE', {'player': name(seat), 'give': resource(a & 0xFF), 'get': resource(b), 'ratio': a >> 8})
+            elif recordType == 'PLAYER_TRADE':
+                yield Event(turn, INFO, 'PLAYER_TRADE', {'player': name(seat), 'partner': name(a >> 8), 'give': {resource(a & 0xFF): b}, 'get': {}})
+            elif recordType == 'LONGEST_ROAD':
+                yield Event(turn, INFO, 'LONGEST_ROAD', {'player': name(seat), 'length': a})
+            elif recordType == 'LARGEST_ARMY':
+                yield Event(turn, INFO, 'LARGEST_ARMY', {'player': name(seat), 'knights': a})
+            elif recordType == 'CHAT':
+                yield Event(turn, INFO, 'CHAT', {'player': name(seat), 'channel': CHAT_CHANNELS[a & 0xFF], 'to': name(a >> 8), 'text': self.text(records, i)})
+            elif recordType == 'NEGOTIATION':
+                yield Event(turn, INFO, 'NEGOTIATION', {'player': name(seat), 'state': NEGOTIATION_STATES[a], 'entry': json.loads(self.text(records, i))})
+            elif recordType == 'LLM_ACTION':
+                level = INFO if LLM_PHASES[a] == 'setup' else DEBUG #Setup decisions are logged at INFO, turn decisions at DEBUG
+                yield Event(turn, level, 'LLM_ACTION', dict(json.loads(self.text(records, i)), player=name(seat), phase=LLM_PHASES[a]))
+            elif recordType == 'GAME_END':
+                yield Event(turn, INFO, 'GAME_END', {'winner': name(seat)})
+
+
+if __name__ == '__main__':
+    import tempfile, time
+    from AIGame import catanAIGame
+    from eventLog import log, JsonlSink
+
+    numGames = 50
+    recordPath = os.path.join(tempfile.mkdtemp(), 'games.rec')
+    jsonPath = recordPath.replace('.rec', '.jsonl')
+    with log.configured(level=INFO, sinks=[GameRecordSink(recordPath), JsonlSink(jsonPath)]):
+        for seed in range(numGames):
+            catanAIGame(headless=True, roster=['heuristic']*4, seed=seed, maxTurns=1000)
+
+    print("Record: {} bytes, JSON lines: {} bytes".format(os.path.getsize(recordPath), os.path.getsize(jsonPath)))
+
+    startTime = time.perf_counter()
+    record = GameRecord(recordPath)
+    diceRecords = record.records[record.records['type'] == RECORD_CODES['DICE_ROLL']]
+    rollCounts = np.bincount(diceRecords['a'].astype(np.intp) + diceRecords['b'], minlength=13)[2:]
+    print("Opened {} games and counted {} rolls in {:.4f}s: {}".format(len(record), len(diceRecords), time.perf_counter() - startTime, rollCounts.tolist()))
+
+    startTime = time.perf_counter()
+    with open(jsonPath) as jsonFile:
+        rolls = [json.loads(line) for line in jsonFile]
+    print("Parsed the JSON lines in {:.4f}s".format(time.perf_counter() - startTime))
@@ -0,0 +1,56 @@
+#Settlers of Catan
+#Game state snapshots for search and rollouts
+
+from collections import namedtuple
+
+#Immutable snapshot of a whole position - the board part and one entry per player
+GameSnapshot = namedtuple("GameSnapshot", ["board", "players"])
+
+
+#Class to snapshot and restore the state of a game - the board and its players
+#Snapshots are tuples of immutable values, so they can be kept and restored any number of times
+#and in any order. Restoring only rewrites the parts of the board that differ, which is much cheaper
+#than a deepcopy of the object graph for lookahead that branches many times per decision
+class GameState():
+    'Snapshot/restore of a catanBoard and its players'
+
+    def __init__(self, board, players):
+        self.board = board
+        self.players = list(players)
+
+    #Function to capture the current position
+    def snapshot(self):
+        return GameSnapshot(self.board.snapshot(), tuple(player_i.snapshot() for player_i in self.players))
+
+    #Function to return the board and players to a captured position
+    def restore(self, snapshot):
+        self.board.restore(snapshot.board)
+        for player_i, playerSnapshot in zip(self.players, snapshot.players):
+            player_i.restore(playerSnapshot)
+
+
+if __name__ == '__main__':
+    import contextlib, copy, io, time
+    from board import catanBoard
+    from heuristicAIPlayer import heuristicAIPlayer
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        board = catanBoard(seed=0)
+        players = [heuristicAIPlayer('Player{}'.format(i), 'black') for i in range(4)]
+        for player_i in players:
+            player_i.updateAI()
+        for player_i in players + players[::-1]:
+            player_i.initial_setup(board)
+
+    state = GameState(board, players)
+    iterations = 1000
+    startTime = time.perf_counter()
+    for i in range(iterations):
+        snapshot = state.snapshot()
+        state.restore(snapshot)
+    print("snapshot + restore: {:.1f}us".format((time.perf_counter() - startTime)/iterations*1e6))
+
+    startTime = time.perf_counter()
+    for i in range(iterations//10):
+        copy.deepcopy((board, players))
+    print("deepcopy: {:.1f}us".format((time.perf_counter() - startTime)/(iterations//10)*1e6))
@@ -8,8 +8,6 @@ from hexTile import *
 from hexLib import *
 from LLMPlayer import LLMPlayer
 
-pygame.init()
-
 # --- Constants for GUI Enhancement ---
 # Colors - More vibrant and distinct palette
 COLOR_BACKGROUND = pygame.Color('lightskyblue3') # Brighter, more inviting background
@@ -48,37 +46,44 @@ RESOURCE_TEXT_OFFSET_X = 5 # Space between icon and text
 THOUGHT_BUBBLE_COLOR = pygame.Color(200, 200, 200, 180) # For LLM thoughts
 
 # --- Fonts ---
-# Using more common and clear fonts if specific ones aren't found
-try:
-    FONT_PRIMARY_NAME = 'Arial' # Changed to Arial for wider availability
-    FONT_SECONDARY_NAME = 'Calibri' # Changed to Calibri
-    FONT_TITLE = pygame.font.SysFont(FONT_PRIMARY_NAME, 30, bold=True)
-    FONT_RESOURCE_HEX = pygame.font.SysFont(FONT_PRIMARY_NAME, 15, bold=True) # For hex tile text
-    FONT_PORTS = pygame.font.SysFont(FONT_PRIMARY_NAME, 12, italic=True)
-    FONT_BUTTON = pygame.font.SysFont(FONT_PRIMARY_NAME, 14, bold=True)
-    FONT_DICE_ROLL = pygame.font.SysFont(FONT_PRIMARY_NAME, 32, bold=True) # Larger dice roll
-    FONT_ROBBER_SYMBOL = pygame.font.SysFont(FONT_PRIMARY_NAME, 36, bold=True) # For the 'R'
-    FONT_PLAYER_NAME = pygame.font.SysFont(FONT_SECONDARY_NAME, 16, bold=True) # For player names in panel
-    FONT_PLAYER_DETAILS = pygame.font.SysFont(FONT_SECONDARY_NAME, 13)      # For VP, resources
-    FONT_PLAYER_THOUGHTS = pygame.font.SysFont(FONT_SECONDARY_NAME, 11, italic=True) # For LLM thoughts
-    FONT_CHAT = pygame.font.SysFont(FONT_SECONDARY_NAME, 12)
-    FONT_STATUS = pygame.font.SysFont(FONT_PRIMARY_NAME, 14, bold=True) # For game status like private chat
-except pygame.error:
-    print("Warning: Preferred fonts (Arial, Calibri) not found, using Pygame default.")
-    FONT_PRIMARY_NAME = None
-    FONT_SECONDARY_NAME = None
-    # Fallback to default SysFont if specific names fail
-    FONT_TITLE = pygame.font.SysFont(None, 30, bold=True)
-    FONT_RESOURCE_HEX = pygame.font.SysFont(None, 15, bold=True)
-    FONT_PORTS = pygame.font.SysFont(None, 12, italic=True)
-    FONT_BUTTON = pygame.font.SysFont(None, 14, bold=True)
-    FONT_DICE_ROLL = pygame.font.SysFont(None, 32, bold=True)
-    FONT_ROBBER_SYMBOL = pygame.font.SysFont(None, 36, bold=True)
-    FONT_PLAYER_NAME = pygame.font.SysFont(None, 16, bold=True)
-    FONT_PLAYER_DETAILS = pygame.font.SysFont(None, 13)
-    FONT_PLAYER_THOUGHTS = pygame.font.SysFont(None, 11, italic=True)
-    FONT_CHAT = pygame.font.SysFont(None, 12)
-    FONT_STATUS = pygame.font.SysFont(None, 14, bold=True)
+# Fonts are loaded when the first view is created, so importing this module doesn't initialize SDL
+FONTS = {}
+
+def load_fonts():
+    'Initialize pygame and load the view fonts once per process'
+    if FONTS:
+        return FONTS
+    pygame.init()
+    # Using more common and clear fonts if specific ones aren't found
+    try:
+        primary_name = 'Arial' # Changed to Arial for wider availability
+        secondary_name = 'Calibri' # Changed to Calibri
+        FONTS['FONT_TITLE'] = pygame.font.SysFont(primary_name, 30, bold=True)
+        FONTS['FONT_RESOURCE_HEX'] = pygame.font.SysFont(primary_name, 15, bold=True) # For hex tile text
+        FONTS['FONT_PORTS'] = pygame.font.SysFont(primary_name, 12, italic=True)
+        FONTS['FONT_BUTTON'] = pygame.font.SysFont(primary_name, 14, bold=True)
+        FONTS['FONT_DICE_ROLL'] = pygame.font.SysFont(primary_name, 32, bold=True) # Larger dice roll
+        FONTS['FONT_ROBBER_SYMBOL'] = pygame.font.SysFont(primary_name, 36, bold=True) # For the 'R'
+        FONTS['FONT_PLAYER_NAME'] = pygame.font.SysFont(secondary_name, 16, bold=True) # For player names in panel
+        FONTS['FONT_PLAYER_DETAILS'] = pygame.font.SysFont(secondary_name, 13)      # For VP, resources
+        FONTS['FONT_PLAYER_THOUGHTS'] = pygame.font.SysFont(secondary_name, 11, italic=True) # For LLM thoughts
+        FONTS['FONT_CHAT'] = pygame.font.SysFont(secondary_name, 12)
+        FONTS['FONT_STATUS'] = pygame.font.SysFont(primary_name, 14, bold=True) # For game status like private chat
+    except pygame.error:
+        print("Warning: Preferred fonts (Arial, Calibri) not found, using Pygame default.")
+        # Fallback to default SysFont if specific names fail
+        FONTS['FONT_TITLE'] = pygame.font.SysFont(None, 30, bold=True)
+        FONTS['FONT_RESOURCE_HEX'] = pygame.font.SysFont(None, 15, bold=True)
+        FONTS['FONT_PORTS'] = pygame.font.SysFont(None, 12, italic=True)
+        FONTS['FONT_BUTTON'] = pygame.font.SysFont(None, 14, bold=True)
+        FONTS['FONT_DICE_ROLL'] = pygame.font.SysFont(None, 32, bold=True)
+        FONTS['FONT_ROBBER_SYMBOL'] = pygame.font.SysFont(None, 36, bold=True)
+        FONTS['FONT_PLAYER_NAME'] = pygame.font.SysFont(None, 16, bold=True)
+        FONTS['FONT_PLAYER_DETAILS'] = pygame.font.SysFont(None, 13)
+        FONTS['FONT_PLAYER_THOUGHTS'] = pygame.font.SysFont(None, 11, italic=True)
+        FONTS['FONT_CHAT'] = pygame.font.SysFont(None, 12)
+        FONTS['FONT_STATUS'] = pygame.font.SysFont(None, 14, bold=True)
+    return FONTS
 
 
 #Class to handle catan board display
@@ -92,21 +97,22 @@ class catanGameView():
         board_w, board_h = self.board.size
         self.screen_width = board_w if board_w >= 1280 else 1280 # Increased Min width
         self.screen_height = board_h if board_h >= 800 else 800  # Increased Min height
+        fonts = load_fonts() #Also initializes pygame
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
         pygame.display.set_caption('Settlers of Catan - AI Edition')
 
         # Store fonts in the instance
-        self.font_title = FONT_TITLE # Though not explicitly used yet, good to have
-        self.font_resource_hex = FONT_RESOURCE_HEX
-        self.font_ports = FONT_PORTS
-        self.font_button = FONT_BUTTON
-        self.font_diceRoll = FONT_DICE_ROLL
-        self.font_Robber_symbol = FONT_ROBBER_SYMBOL
-        self.font_player_name = FONT_PLAYER_NAME
-        self.font_player_details = FONT_PLAYER_DETAILS
-        self.font_player_thoughts = FONT_PLAYER_THOUGHTS
-        self.font_chat = FONT_CHAT
-        self.font_status = FONT_STATUS
+        self.font_title = fonts['FONT_TITLE'] # Though not explicitly used yet, good to have
+        self.font_resource_hex = fonts['FONT_RESOURCE_HEX']
+        self.font_ports = fonts['FONT_PORTS']
+        self.font_button = fonts['FONT_BUTTON']
+        self.font_diceRoll = fonts['FONT_DICE_ROLL']
+        self.font_Robber_symbol = fonts['FONT_ROBBER_SYMBOL']
+        self.font_player_name = fonts['FONT_PLAYER_NAME']
+        self.font_player_details = fonts['FONT_PLAYER_DETAILS']
+        self.font_player_thoughts = fonts['FONT_PLAYER_THOUGHTS']
+        self.font_chat = fonts['FONT_CHAT']
+        self.font_status = fonts['FONT_STATUS']
 
 
         # Placeholder for resource icons (if we decide to load them)
@@ -162,8 +168,9 @@ class catanGameView():
 
 
         #Display the Ports
-        for vCoord, vertexInfo in self.board.boardGraph.items():
+        for vertexInfo in self.board.boardGraph.values():
             if(vertexInfo.port != False):
+                vCoord = vertexInfo.pixelCoordinates
                 portTextSurf = self.font_ports.render(vertexInfo.port, True, COLOR_PORT_TEXT)
 
                 text_x, text_y = vCoord.x, vCoord.y
@@ -192,14 +199,15 @@ class catanGameView():
 
     #Function to draw a road on the board
     def draw_road(self, edgeToDraw, roadColor):
+        edgeToDraw = [self.board.vertex_index_to_pixel_dict[v] for v in edgeToDraw] #Vertex indices to pixels
         pygame.draw.line(self.screen, pygame.Color(roadColor), edgeToDraw[0], edgeToDraw[1], 10) # Main road line
         pygame.draw.line(self.screen, COLOR_TILE_OUTLINE, edgeToDraw[0], edgeToDraw[1], 12) # Darker outline for depth
 
 
     #Function to draw a potential road on the board - thin
     def draw_possible_road(self, edgeToDraw, roadColor):
-        start_pos = edgeToDraw[0]
-        end_pos = edgeToDraw[1]
+        start_pos = self.board.vertex_index_to_pixel_dict[edgeToDraw[0]]
+        end_pos = self.board.vertex_index_to_pixel_dict[edgeToDraw[1]]
         delta_x = end_pos.x - start_pos.x
         delta_y = end_pos.y - start_pos.y
         distance = max(1, (delta_x**2 + delta_y**2)**0.5) # Avoid division by zero if start=end
@@ -225,6 +233,7 @@ class catanGameView():
 
     #Function to draw a settlement on the board at vertexToDraw
     def draw_settlement(self, vertexToDraw, color):
+        vertexToDraw = self.board.vertex_index_to_pixel_dict[vertexToDraw] #Vertex index to pixel
         # Simple house shape: square base, triangular roof
         base_width = 18
         base_height = 12
@@ -252,6 +261,7 @@ class catanGameView():
    
     #Function to draw a potential settlement on the board - thin
     def draw_possible_settlement(self, vertexToDraw, color):
+        vertexToDraw = self.board.vertex_index_to_pixel_dict[vertexToDraw] #Vertex index to pixel
         # Circle with outline, slightly transparent fill
         radius = 16
         # Create a surface for transparency
@@ -265,6 +275,7 @@ class catanGameView():
     
     #Function to draw a city on the board at vertexToDraw
     def draw_city(self, vertexToDraw, color):
+        vertexToDraw = self.board.vertex_index_to_pixel_dict[vertexToDraw] #Vertex index to pixel
         # More complex shape for city: e.g., a larger base with a smaller "tower"
         main_building_w = 24
         main_building_h = 18
@@ -294,6 +305,7 @@ class catanGameView():
    
     #Function to draw a potential city on the board - thin
     def draw_possible_city(self, vertexToDraw, color):
+        vertexToDraw = self.board.vertex_index_to_pixel_dict[vertexToDraw] #Vertex index to pixel
         # Larger circle, distinct from settlement, perhaps a square/diamond outline
         radius = 20
         # Create a surface for transparency
@@ -317,7 +329,8 @@ class catanGameView():
 
 
     #Function to draw possible players to rob
-    def draw_possible_players_to_rob(self, vertexCoord): # vertexCoord is player's settlement/city center
+    def draw_possible_players_to_rob(self, vertexCoord): # vertexCoord is the vertex index of player's settlement/city
+        vertexCoord = self.board.vertex_index_to_pixel_dict[vertexCoord]
         # Draw a targeting reticle or highlight around the building
         radius = 25 # Radius of highlight
         pygame.draw.circle(self.screen, pygame.Color('red'), (int(vertexCoord.x), int(vertexCoord.y)), radius, 3) # Red circle outline
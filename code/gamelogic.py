@@ -1,4 +1,5 @@
 import numpy as np
+from eventLog import log, INFO, WARNING
 
 class GameLogicManager:
     def __init__(self, board, player_queue_getter):
@@ -13,11 +14,11 @@ class GameLogicManager:
         self.get_player_list = player_queue_getter # Store the function itself
 
     def roll_dice(self):
-        """Rolls two dice and returns the sum."""
-        dice_1 = np.random.randint(1, 7)
-        dice_2 = np.random.randint(1, 7)
+        """Rolls two dice from the game's dice stream and returns the sum."""
+        dice_1, dice_2 = self.board.rng.roll_dice()
         roll_total = dice_1 + dice_2
-        print(f"GameLogicManager: Dice Roll = {roll_total} ({dice_1}, {dice_2})")
+        if log.level <= INFO:
+            log.emit(INFO, 'DICE_ROLL', roll=roll_total, dice_1=dice_1, dice_2=dice_2)
         return roll_total
 
     def check_longest_road(self, player_to_check):
@@ -44,11 +45,13 @@ class GameLogicManager:
         # And player_to_check doesn't already have the flag.
         if player_to_check.maxRoadLength > max_len and not player_to_check.longestRoadFlag:
             if current_longest_road_holder and current_longest_road_holder != player_to_check:
-                print(f"GameLogicManager: {current_longest_road_holder.name} loses Longest Road.")
+                if log.level <= INFO:
+                    log.emit(INFO, 'LONGEST_ROAD_LOST', player=current_longest_road_holder.name)
                 current_longest_road_holder.longestRoadFlag = False
                 current_longest_road_holder.victoryPoints -= 2
 
-            print(f"GameLogicManager: {player_to_check.name} now has Longest Road with length {player_to_check.maxRoadLength}.")
+            if log.level <= INFO:
+                log.emit(INFO, 'LONGEST_ROAD', player=player_to_check.name, length=player_to_check.maxRoadLength)
             player_to_check.longestRoadFlag = True
             player_to_check.victoryPoints += 2
             return True
@@ -80,11 +83,13 @@ class GameLogicManager:
 
         if player_to_check.knightsPlayed > max_knights and not player_to_check.largestArmyFlag:
             if current_largest_army_holder and current_largest_army_holder != player_to_check:
-                print(f"GameLogicManager: {current_largest_army_holder.name} loses Largest Army.")
+                if log.level <= INFO:
+                    log.emit(INFO, 'LARGEST_ARMY_LOST', player=current_largest_army_holder.name)
                 current_largest_army_holder.largestArmyFlag = False
                 current_largest_army_holder.victoryPoints -= 2
 
-            print(f"GameLogicManager: {player_to_check.name} now has Largest Army with {player_to_check.knightsPlayed} knights.")
+            if log.level <= INFO:
+                log.emit(INFO, 'LARGEST_ARMY', player=player_to_check.name, knights=player_to_check.knightsPlayed)
             player_to_check.largestArmyFlag = True
             player_to_check.victoryPoints += 2
             return True
@@ -96,30 +101,20 @@ class GameLogicManager:
         Distributes resources to players based on the dice roll.
         Assumes dice_roll is not 7.
         """
-        all_players = self.get_player_list()
         if dice_roll == 7:
-            print("GameLogicManager: distribute_resources called with 7, but it should be handled by main game loop's 7-roll logic.")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'DISTRIBUTE_ON_SEVEN')
             return
 
-        hex_resources_rolled = self.board.getHexResourceRolled(dice_roll)
-        print(f"GameLogicManager: Resources rolled on hexes: {hex_resources_rolled} for dice roll {dice_roll}")
-
-        for player_i in all_players:
-            for settlement_coord in player_i.buildGraph['SETTLEMENTS']:
-                for adjacent_hex_idx in self.board.boardGraph[settlement_coord].adjacentHexList:
-                    if adjacent_hex_idx in hex_resources_rolled and not self.board.hexTileDict[adjacent_hex_idx].robber:
-                        resource_type = self.board.hexTileDict[adjacent_hex_idx].resource.type
-                        player_i.resources[resource_type] += 1
-                        print(f"GameLogicManager: {player_i.name} collects 1 {resource_type} from Settlement at {settlement_coord} (Hex {adjacent_hex_idx})")
-
-            for city_coord in player_i.buildGraph['CITIES']:
-                for adjacent_hex_idx in self.board.boardGraph[city_coord].adjacentHexList:
-                    if adjacent_hex_idx in hex_resources_rolled and not self.board.hexTileDict[adjacent_hex_idx].robber:
-                        resource_type = self.board.hexTileDict[adjacent_hex_idx].resource.type
-                        player_i.resources[resource_type] += 2
-                        print(f"GameLogicManager: {player_i.name} collects 2 {resource_type} from City at {city_coord} (Hex {adjacent_hex_idx})")
-
-        print("GameLogicManager: Resource distribution complete.")
+        # One lookup in the board's production table, which is updated as buildings and the robber change
+        payouts = self.board.production.get_payouts(dice_roll)
+        for player_i, resource_type, amount in payouts:
+            player_i.resources[resource_type] += amount
+
+        # One event per roll rather than one line per payout, and nothing is built when the level is off
+        if log.level <= INFO:
+            log.emit(INFO, 'PAYOUT', roll=dice_roll,
+                     payouts=[(player_i.name, resource_type, amount) for player_i, resource_type, amount in payouts])
 
 if __name__ == '__main__':
     print("GameLogicManager class defined.")
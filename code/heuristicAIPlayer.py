@@ -3,6 +3,7 @@
 
 from board import *
 from player import *
+from eventLog import log, DEBUG, INFO
 import numpy as np
 
 #Class definition for an AI player
@@ -12,11 +13,10 @@ class heuristicAIPlayer(player):
     def updateAI(self): 
         self.isAI = True
         self.setupResources = [] #List to keep track of setup resources
-        # Initialize resources with the exact amount needed for the setup phase (2 settlements, 2 roads).
-        # This allows the AI to use its standard build methods during setup by "spending" this initial budget.
-        # Cost: 2x Settle (1W,1S,1H,1B) + 2x Road (1B,1W) = 4xWOOD, 4xBRICK, 2xWHEAT, 2xSHEEP.
+        # Setup settlements and roads are free (built with setup_phase=True), so start with no resources
         self.resources = {'ORE':0, 'BRICK':0, 'WHEAT':0, 'WOOD':0, 'SHEEP':0}
-        print("Added new AI Player:", self.name)
+        if log.level <= INFO:
+            log.emit(INFO, 'NEW_PLAYER', player=self.name)
 
 
     #Function to build an initial settlement - just choose random spot for now
@@ -58,40 +58,43 @@ class heuristicAIPlayer(player):
             if(resourceType not in self.setupResources and resourceType != 'DESERT'):
                 self.setupResources.append(resourceType)
 
-        self.build_settlement(vertexToBuild, board)
+        self.build_settlement(vertexToBuild, board, setup_phase=True)
 
 
         #Build random road
         possibleRoads = board.get_setup_roads(self)
-        randomEdge = np.random.randint(0, len(possibleRoads.keys()))
-        self.build_road(list(possibleRoads.keys())[randomEdge][0], list(possibleRoads.keys())[randomEdge][1], board)
+        randomEdge = self.rng.integers(0, len(possibleRoads.keys()))
+        self.build_road(list(possibleRoads.keys())[randomEdge][0], list(possibleRoads.keys())[randomEdge][1], board, setup_phase=True)
 
     
     def move(self, board):
-        print("AI Player {} playing...".format(self.name))
+        if log.level <= INFO:
+            log.emit(INFO, 'AI_PLAYING', player=self.name)
         #Trade resources if there are excessive amounts of a particular resource
         self.trade()
         #Build a settlements, city and few roads
         possibleVertices = board.get_potential_settlements(self)
         if(possibleVertices != {} and (self.resources['BRICK'] > 0 and self.resources['WOOD'] > 0 and self.resources['SHEEP'] > 0 and self.resources['WHEAT'] > 0)):
-            randomVertex = np.random.randint(0, len(possibleVertices.keys()))
+            randomVertex = self.rng.integers(0, len(possibleVertices.keys()))
             self.build_settlement(list(possibleVertices.keys())[randomVertex], board)
 
         #Build a City
         possibleVertices = board.get_potential_cities(self)
         if(possibleVertices != {} and (self.resources['WHEAT'] >= 2 and self.resources['ORE'] >= 3)):
-            randomVertex = np.random.randint(0, len(possibleVertices.keys()))
+            randomVertex = self.rng.integers(0, len(possibleVertices.keys()))
             self.build_city(list(possibleVertices.keys())[randomVertex], board)
 
         #Build a couple roads
         for i in range(2):
             if(self.resources['BRICK'] > 0 and self.resources['WOOD'] > 0):
                 possibleRoads = board.get_potential_roads(self)
-                randomEdge = np.random.randint(0, len(possibleRoads.keys()))
+                if(possibleRoads == {}): #Road network is closed in
+                    break
+                randomEdge = self.rng.integers(0, len(possibleRoads.keys()))
                 self.build_road(list(possibleRoads.keys())[randomEdge][0], list(possibleRoads.keys())[randomEdge][1], board)
 
         #Draw a Dev Card with 1/3 probability
-        devCardNum = np.random.randint(0, 3)
+        devCardNum = self.rng.integers(0, 3)
         if(devCardNum == 0):
             self.draw_devCard(board)
         
@@ -119,9 +122,10 @@ class heuristicAIPlayer(player):
         
         #Choose a hexTile with maximum adversary settlements
         maxHexScore = 0 #Keep only the best hex to rob
+        hexToRob_index, playerToRob_hex = None, None #No hex found with a player to rob
         for hex_ind, hexTile in robberHexDict.items():
             #Extract all 6 vertices of this hexTile
-            vertexList = polygon_corners(board.flat, hexTile.hex)
+            vertexList = board.topology.hex_vertices[hex_ind]
 
             hexScore = 0 #Heuristic score for hexTile
             playerToRob_VP = 0
@@ -158,15 +162,12 @@ class heuristicAIPlayer(player):
         hex_i, playerRobbed = self.choose_player_to_rob(board)
 
         if hex_i is None : # choose_player_to_rob might return None if no valid spot/player
-            print(f"{self.name} (Heuristic) could not find a valid hex/player to rob.")
+            if log.level <= DEBUG:
+                log.emit(DEBUG, 'MESSAGE', text=f"{self.name} (Heuristic) could not find a valid hex/player to rob.")
             # Move robber to a default location if necessary, without robbing
             # For now, assume if hex_i is None, playerRobbed is also None.
             # Find first available hex that is not the current robber hex
-            current_robber_hex = None
-            for idx, tile in board.hexTileDict.items():
-                if tile.robber:
-                    current_robber_hex = idx
-                    break
+            current_robber_hex = board.robber_hex
 
             default_hex_to_move = 0
             if current_robber_hex is not None: # Move it somewhere else
@@ -182,14 +183,14 @@ class heuristicAIPlayer(player):
         #Move the robber; move_robber calls steal_resource which now returns the stolen resource or None
         resource_stolen = self.move_robber(hex_i, board, playerRobbed)
 
+        if log.level <= INFO:
+            log.emit(INFO, 'HEURISTIC_ROBBER', player=self.name, hex=hex_i, victim=playerRobbed.name if playerRobbed else None, resource=resource_stolen)
+
         if playerRobbed and resource_stolen:
-            print(f"{self.name} (Heuristic) successfully robbed {playerRobbed.name} of a {resource_stolen} at hex {hex_i}.")
             return playerRobbed # Return the player object that was successfully robbed
         elif playerRobbed:
-            print(f"{self.name} (Heuristic) moved robber to hex {hex_i} and targeted {playerRobbed.name}, but they had no resources.")
             return None # Robbery attempted but failed due to no resources
         else:
-            print(f"{self.name} (Heuristic) moved robber to hex {hex_i}, no player was robbed.")
             return None # No player was targeted or robbery was not applicable
 
 
@@ -0,0 +1,149 @@
+#Settlers of Catan
+#Incremental longest road computation
+
+#Class to keep every player's road network as an adjacency structure over edge ids
+#Roads are grouped into components - sets of roads a trail can walk between without passing
+#through a vertex colonised by another player. The longest trail of each component is cached
+#and only recomputed when a new road or an opponent settlement changes that component
+#All values stored in the dicts are immutable (tuples, frozensets), so a snapshot only copies the dicts
+class LongestRoadEngine():
+    'Per-player road networks with a cached longest trail per connected component'
+
+    def __init__(self, topology):
+        self.topology = topology
+        self.vertexOwner = [None]*topology.num_vertices #Player colonising each vertex
+        self.roadsAtVertex = {} #player -> {vertex: (edge ids of the player's roads at that vertex)}
+        self.edgeComponent = {} #player -> {edge id: component id}
+        self.componentEdges = {} #component id -> frozenset of edge ids
+        self.componentLength = {} #component id -> longest trail length, None when it needs recomputing
+        self.nextComponentId = 0
+
+
+    #Function to check if a trail of player can pass through vertex v
+    def is_open_vertex(self, player, v):
+        return self.vertexOwner[v] in (None, player)
+
+
+    #Function to add a road for player on the edge between v1 and v2
+    def add_road(self, player, v1, v2):
+        edge = self.topology.edge_index[(v1, v2)]
+        roadsAtVertex = self.roadsAtVertex.setdefault(player, {})
+        edgeComponent = self.edgeComponent.setdefault(player, {})
+
+        #Components that this road connects to through an open vertex
+        mergedComponents = set()
+        for v in (v1, v2):
+            if self.is_open_vertex(player, v):
+                for adjEdge in roadsAtVertex.get(v, ()):
+                    mergedComponents.add(edgeComponent[adjEdge])
+            roadsAtVertex[v] = roadsAtVertex.get(v, ()) + (edge,)
+
+        newEdges = {edge}
+        for componentId in mergedComponents:
+            newEdges |= self.componentEdges.pop(componentId)
+            del self.componentLength[componentId]
+        self.new_component(player, newEdges)
+
+
+    #Function to record a settlement of player on vertex v - splits opponent roads running through v
+    def add_settlement(self, player, v):
+        self.vertexOwner[v] = player
+        for otherPlayer, roadsAtVertex in self.roadsAtVertex.items():
+            if otherPlayer is player or len(roadsAtVertex.get(v, ())) < 2:
+                continue #A single road ending at v can't be split
+            componentId = self.edgeComponent[otherPlayer][roadsAtVertex[v][0]]
+            self.split_component(otherPlayer, componentId)
+
+
+    #Function to get the longest road of a player, recomputing only the changed components
+    def get_longest_road(self, player):
+        longestRoad = 0
+        for componentId in set(self.edgeComponent.get(player, {}).values()):
+            if self.componentLength[componentId] is None:
+                self.componentLength[componentId] = self.longest_trail(player, self.componentEdges[componentId])
+            longestRoad = max(longestRoad, self.componentLength[componentId])
+
+        return longestRoad
+
+
+    #Helper function to register a set of edges as a new component that needs its length computed
+    def new_component(self, player, edges):
+        componentId = self.nextComponentId
+        self.nextComponentId += 1
+        self.componentEdges[componentId] = frozenset(edges)
+        self.componentLength[componentId] = None
+        edgeComponent = self.edgeComponent[player]
+        for edge in edges:
+            edgeComponent[edge] = componentId
+
+
+    #Helper function to re-partition a component after one of its vertices was blocked
+    def split_component(self, player, componentId):
+        remainingEdges = set(self.componentEdges.pop(componentId))
+        del self.componentLength[componentId]
+        roadsAtVertex = self.roadsAtVertex[player]
+
+        while remainingEdges:
+            #Flood fill from any edge, only continuing through open vertices
+            startEdge = remainingEdges.pop()
+            componentEdges = {startEdge}
+            edgeStack = [startEdge]
+            while edgeStack:
+                for v in self.topology.edge_vertices[edgeStack.pop()]:
+                    if not self.is_open_vertex(player, v):
+                        continue
+                    for adjEdge in roadsAtVertex[v]:
+                        if adjEdge in remainingEdges:
+                            remainingEdges.remove(adjEdge)
+                            componentEdges.add(adjEdge)
+                            edgeStack.append(adjEdge)
+            self.new_component(player, componentEdges)
+
+
+    #Function to get an immutable snapshot of the engine state
+    def snapshot(self):
+        return (tuple(self.vertexOwner),
+                tuple((player, dict(roads)) for player, roads in self.roadsAtVertex.items()),
+                tuple((player, dict(components)) for player, components in self.edgeComponent.items()),
+                dict(self.componentEdges), dict(self.componentLength), self.nextComponentId)
+
+
+    #Function to return to a snapshot, the snapshot itself is left untouched
+    def restore(self, snapshot):
+        vertexOwner, roadsAtVertex, edgeComponent, componentEdges, componentLength, self.nextComponentId = snapshot
+        self.vertexOwner = list(vertexOwner)
+        self.roadsAtVertex = {player: dict(roads) for player, roads in roadsAtVertex}
+        self.edgeComponent = {player: dict(components) for player, components in edgeComponent}
+        self.componentEdges = dict(componentEdges)
+        self.componentLength = dict(componentLength)
+
+
+    #Function to compute the longest trail (each road used at most once) within a set of edges
+    #Trails may start or end on a vertex colonised by another player but not pass through it
+    def longest_trail(self, player, edges):
+        roadsAtVertex = self.roadsAtVertex[player]
+        edgeVertices = self.topology.edge_vertices
+
+        def trail_from(v, usedEdges):
+            bestLength = 0
+            for edge in roadsAtVertex[v]:
+                edgeBit = 1 << edge
+                if usedEdges & edgeBit:
+                    continue
+                v1, v2 = edgeVertices[edge]
+                nextVertex = v2 if v1 == v else v1
+                length = 1
+                if self.is_open_vertex(player, nextVertex):
+                    length += trail_from(nextVertex, usedEdges | edgeBit)
+                if length > bestLength:
+                    bestLength = length
+            return bestLength
+
+        #Mark every edge outside the component as already used so trails stay inside it
+        componentMask = 0
+        for edge in edges:
+            componentMask |= 1 << edge
+        outsideEdges = ((1 << self.topology.num_edges) - 1) ^ componentMask
+
+        startVertices = {v for edge in edges for v in edgeVertices[edge]}
+        return max(trail_from(v, outsideEdges) for v in startVertices)
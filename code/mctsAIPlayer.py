@@ -0,0 +1,329 @@
+#Settlers of Catan
+#Monte Carlo search AI class implementation
+
+import time
+from heuristicAIPlayer import *
+from gameState import GameState
+from gamelogic import GameLogicManager
+from eventLog import log, INFO, OFF
+
+#Default search budget of one decision - the search stops at whichever limit comes first, None for no limit
+#Set DECISION_TIME = None and DECISION_ITERATIONS instead for reproducible games
+DECISION_TIME = 0.05 #Seconds
+DECISION_ITERATIONS = None #Rollouts
+ROLLOUT_ROUNDS = 4 #Rounds of turns played out after a decision before the position is scored
+SETUP_CANDIDATES = 8 #Setup spots with the most pips that are searched
+MAX_ACTIONS_PER_TURN = 8
+EXPLORATION = 0.5 #UCB1 constant, rollout values are in [0, 1]
+PRODUCTION_WEIGHT = 0.05 #Victory points a pip of production is worth when a rollout ends before the game
+
+DICE_PIPS = {2:1, 3:2, 4:3, 5:4, 6:5, 8:5, 9:4, 10:3, 11:2, 12:1, None:0}
+PASS = ('PASS',)
+
+
+#Class definition for a Monte Carlo search AI player
+#Setup spots, builds, bank trades and robber moves are chosen by flat Monte Carlo search: every candidate action
+#is tried from the current position and played out by the heuristic AI for a few rounds, picking which candidate
+#to try next with UCB1. Positions are saved and restored with GameState snapshots, and the undrawn dev cards
+#are reshuffled before every rollout since their order is hidden from the player (determinization).
+#Opponents that aren't heuristic AIs (LLM seats) only collect resources in rollouts - they can't be asked.
+class mctsAIPlayer(heuristicAIPlayer):
+    'Monte Carlo search AI with heuristic rollouts'
+
+    kind = 'mcts'
+
+    #timeBudget: seconds per decision, iterations: rollouts per decision - neither uses the module defaults
+    def __init__(self, playerName, playerColor, timeBudget=None, iterations=None, rolloutRounds=ROLLOUT_ROUNDS):
+        if timeBudget is None and iterations is None:
+            timeBudget, iterations = DECISION_TIME, DECISION_ITERATIONS
+        if timeBudget is None and iterations is None:
+            raise ValueError("mctsAIPlayer needs a time or iteration budget per decision")
+        super().__init__(playerName, playerColor)
+        self.timeBudget = timeBudget
+        self.iterations = iterations
+        self.rolloutRounds = rolloutRounds
+        self.maxPoints = 10
+        self.gamePlayers = None #All players in seating order - set by the game, the search needs them for rollouts
+        self.decisions = [] #(decision, candidates, rollouts, seconds) of every search, to measure latency
+        self.vertexPips, self.pipsBoard = None, None
+
+        return None
+
+
+    #Function to build an initial settlement and road
+    def initial_setup(self, board):
+        if self.gamePlayers is None:
+            return super().initial_setup(board)
+
+        vertexPips = self.get_vertex_pips(board)
+        spots = sorted(board.get_setup_settlements(self), key=lambda v: -vertexPips[v])[:SETUP_CANDIDATES]
+        placed = sum(len(player_i.buildGraph['SETTLEMENTS']) for player_i in self.gamePlayers) #Position in the setup order
+        action = self.search(board, 'SETUP', [('SETUP', v) for v in spots], lambda action: self.rollout_setup(board, action, placed))
+        self.place_setup(board, action[1])
+
+
+    def move(self, board):
+        if self.gamePlayers is None:
+            return super().move(board)
+        if log.level <= INFO:
+            log.emit(INFO, 'AI_PLAYING', player=self.name)
+
+        #One action at a time until passing is best
+        for i in range(MAX_ACTIONS_PER_TURN):
+            action = self.search(board, 'MOVE', self.get_actions(board), lambda action: self.rollout_move(board, action))
+            if action == PASS:
+                break
+            self.apply_action(board, action)
+
+
+    def heuristic_move_robber(self, board):
+        '''Function to choose the robber hex and victim by search
+        args: board object
+        returns: player object that was robbed, or None
+        '''
+        if self.gamePlayers is None:
+            return super().heuristic_move_robber(board)
+
+        actions = []
+        for hexIndex in board.get_robber_spots():
+            for playerToRob in board.get_players_to_rob(hexIndex):
+                if playerToRob is not self and sum(playerToRob.resources.values()) > 0:
+                    actions.append(('ROBBER', hexIndex, playerToRob))
+        if not actions: #Nobody to rob - the heuristic moves the robber out of the way
+            return super().heuristic_move_robber(board)
+
+        action = self.search(board, 'ROBBER', actions, lambda action: self.rollout_robber(board, action))
+        resource_stolen = self.apply_action(board, action)
+        return action[2] if resource_stolen else None
+
+
+    #Function to get the candidate actions of a turn - the engine's legal moves the player can pay for
+    def get_actions(self, board):
+        actions = [PASS]
+        resources = self.resources
+        if resources['BRICK'] > 0 and resources['WOOD'] > 0 and self.roadsLeft > 0:
+            actions += [('ROAD', v1, v2) for v1, v2 in board.get_potential_roads(self)]
+        if resources['BRICK'] > 0 and resources['WOOD'] > 0 and resources['SHEEP'] > 0 and resources['WHEAT'] > 0 and self.settlementsLeft > 0:
+            actions += [('SETTLEMENT', v) for v in board.get_potential_settlements(self)]
+        if resources['WHEAT'] >= 2 and resources['ORE'] >= 3 and self.citiesLeft > 0:
+            actions += [('CITY', v) for v in board.get_potential_cities(self)]
+        if resources['WHEAT'] > 0 and resources['ORE'] > 0 and resources['SHEEP'] > 0 and len(board.devCardStack) > 0:
+            actions.append(('DEV_CARD',))
+        #Bank trades for a resource the player has none of, like the heuristic
+        for r1, r1_amount in resources.items():
+            if r1_amount >= self.get_trade_ratio(r1):
+                actions += [('TRADE', r1, r2) for r2, r2_amount in resources.items() if r2_amount == 0]
+
+        return actions
+
+
+    #Function to get the bank trade ratio of a resource, as trade_with_bank chooses it
+    def get_trade_ratio(self, r1):
+        if "2:1 " + r1 in self.portList:
+            return 2
+        if '3:1 PORT' in self.portList:
+            return 3
+        return 4
+
+
+    def apply_action(self, board, action):
+        actionType = action[0]
+        if actionType == 'ROAD':
+            return self.build_road(action[1], action[2], board)
+        if actionType == 'SETTLEMENT':
+            return self.build_settlement(action[1], board)
+        if actionType == 'CITY':
+            return self.build_city(action[1], board)
+        if actionType == 'DEV_CARD':
+            return self.draw_devCard(board)
+        if actionType == 'TRADE':
+            return self.trade_with_bank(action[1], action[2])
+        if actionType == 'ROBBER':
+            return self.move_robber(action[1], board, action[2])
+
+
+    #Function to build a setup settlement and a random road next to it
+    def place_setup(self, board, vertexToBuild):
+        for adjacentHex in board.boardGraph[vertexToBuild].adjacentHexList:
+            resourceType = board.hexTileDict[adjacentHex].resource.type
+            if(resourceType not in self.setupResources and resourceType != 'DESERT'):
+                self.setupResources.append(resourceType)
+
+        self.build_settlement(vertexToBuild, board, setup_phase=True)
+
+        possibleRoads = list(board.get_setup_roads(self))
+        v1, v2 = possibleRoads[self.rng.integers(0, len(possibleRoads))]
+        self.build_road(v1, v2, board, setup_phase=True)
+
+
+    #Function to pick an action by flat Monte Carlo search
+    #rollout(action) applies the action to the current position, plays it out and returns its value for this player
+    def search(self, board, decision, actions, rollout):
+        if len(actions) == 1:
+            return actions[0]
+
+        startTime = time.perf_counter()
+        state = GameState(board, self.gamePlayers)
+        rootSnapshot = state.snapshot()
+        #Rollouts draw from this player's stream, so the other players' own streams are left as they were
+        playerRngs = [player_i.rng for player_i in self.gamePlayers]
+        setupResources = [list(player_i.setupResources) if isinstance(player_i, heuristicAIPlayer) else None for player_i in self.gamePlayers]
+        self.rolloutLogic = GameLogicManager(board, lambda: self.gamePlayers)
+
+        visits, totals = [0]*len(actions), [0.0]*len(actions)
+        rollouts = 0
+        with log.configured(level=OFF):
+            try:
+                for player_i in self.gamePlayers:
+                    player_i.rng = self.rng
+                while (self.iterations is None or rollouts < self.iterations) and \
+                      (self.timeBudget is None or time.perf_counter() - startTime < self.timeBudget):
+                    #Try every action once, then UCB1
+                    if rollouts < len(actions):
+                        i = rollouts
+                    else:
+                        logRollouts = np.log(rollouts)
+                        i = max(range(len(actions)), key=lambda j: totals[j]/visits[j] + EXPLORATION*np.sqrt(logRollouts/visits[j]))
+
+                    board.devCardStack.shuffle_remaining(self.rng)
+                    value = rollout(actions[i])
+                    visits[i] += 1
+                    totals[i] += value
+                    rollouts += 1
+
+                    state.restore(rootSnapshot)
+                    for player_i, playerSetupResources in zip(self.gamePlayers, setupResources):
+                        if playerSetupResources is not None:
+                            player_i.setupResources = list(playerSetupResources)
+            finally:
+                state.restore(rootSnapshot)
+                for player_i, playerRng in zip(self.gamePlayers, playerRngs):
+                    player_i.rng = playerRng
+
+        self.decisions.append((decision, len(actions), rollouts, time.perf_counter() - startTime))
+        #Most tried action, the best mean value among equals
+        best = max(range(len(actions)), key=lambda j: (visits[j], totals[j]/visits[j] if visits[j] else 0))
+        return actions[best]
+
+
+    def rollout_setup(self, board, action, placed):
+        self.place_setup(board, action[1])
+        #Finish the setup in snake order, second settlements collect their resources
+        numPlayers = len(self.gamePlayers)
+        setupOrder = self.gamePlayers + self.gamePlayers[::-1]
+        if placed >= numPlayers:
+            self.collect_setup_resources(board, self)
+        for position in range(placed + 1, len(setupOrder)):
+            player_i = setupOrder[position]
+            if isinstance(player_i, heuristicAIPlayer):
+                heuristicAIPlayer.initial_setup(player_i, board)
+                if position >= numPlayers:
+                    self.collect_setup_resources(board, player_i)
+
+        return self.play_out(board, 0)
+
+    def rollout_move(self, board, action):
+        self.apply_action(board, action)
+        if action != PASS: #The rollout policy plays the rest of the turn
+            heuristicAIPlayer.move(self, board)
+        return self.finish_turn_and_play_out(board)
+
+    def rollout_robber(self, board, action):
+        self.apply_action(board, action)
+        heuristicAIPlayer.move(self, board)
+        return self.finish_turn_and_play_out(board)
+
+    def finish_turn_and_play_out(self, board):
+        self.rolloutLogic.check_longest_road(self)
+        self.rolloutLogic.check_largest_army(self)
+        if self.victoryPoints >= self.maxPoints:
+            return 1.0
+        return self.play_out(board, self.gamePlayers.index(self) + 1)
+
+
+    #Function to play rolloutRounds rounds of turns with the heuristic AI from seat firstSeat, returns the value of the end position
+    def play_out(self, board, firstSeat):
+        numPlayers = len(self.gamePlayers)
+        for turn in range(firstSeat, firstSeat + self.rolloutRounds*numPlayers):
+            player_i = self.gamePlayers[turn % numPlayers]
+            player_i.updateDevCards()
+            player_i.devCardPlayedThisTurn = False
+
+            diceRoll = int(self.rng.integers(1, 7)) + int(self.rng.integers(1, 7))
+            if diceRoll == 7:
+                if isinstance(player_i, heuristicAIPlayer):
+                    heuristicAIPlayer.heuristic_move_robber(player_i, board)
+            else:
+                for player_j, resourceType, amount in board.production.get_payouts(diceRoll):
+                    player_j.resources[resourceType] += amount
+
+            if isinstance(player_i, heuristicAIPlayer):
+                heuristicAIPlayer.move(player_i, board)
+                self.rolloutLogic.check_longest_road(player_i)
+                self.rolloutLogic.check_largest_army(player_i)
+            if player_i.victoryPoints >= self.maxPoints:
+                break
+
+        return self.evaluate(board)
+
+
+    #Function to score a position for this player in [0, 1] - 1 a win, 0 a loss
+    #Unfinished games compare victory points plus production with the strongest opponent
+    def evaluate(self, board):
+        if self.victoryPoints >= self.maxPoints:
+            return 1.0
+        vertexPips = self.get_vertex_pips(board)
+        bestOpponent = None
+        for player_i in self.gamePlayers:
+            if player_i.victoryPoints >= self.maxPoints:
+                return 0.0
+            if player_i is not self:
+                score = player_i.victoryPoints + PRODUCTION_WEIGHT*self.get_production(player_i, vertexPips)
+                bestOpponent = score if bestOpponent is None else max(bestOpponent, score)
+        score = self.victoryPoints + PRODUCTION_WEIGHT*self.get_production(self, vertexPips)
+        return min(1.0, max(0.0, 0.5 + (score - bestOpponent)/(2*self.maxPoints)))
+
+
+    #Function to get the pips of each vertex - the number of dice rolls in 36 that pay it, cached per board
+    def get_vertex_pips(self, board):
+        if self.pipsBoard is not board:
+            self.vertexPips = {v: sum(DICE_PIPS[board.hexTileDict[adjacentHex].resource.num] for adjacentHex in vertex.adjacentHexList)
+                               for v, vertex in board.boardGraph.items()}
+            self.pipsBoard = board
+        return self.vertexPips
+
+    @staticmethod
+    def get_production(player_i, vertexPips):
+        return sum(vertexPips[v] for v in player_i.buildGraph['SETTLEMENTS']) + 2*sum(vertexPips[v] for v in player_i.buildGraph['CITIES'])
+
+    @staticmethod
+    def collect_setup_resources(board, player_i):
+        for adjacentHex in board.boardGraph[player_i.buildGraph['SETTLEMENTS'][-1]].adjacentHexList:
+            resourceType = board.hexTileDict[adjacentHex].resource.type
+            if resourceType != 'DESERT':
+                player_i.resources[resourceType] += 1
+
+
+if __name__ == '__main__':
+    import contextlib, os
+    from AIGame import catanAIGame
+
+    #Games of one search player against three heuristic AIs, rotating its seat
+    numGames = 8
+    wins, decisions = 0, []
+    for seed in range(numGames):
+        roster = ['heuristic']*4
+        roster[seed % 4] = 'mcts'
+        with log.configured(level=OFF), open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            game = catanAIGame(headless=True, roster=roster, seed=seed, maxTurns=1000)
+        result = game.get_result()
+        searchPlayer = next(player_i for player_i in game.playerQueue.queue if getattr(player_i, 'kind', None) == 'mcts') #__main__ has its own copy of the class
+        wins += result['winner'] == searchPlayer.name
+        decisions += searchPlayer.decisions
+        print("Game {}: winner {}, {} points {}".format(seed, result['winner'], searchPlayer.name, searchPlayer.victoryPoints))
+
+    seconds = np.array([decision[3] for decision in decisions])
+    rollouts = np.array([decision[2] for decision in decisions])
+    print("MCTS won {}/{} games against 3 heuristic AIs (1/4 is par)".format(wins, numGames))
+    print("{} searches, {:.0f} rollouts per search, latency p50 {:.1f}ms p95 {:.1f}ms max {:.1f}ms".format(
+        len(decisions), rollouts.mean(), *(np.percentile(seconds, [50, 95, 100])*1000)))
@@ -1,5 +1,11 @@
 import json
+import weakref
+from itertools import islice
 import numpy as np # Added import
+try:
+    import orjson # Optional faster JSON backend for compact states
+except ImportError:
+    orjson = None
 
 # from board import catanBoard # Assuming catanBoard is in board.py
 # from player import player # Assuming player is in player.py
@@ -21,6 +27,63 @@ DICE_ROLL_PROBABILITIES = {
     None: 0
 }
 
+# Fields of a serialized modelState, in output order. Fields only set in some states (e.g. the trade offer details)
+# are left out when absent. Nested sections keep the order they are built in.
+MODEL_STATE_FIELDS = (
+    # Whose turn and where in the game
+    "current_player_name", "game_phase", "development_cards_left_in_deck",
+    "players", "board",
+    # What the current player can do
+    "available_actions", "action_costs", "current_player_bank_trade_ratios",
+    "robber_movement_is_mandatory", "discard_is_mandatory", "num_cards_to_discard", "current_player_total_resources",
+    "setup_road_placement_pending", "last_settlement_vertex_index",
+    # Feedback on the last attempted action
+    "last_action_status", "last_action_error_details",
+    # Trades and negotiation
+    "trade_offer_pending", "trade_offering_player_name", "trade_resources_offered_to_you", "trade_resources_requested_from_you",
+    "negotiation_in_progress", "negotiation_participants", "negotiation_history", "your_turn_to_negotiate",
+    "negotiation_partner_name", "negotiation_last_offer_details", "my_reputation_with_others",
+    # Communication
+    "global_chat_history", "private_chat_history", "private_chat_active", "communication_phase_active",
+)
+
+# Board sections that are fixed for the whole game. modelState.static_board holds them, and to_dict(static_board=False)
+# leaves them out of the state, e.g. when they are sent once in a prompt prefix instead
+STATIC_BOARD_FIELDS = ("hexes", "ports", "choke_points")
+
+# Sections of the model state that only depend on the board, kept for each board.
+# The static sections (hex resources and numbers, ports, choke points, settlement spot scores) are built once. The others are
+# rebuilt when the board's stateVersion changes, i.e. a piece is placed, the robber moves or the board is restored.
+# Cached sections are shared by every modelState built at that version, so they must be treated as read-only.
+class boardStateCache():
+    """Model state sections of one board at one board state version."""
+
+    def __init__(self):
+        self.static_board_state = None
+        self.version = None
+        self.board_state = None # Board state with hex control and settlement spots
+        self.player_buildings = {} # Player name -> building locations and income
+        self.available_actions = {} # (player name, game phase, setup road pending, last settlement) -> available actions
+
+    # Drops the sections of an older version
+    def at_version(self, version):
+        if version != self.version:
+            self.version = version
+            self.board_state = None
+            self.player_buildings = {}
+            self.available_actions = {}
+        return self
+
+_board_caches = weakref.WeakKeyDictionary() # Boards are only weakly held, so finished games free their caches
+
+def get_board_cache(board_obj):
+    """Returns the section cache of a board, emptied of sections older than its current state version."""
+    board_cache = _board_caches.get(board_obj)
+    if board_cache is None:
+        board_cache = _board_caches[board_obj] = boardStateCache()
+    return board_cache.at_version(board_obj.stateVersion)
+
+
 class modelState():
     def __init__(self, catan_game, current_player,
                  robber_movement_is_mandatory=False,
@@ -39,14 +102,14 @@ class modelState():
                  # Negotiation specific flags passed during construction if this state is for a negotiation turn
                  is_negotiation_turn: bool = False,
                  negotiation_partner_name: str = None):
-        # First, get the players state
-        self.players = self.get_players_state(catan_game, current_player, catan_game.board)
-        self.board = self.get_board_state(catan_game.board, self.players) # Gets initial board state including choke points placeholder for hex_control
+        # Sections derived from the board's pieces and robber are cached per board state version, so the states
+        # built between two changes of the board (e.g. for each speaker or each action of a turn) share them
+        board_cache = get_board_cache(catan_game.board)
 
-        # Calculate hex_control now that both board and player states (with settlement/city locations) are available
-        # Need pixel_to_vertex_index_map for _calculate_hex_control
-        pixel_to_vertex_index_map = {v_pixel: v_idx for v_idx, v_pixel in catan_game.board.vertex_index_to_pixel_dict.items()}
-        self._calculate_hex_control(catan_game.board, self.players, pixel_to_vertex_index_map)
+        # First, get the players state
+        self.players = self.get_players_state(catan_game, current_player, catan_game.board, board_cache)
+        self.board = self.get_board_state(catan_game.board, self.players, board_cache) # Board state including hex_control from the players' buildings
+        self.static_board = board_cache.static_board_state # Fixed board facts, see STATIC_BOARD_FIELDS - not a serialized field
 
         self.current_player_name = current_player.name
         self.development_cards_left_in_deck = len(catan_game.board.devCardStack) if hasattr(catan_game, 'board') and hasattr(catan_game.board, 'devCardStack') else 0
@@ -128,7 +191,11 @@ class modelState():
             self.last_settlement_vertex_index = last_settlement_vertex_index
 
         # Populate available actions - this needs to be aware of setup_road_placement_pending
-        self.available_actions = self.get_available_actions(catan_game, current_player, setup_road_placement_pending, last_settlement_vertex_index)
+        actions_key = (current_player.name, self.game_phase, setup_road_placement_pending, last_settlement_vertex_index)
+        self.available_actions = board_cache.available_actions.get(actions_key)
+        if self.available_actions is None:
+            self.available_actions = board_cache.available_actions[actions_key] = \
+                self.get_available_actions(catan_game, current_player, setup_road_placement_pending, last_settlement_vertex_index)
 
         # Add current player's total resource count if they need to discard
         # This helps the LLM verify its discard if this info is passed for the discarding player.
@@ -191,8 +258,6 @@ class modelState():
             # "end_turn": True
         }
 
-        pixel_to_vertex_index_map = {v_pixel: v_idx for v_idx, v_pixel in game.board.vertex_index_to_pixel_dict.items()}
-
         if self.game_phase == "setup":
             if setup_road_pending:
                 # Only road building is allowed, specifically from last_settlement_idx
@@ -203,41 +268,31 @@ class modelState():
                 potential_roads_coords = game.board.get_setup_roads(player_perspective)
             else: # Setup settlement placement
                 potential_settlements_coords = game.board.get_setup_settlements(player_perspective)
-                for v_coord in potential_settlements_coords.keys():
-                    v_idx = pixel_to_vertex_index_map.get(v_coord)
-                    if v_idx is not None: actions["build_settlement"].append(v_idx)
+                actions["build_settlement"].extend(potential_settlements_coords.keys())
                 # No roads or cities in this specific setup sub-phase via LLM choice
                 potential_roads_coords = {} # Explicitly empty
 
         else: # Main game phase
             # Settlements
             potential_settlements_coords = game.board.get_potential_settlements(player_perspective)
-            for v_coord in potential_settlements_coords.keys():
-                v_idx = pixel_to_vertex_index_map.get(v_coord)
-                if v_idx is not None: actions["build_settlement"].append(v_idx)
+            actions["build_settlement"].extend(potential_settlements_coords.keys())
 
             # Cities
             potential_cities_coords = game.board.get_potential_cities(player_perspective)
-            for v_coord in potential_cities_coords.keys():
-                v_idx = pixel_to_vertex_index_map.get(v_coord)
-                if v_idx is not None: actions["build_city"].append(v_idx)
+            actions["build_city"].extend(potential_cities_coords.keys())
 
             # Roads
             potential_roads_coords = game.board.get_potential_roads(player_perspective)
 
         # Common road processing for setup road and main game roads
         if not (self.game_phase == "setup" and not setup_road_pending): # if not setup settlement phase
-            for r_coords_tuple in potential_roads_coords.keys():
-                v1_coord, v2_coord = r_coords_tuple
-                v1_idx = pixel_to_vertex_index_map.get(v1_coord)
-                v2_idx = pixel_to_vertex_index_map.get(v2_coord)
-                if v1_idx is not None and v2_idx is not None:
-                    # For setup road, ensure it connects to last_settlement_idx
-                    if setup_road_pending:
-                        if v1_idx == last_settlement_idx or v2_idx == last_settlement_idx:
-                             actions["build_road"].append(tuple(sorted((v1_idx, v2_idx))))
-                    else: # Main game phase roads
-                        actions["build_road"].append(tuple(sorted((v1_idx, v2_idx))))
+            for v1_idx, v2_idx in potential_roads_coords.keys():
+                # For setup road, ensure it connects to last_settlement_idx
+                if setup_road_pending:
+                    if v1_idx == last_settlement_idx or v2_idx == last_settlement_idx:
+                         actions["build_road"].append(tuple(sorted((v1_idx, v2_idx))))
+                else: # Main game phase roads
+                    actions["build_road"].append(tuple(sorted((v1_idx, v2_idx))))
 
         # Remove duplicates just in case, and sort for consistency
         actions["build_settlement"] = sorted(list(set(actions["build_settlement"])))
@@ -246,9 +301,42 @@ class modelState():
 
         return actions
 
-    def get_board_state(self, board_obj, all_players_states): # Added all_players_states argument
+    def get_board_state(self, board_obj, all_players_states, board_cache=None): # Added all_players_states argument
+        # The board section only changes with the board's state version, so it is built once per version
+        if board_cache is None:
+            board_cache = get_board_cache(board_obj)
+        if board_cache.board_state is not None:
+            return board_cache.board_state
+
+        static_state = board_cache.static_board_state
+        if static_state is None:
+            static_state = board_cache.static_board_state = self.get_static_board_state(board_obj)
+
+        # --- Hex Control ---
+        # Needs the players' settlement/city locations, so it is added to copies of the static hexes
+        hex_control_map = self._calculate_hex_control(board_obj, all_players_states)
+        hexes = [dict(h_data, hex_control=sorted(hex_control_map[h_data["hex_index"]], key=lambda x: (-x["influence"], x["player_name"])))
+                 for h_data in static_state["hexes"]]
+
+        # --- Best Unoccupied Settlement Spots ---
+        # Spots are scored and ranked once per board, so only the distance rule is applied here: the engine's mask of
+        # vertices that are unoccupied and have no occupied neighbour
+        open_vertices = board_obj.bitboard.legal_setup_settlements()
+        best_unoccupied_settlement_spots = list(islice((spot for spot in static_state["ranked_settlement_spots"] if open_vertices >> spot["vertex_index"] & 1), 10))
+
+        board_cache.board_state = {
+            "hexes": hexes, # Sorted by hex index in the static state
+            "ports": static_state["ports"],
+            "robber_location_hex_index": board_obj.robber_hex,
+            "choke_points": static_state["choke_points"],
+            "best_unoccupied_settlement_spots": best_unoccupied_settlement_spots # Top 10
+        }
+        return board_cache.board_state
+
+    # Sections of the board state that never change during a game: hex resources and numbers, ports, choke points
+    # and the settlement spot ranking
+    def get_static_board_state(self, board_obj):
         hexes = []
-        robber_location_hex_index = -1
         for hex_index, hex_tile in board_obj.hexTileDict.items():
             hexes.append({
                 "hex_index": hex_tile.index,
@@ -256,14 +344,9 @@ class modelState():
                 "roll_number": hex_tile.resource.num if hex_tile.resource and hex_tile.resource.num is not None else 0, # Desert roll num is None
                 "probability_dots": DICE_ROLL_PROBABILITIES.get(hex_tile.resource.num if hex_tile.resource else 0, 0)
             })
-            if hex_tile.robber:
-                robber_location_hex_index = hex_tile.index
 
         ports = []
-        # Create a reverse mapping from pixel coordinates to vertex index for easier lookup
-        pixel_to_vertex_index_map = {v_pixel: v_idx for v_idx, v_pixel in board_obj.vertex_index_to_pixel_dict.items()}
-
-        for vertex_pixel, vertex_obj in board_obj.boardGraph.items():
+        for v_idx, vertex_obj in board_obj.boardGraph.items():
             if vertex_obj.port and vertex_obj.port != False:
                 port_info = {
                     "type": vertex_obj.port,
@@ -272,38 +355,21 @@ class modelState():
                 # Find if this port type already exists to append vertex index
                 existing_port = next((p for p in ports if p["type"] == vertex_obj.port), None)
                 if existing_port:
-                    if pixel_to_vertex_index_map.get(vertex_pixel) not in existing_port["vertex_indices"]:
-                         existing_port["vertex_indices"].append(pixel_to_vertex_index_map.get(vertex_pixel))
+                    if v_idx not in existing_port["vertex_indices"]:
+                         existing_port["vertex_indices"].append(v_idx)
                 else:
-                    port_info["vertex_indices"].append(pixel_to_vertex_index_map.get(vertex_pixel))
+                    port_info["vertex_indices"].append(v_idx)
                     ports.append(port_info)
 
         # Sort vertex_indices in each port for consistent output
         for port_entry in ports:
             port_entry["vertex_indices"].sort()
 
-        # --- Hex Control Calculation ---
-        # This needs player information, so it's better done after players_states are partially computed
-        # or by passing players_queue and pixel_to_vertex_index_map into this function.
-        # For now, I'll compute it here, assuming access to necessary player build data.
-        # This implies get_players_state might need to be called first or player data passed in.
-        # To keep it within get_board_state, it needs to iterate through all players.
-        # This is inefficient. A better design would be to calculate this in the main __init__ after both board and players are fetched.
-        # TEMP: For now, let's assume this will be refactored or player data is accessible.
-        # For this step, I will defer full hex_control to a post-processing step if players_queue is not available here.
-        # Let's assume for the plan that this calculation can access player settlement/city locations.
-        # For now, I'll just add a placeholder for hex_control in the hexes list.
-
-        # Add hex_control placeholder to each hex
-        for h_data in hexes:
-            h_data["hex_control"] = [] # Placeholder: list of {"player_name": "name", "influence": X}
-
         # --- Choke Points (Simplified) ---
         # Vertices adjacent to 3 hexes, listing their roll numbers.
         choke_points_data = []
-        for v_coord, vertex_obj in board_obj.boardGraph.items():
+        for v_idx, vertex_obj in board_obj.boardGraph.items():
             if len(vertex_obj.adjacentHexList) == 3: # Typically, intersections are on 3 hexes
-                v_idx = pixel_to_vertex_index_map.get(v_coord)
                 if v_idx is not None:
                     connected_hex_details = []
                     is_valuable_choke = False
@@ -329,54 +395,19 @@ class modelState():
                         })
         choke_points_data = sorted(choke_points_data, key=lambda cp: cp["vertex_index"])
 
-        # --- Best Unoccupied Settlement Spots ---
-        # This requires knowing which spots are already occupied.
-        # We can get potential settlement spots and then filter out occupied ones.
-        # The heuristic from heuristicAIPlayer will be adapted here.
-
-        best_unoccupied_settlement_spots = []
-        # Create a set of all occupied vertex indices for quick lookup
-        occupied_vertex_indices = set()
-        for p_state in all_players_states: # Use the passed argument
-            occupied_vertex_indices.update(p_state["settlements_vertex_indices"])
-            occupied_vertex_indices.update(p_state["cities_vertex_indices"])
-
-        # Iterate over all vertex coordinates in the board graph
-        for v_coord, vertex_obj in board_obj.boardGraph.items():
-            v_idx = pixel_to_vertex_index_map.get(v_coord)
-            if v_idx is None or v_idx in occupied_vertex_indices:
-                continue # Skip if no valid index or already occupied
-
-            # Check distance rule: must be at least 2 edges away from existing settlements/cities
-            is_valid_spot = True
-            for occupied_v_idx in occupied_vertex_indices:
-                # This requires a graph distance function, which is complex here.
-                # A simpler check: no adjacent vertex is occupied.
-                # This uses board_obj.boardGraph[v_coord].edgeList to find neighbors.
-                # For a more accurate distance rule, board.is_valid_settlement_location(v_coord, player_for_perspective) is needed.
-                # For now, use a simplified check: are any *directly adjacent* vertices (connected by an edge) occupied?
-                # This is not the full Catan rule, but a proxy for modelState.
-                # The true "get_potential_settlements" in board.py handles the full rule.
-                # We should use board_obj.get_potential_settlements(for_any_player_hypothetically)
-                # This is tricky because get_potential_settlements is player-specific (road connection).
-                # Let's use the heuristic directly on all unoccupied spots that meet basic criteria.
-                # The game rules (distance) will be enforced by AIGame when an action is attempted.
-                # Here, we just score based on heuristic.
-                pass # Distance rule check is complex to replicate here fully. Assume spot is buildable for heuristic scoring.
-
-
+        # --- Settlement Spot Scores ---
+        # Production pips plus a diversity bonus, as in heuristicAIPlayer. Every vertex is scored whether occupied or not,
+        # get_board_state filters the ranking by the current occupancy
+        ranked_settlement_spots = []
+        for v_idx, vertex_obj in board_obj.boardGraph.items():
             vertex_num_value = 0
-            resources_at_vertex = {} # store resource_type: count_of_hexes_with_this_resource
             unique_resource_types = set()
 
             for adjacent_hex_idx in vertex_obj.adjacentHexList:
                 hex_tile = board_obj.hexTileDict.get(adjacent_hex_idx)
                 if hex_tile and hex_tile.resource:
-                    resource_type = hex_tile.resource.type
-                    if resource_type != "DESERT":
-                        unique_resource_types.add(resource_type)
-                        # Store counts if needed for more complex heuristics, e.g. preferring two wood hexes
-                        resources_at_vertex[resource_type] = resources_at_vertex.get(resource_type, 0) + 1
+                    if hex_tile.resource.type != "DESERT":
+                        unique_resource_types.add(hex_tile.resource.type)
 
                     roll_num = hex_tile.resource.num if hex_tile.resource.num is not None else 0
                     vertex_num_value += DICE_ROLL_PROBABILITIES.get(roll_num, 0)
@@ -385,35 +416,33 @@ class modelState():
             vertex_num_value += len(unique_resource_types) * 2 # Similar to heuristicAI
 
             if vertex_num_value > 0: # Only consider spots with some production value
-                best_unoccupied_settlement_spots.append({
+                ranked_settlement_spots.append({
                     "vertex_index": v_idx,
                     "heuristic_score": round(vertex_num_value,1),
                     "resource_types_available": sorted(list(unique_resource_types))
                 })
 
         # Sort by score descending, then by vertex_index ascending for tie-breaking
-        best_unoccupied_settlement_spots = sorted(best_unoccupied_settlement_spots, key=lambda x: (-x["heuristic_score"], x["vertex_index"]))
-
+        ranked_settlement_spots = sorted(ranked_settlement_spots, key=lambda x: (-x["heuristic_score"], x["vertex_index"]))
 
         return {
             "hexes": sorted(hexes, key=lambda h: h["hex_index"]), # Sort for consistency
             "ports": sorted(ports, key=lambda p: p["type"]), # Sort for consistency
-            "robber_location_hex_index": robber_location_hex_index,
-            "choke_points": choke_points_data, # Add choke points here
-            "best_unoccupied_settlement_spots": best_unoccupied_settlement_spots[:10] # Top 10
+            "choke_points": choke_points_data,
+            "ranked_settlement_spots": ranked_settlement_spots
         }
 
-    # Helper method to calculate hex control, called from __init__ after basic board and player states are ready
-    def _calculate_hex_control(self, board_obj, players_list_of_dicts, pixel_to_vertex_index_map):
+    # Helper method to calculate hex control, called from get_board_state with the player states' settlement/city locations
+    # Returns {hex_index: [{"player_name": name, "influence": X}]}
+    def _calculate_hex_control(self, board_obj, players_list_of_dicts):
         hex_control_map = {h_idx: [] for h_idx in board_obj.hexTileDict.keys()}
 
         for p_state in players_list_of_dicts:
             player_name = p_state["name"]
             # Iterate through player's settlements
             for s_v_idx in p_state["settlements_vertex_indices"]:
-                s_v_coord = board_obj.vertex_index_to_pixel_dict.get(s_v_idx)
-                if s_v_coord:
-                    vertex_obj = board_obj.boardGraph.get(s_v_coord)
+                if s_v_idx is not None:
+                    vertex_obj = board_obj.boardGraph.get(s_v_idx)
                     if vertex_obj:
                         for h_idx in vertex_obj.adjacentHexList:
                             # Check if player already listed for this hex, update influence or add new
@@ -424,9 +453,8 @@ class modelState():
                                 hex_control_map[h_idx].append({"player_name": player_name, "influence": 1})
             # Iterate through player's cities
             for c_v_idx in p_state["cities_vertex_indices"]:
-                c_v_coord = board_obj.vertex_index_to_pixel_dict.get(c_v_idx)
-                if c_v_coord:
-                    vertex_obj = board_obj.boardGraph.get(c_v_coord)
+                if c_v_idx is not None:
+                    vertex_obj = board_obj.boardGraph.get(c_v_idx)
                     if vertex_obj:
                         for h_idx in vertex_obj.adjacentHexList:
                             found_player_influence = next((inf for inf in hex_control_map.get(h_idx, []) if inf["player_name"] == player_name), None)
@@ -435,32 +463,23 @@ class modelState():
                             elif h_idx in hex_control_map: # Ensure hex_idx is valid before appending
                                 hex_control_map[h_idx].append({"player_name": player_name, "influence": 2})
 
-        # Integrate this into self.board.hexes
-        for h_data in self.board["hexes"]:
-            h_idx = h_data["hex_index"]
-            if h_idx in hex_control_map:
-                h_data["hex_control"] = sorted(hex_control_map[h_idx], key=lambda x: (-x["influence"], x["player_name"]))
+        return hex_control_map
 
 
-    def get_players_state(self, catan_game, current_player, board_obj): # Changed players_queue to catan_game
+    def get_players_state(self, catan_game, current_player, board_obj, board_cache=None): # Changed players_queue to catan_game
         player_states = []
         players_queue = catan_game.playerQueue.queue # Get queue from catan_game
-        # Create a reverse mapping from pixel coordinates to vertex index for easier lookup if not already done
-        pixel_to_vertex_index_map = {v_pixel: v_idx for v_idx, v_pixel in board_obj.vertex_index_to_pixel_dict.items()}
+        if board_cache is None:
+            board_cache = get_board_cache(board_obj)
 
         for p in list(players_queue): # Convert queue to list for iteration
-            settlements_indices = sorted([pixel_to_vertex_index_map.get(s_coord) for s_coord in p.buildGraph.get('SETTLEMENTS', []) if pixel_to_vertex_index_map.get(s_coord) is not None])
-            cities_indices = sorted([pixel_to_vertex_index_map.get(c_coord) for c_coord in p.buildGraph.get('CITIES', []) if pixel_to_vertex_index_map.get(c_coord) is not None])
-
-            roads_indices = []
-            for r_tuple in p.buildGraph.get('ROADS', []):
-                v1_idx = pixel_to_vertex_index_map.get(r_tuple[0])
-                v2_idx = pixel_to_vertex_index_map.get(r_tuple[1])
-                if v1_idx is not None and v2_idx is not None:
-                    # Sort to ensure consistent representation (e.g., (1,2) is same as (2,1))
-                    road_pair = tuple(sorted((v1_idx, v2_idx)))
-                    roads_indices.append(road_pair)
-            roads_indices = sorted(list(set(roads_indices))) # Remove duplicates and sort
+            # Building locations and the income they give only change with the board's state version
+            buildings_state = board_cache.player_buildings.get(p.name)
+            if buildings_state is None:
+                buildings_state = board_cache.player_buildings[p.name] = self.get_player_buildings_state(p, board_obj)
+            settlements_indices = buildings_state["settlements_vertex_indices"]
+            cities_indices = buildings_state["cities_vertex_indices"]
+            roads_indices = buildings_state["roads_vertex_indices_pairs"]
 
             # Calculate VP from different sources for the progress object
             vp_from_settlements_cities = len(settlements_indices) + (len(cities_indices) * 2)
@@ -475,7 +494,7 @@ class modelState():
             # This is a good check; if p.victoryPoints is the source of truth, use it.
             # The breakdown helps the AI understand the sources.
 
-            player_states.append({
+            player_state = {
                 "name": p.name,
                 "color": p.color,
                 "resources": p.resources, # Assuming this is a dict like {'WOOD': 1, 'BRICK': 0, ...}
@@ -490,114 +509,113 @@ class modelState():
                     "vp_from_settlements_cities": vp_from_settlements_cities,
                     "vp_from_unrevealed_dev_cards": vp_from_dev_cards, # VP cards in hand, not yet part of public VP
                     "vp_from_awards": vp_from_awards, # Longest Road, Largest Army
-                    # "publicly_visible_vp": vp_from_settlements_cities + vp_from_awards # VP visible on board
+                    "publicly_visible_vp": vp_from_settlements_cities + vp_from_awards # VP visible on board
                 },
                 "knights_played": p.knightsPlayed,
                 "has_largest_army": p.largestArmyFlag, # Renamed for clarity
                 "has_longest_road": p.longestRoadFlag, # Renamed for clarity
                 "is_current_player": p.name == current_player.name,
-                "threat_score": 0 # Will be calculated below
-            })
-
-        # Calculate strategic overlays: resource_affinity, strategic_posture, and enhanced threat_level
-        for player_state in player_states:
-            original_player_object = next((p_obj for p_obj in list(players_queue) if p_obj.name == player_state["name"]), None)
-
-            if original_player_object:
-                # Recalculate public VP for threat score to ensure it's based on current player_state data
-                # This is slightly redundant if p.visibleVictoryPoints is already accurate, but good for internal consistency here.
-                player_state["progress"]["publicly_visible_vp"] = player_state["progress"]["vp_from_settlements_cities"] + \
-                                                               player_state["progress"]["vp_from_awards"]
-
-
-                # 1. Resource Income Potential & Affinity
-                resource_income_potential = {"WOOD": 0, "BRICK": 0, "SHEEP": 0, "WHEAT": 0, "ORE": 0}
-                player_buildings = [] # List of (vertex_coord, type_is_city=True/False)
-                for s_coord_pixel in original_player_object.buildGraph.get('SETTLEMENTS', []):
-                    player_buildings.append((s_coord_pixel, False))
-                for c_coord_pixel in original_player_object.buildGraph.get('CITIES', []):
-                    player_buildings.append((c_coord_pixel, True))
-
-                for v_coord_pixel, is_city in player_buildings:
-                    vertex_obj = board_obj.boardGraph.get(v_coord_pixel)
-                    if vertex_obj:
-                        for hex_idx in vertex_obj.adjacentHexList:
-                            hex_tile = board_obj.hexTileDict.get(hex_idx)
-                            if hex_tile and hex_tile.resource and hex_tile.resource.type != "DESERT" and hex_tile.resource.num is not None:
-                                resource_type = hex_tile.resource.type
-                                probability_dots = DICE_ROLL_PROBABILITIES.get(hex_tile.resource.num, 0)
-                                # Resource income is sum of (dots * (2 if city else 1))
-                                resource_income_potential[resource_type] += probability_dots * (2 if is_city else 1)
-
-                player_state["resource_income_potential"] = resource_income_potential
-
-                # Determine resource affinity based on the highest income potential
-                if sum(resource_income_potential.values()) > 0:
-                    player_state["resource_affinity"] = max(resource_income_potential, key=resource_income_potential.get)
-                else:
-                    player_state["resource_affinity"] = "NONE"
-
+                # Strategic overlays: resource_affinity, strategic_posture and threat_level
+                "resource_income_potential": buildings_state["resource_income_potential"],
+                "resource_affinity": buildings_state["resource_affinity"]
+            }
 
-                # 2. Strategic Posture (simplified inference)
-                num_settlements = len(player_state["settlements_vertex_indices"])
-                num_cities = len(player_state["cities_vertex_indices"])
-                # road_length = original_player_object.maxRoadLength # Assuming player object has this
-                # For now, use number of road segments as a proxy if maxRoadLength isn't directly on player_state
-                road_segments_count = len(player_state["roads_vertex_indices_pairs"])
+            # Strategic Posture (simplified inference)
+            num_settlements = len(settlements_indices)
+            num_cities = len(cities_indices)
+            # road_length = original_player_object.maxRoadLength # Assuming player object has this
+            # For now, use number of road segments as a proxy if maxRoadLength isn't directly on player_state
+            road_segments_count = len(roads_indices)
 
 
-                # dev_cards_bought = original_player_object.developmentCardsBought # If tracked
-                # Using knights_played and unrevealed dev cards as proxy
-                dev_cards_metric = player_state["knights_played"] + sum(player_state["dev_cards_counts"].values())
+            # dev_cards_bought = original_player_object.developmentCardsBought # If tracked
+            # Using knights_played and unrevealed dev cards as proxy
+            dev_cards_metric = p.knightsPlayed + sum(p.devCards.values())
 
 
-                postures = []
-                if num_cities > num_settlements / 2 and num_cities > 0: # More cities or significant cities
-                    postures.append("CITY_BUILDER")
-                if road_segments_count >= 5 : # Threshold for seeking longest road
-                    postures.append("LONGEST_ROAD_SEEKER")
-                if dev_cards_metric >= 2: # Actively using/buying dev cards
-                    postures.append("DEVELOPMENT_CARD_USER")
-                if num_settlements > num_cities and num_settlements >=3: # Expansionist
-                     postures.append("EXPANSIONIST")
+            postures = []
+            if num_cities > num_settlements / 2 and num_cities > 0: # More cities or significant cities
+                postures.append("CITY_BUILDER")
+            if road_segments_count >= 5 : # Threshold for seeking longest road
+                postures.append("LONGEST_ROAD_SEEKER")
+            if dev_cards_metric >= 2: # Actively using/buying dev cards
+                postures.append("DEVELOPMENT_CARD_USER")
+            if num_settlements > num_cities and num_settlements >=3: # Expansionist
+                 postures.append("EXPANSIONIST")
 
-                if not postures and (num_settlements + num_cities) < 3 : postures.append("EARLY_DEVELOPMENT")
-                elif not postures: postures.append("BALANCED")
+            if not postures and (num_settlements + num_cities) < 3 : postures.append("EARLY_DEVELOPMENT")
+            elif not postures: postures.append("BALANCED")
 
-                player_state["strategic_posture"] = ", ".join(postures) if postures else "UNDEFINED"
+            player_state["strategic_posture"] = ", ".join(postures) if postures else "UNDEFINED"
 
 
-                # 3. Enhanced Threat Level
-                vp = player_state["total_victory_points"]
-                knights = player_state["knights_played"]
-                num_resource_cards = sum(original_player_object.resources.values())
-                num_dev_cards_unplayed = sum(player_state["dev_cards_counts"].values()) # Already in player_state
+            # Enhanced Threat Level
+            vp = p.victoryPoints
+            knights = p.knightsPlayed
+            num_resource_cards = sum(p.resources.values())
+            num_dev_cards_unplayed = sum(p.devCards.values())
 
-                base_threat = (vp * 3) + (knights * 1.5) + (road_segments_count * 0.2) + \
-                              ((num_resource_cards + num_dev_cards_unplayed) * 0.5)
+            base_threat = (vp * 3) + (knights * 1.5) + (road_segments_count * 0.2) + \
+                          ((num_resource_cards + num_dev_cards_unplayed) * 0.5)
 
-                # Proximity to victory bonus (e.g. 10 points to win)
-                max_points_for_game = catan_game.maxPoints if hasattr(catan_game, 'maxPoints') else 10
-                if vp >= max_points_for_game - 2: # e.g. 8 or 9 points if max is 10
-                    base_threat += 5
-                elif vp >= max_points_for_game - 3: # e.g. 7 points if max is 10
-                    base_threat += 2
+            # Proximity to victory bonus (e.g. 10 points to win)
+            max_points_for_game = catan_game.maxPoints if hasattr(catan_game, 'maxPoints') else 10
+            if vp >= max_points_for_game - 2: # e.g. 8 or 9 points if max is 10
+                base_threat += 5
+            elif vp >= max_points_for_game - 3: # e.g. 7 points if max is 10
+                base_threat += 2
 
-                player_state["threat_level"] = round(base_threat, 1)
-                del player_state["threat_score"] # Remove old field if it was there (it's initialized to 0 now)
+            player_state["threat_level"] = round(base_threat, 1)
+            player_states.append(player_state)
 
-            else: # Fallback if original_player_object not found
-                player_state["resource_affinity"] = "UNKNOWN"
-                player_state["strategic_posture"] = "UNKNOWN"
-                player_state["threat_level"] = player_state.get("victory_points",0) * 3
+        return sorted(player_states, key=lambda ps: ps["name"]) # Sort for consistency
 
+    # Sections of a player's state that only change when the player builds: building locations and their income
+    def get_player_buildings_state(self, p, board_obj):
+        # buildGraph stores vertex indices directly
+        settlements_indices = sorted(p.buildGraph.get('SETTLEMENTS', []))
+        cities_indices = sorted(p.buildGraph.get('CITIES', []))
+
+        roads_indices = []
+        for v1_idx, v2_idx in p.buildGraph.get('ROADS', []):
+            # Sort to ensure consistent representation (e.g., (1,2) is same as (2,1))
+            road_pair = tuple(sorted((v1_idx, v2_idx)))
+            roads_indices.append(road_pair)
+        roads_indices = sorted(list(set(roads_indices))) # Remove duplicates and sort
+
+        # Resource Income Potential & Affinity
+        resource_income_potential = {"WOOD": 0, "BRICK": 0, "SHEEP": 0, "WHEAT": 0, "ORE": 0}
+        player_buildings = [(v_idx, False) for v_idx in settlements_indices] + [(v_idx, True) for v_idx in cities_indices]
+
+        for v_idx, is_city in player_buildings:
+            vertex_obj = board_obj.boardGraph.get(v_idx)
+            if vertex_obj:
+                for hex_idx in vertex_obj.adjacentHexList:
+                    hex_tile = board_obj.hexTileDict.get(hex_idx)
+                    if hex_tile and hex_tile.resource and hex_tile.resource.type != "DESERT" and hex_tile.resource.num is not None:
+                        resource_type = hex_tile.resource.type
+                        probability_dots = DICE_ROLL_PROBABILITIES.get(hex_tile.resource.num, 0)
+                        # Resource income is sum of (dots * (2 if city else 1))
+                        resource_income_potential[resource_type] += probability_dots * (2 if is_city else 1)
+
+        # Determine resource affinity based on the highest income potential
+        if sum(resource_income_potential.values()) > 0:
+            resource_affinity = max(resource_income_potential, key=resource_income_potential.get)
+        else:
+            resource_affinity = "NONE"
 
-        return sorted(player_states, key=lambda ps: ps["name"]) # Sort for consistency
+        return {
+            "settlements_vertex_indices": settlements_indices,
+            "cities_vertex_indices": cities_indices,
+            "roads_vertex_indices_pairs": roads_indices,
+            "resource_income_potential": resource_income_potential,
+            "resource_affinity": resource_affinity
+        }
 
     def _json_serializer(self, obj):
         if isinstance(obj, (np.integer, np.int_)):
             return int(obj)
-        elif isinstance(obj, (np.floating, np.float_)):
+        elif isinstance(obj, np.floating):
             return float(obj)
         elif isinstance(obj, np.ndarray):
             return obj.tolist()
@@ -619,8 +637,30 @@ class modelState():
             except Exception:
                 raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable and has no __dict__ or str representation.")
 
-    def to_json(self):
-        return json.dumps(self, default=self._json_serializer, indent=4, sort_keys=True)
+    def to_dict(self, static_board=True):
+        """
+        Returns the state as a dict of the MODEL_STATE_FIELDS that are set, in schema order.
+        With static_board=False the board keeps only what changes during the game: hex control, robber and settlement spots.
+        """
+        state = self.__dict__
+        state_dict = {field: state[field] for field in MODEL_STATE_FIELDS if field in state}
+        if not static_board:
+            board = state_dict["board"]
+            state_dict["board"] = {field: value for field, value in board.items() if field not in STATIC_BOARD_FIELDS}
+            state_dict["board"]["hexes"] = [{"hex_index": h_data["hex_index"], "hex_control": h_data["hex_control"]} for h_data in board["hexes"]]
+        return state_dict
+
+    def to_json(self, compact=False, static_board=True):
+        """
+        Serializes the state in schema order. The compact form has no whitespace and is what the LLM players are sent;
+        it uses orjson when installed. _json_serializer is only a fallback for values that aren't plain Python types.
+        """
+        state_dict = self.to_dict(static_board)
+        if not compact:
+            return json.dumps(state_dict, default=self._json_serializer, indent=4)
+        if orjson is not None:
+            return orjson.dumps(state_dict, default=self._json_serializer, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+        return json.dumps(state_dict, default=self._json_serializer, separators=(',', ':'), ensure_ascii=False)
 
 if __name__ == '__main__':
     # This section is for example and testing; it would require mock objects
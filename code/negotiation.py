@@ -1,3 +1,5 @@
+from eventLog import log, INFO, WARNING
+
 class NegotiationManager:
     VALID_STATES = ["IDLE", "PROPOSED", "COUNTERED", "ACCEPTED", "REJECTED", "ENDED_BY_PLAYER", "ENDED_SYSTEM"]
 
@@ -12,7 +14,8 @@ class NegotiationManager:
 
     def start_negotiation(self, initiator_player, target_player, initial_offer_details: dict, game_turn: int):
         if self.current_state != "IDLE":
-            print(f"Warning: Starting a new negotiation while one is already active (state: {self.current_state}). This may override.")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text=f"Warning: Starting a new negotiation while one is already active (state: {self.current_state}). This may override.")
             # Potentially log or handle the override more gracefully
 
         self.initiator = initiator_player
@@ -21,15 +24,19 @@ class NegotiationManager:
         self.current_state = "PROPOSED"
         self.active_negotiator = target_player # Target player responds first
         self.last_turn_updated = game_turn
-        print(f"Negotiation started by {initiator_player.name} with {target_player.name} at turn {game_turn}. Offer: {initial_offer_details}")
+        if log.level <= INFO:
+            log.emit(INFO, 'NEGOTIATION', state=self.current_state, player=initiator_player.name, entry=self.history[-1],
+                     text=f"Negotiation started by {initiator_player.name} with {target_player.name} at turn {game_turn}. Offer: {initial_offer_details}")
         return True
 
     def add_counter_offer(self, countering_player, counter_offer_details: dict, game_turn: int):
         if self.current_state not in ["PROPOSED", "COUNTERED"]:
-            print(f"Error: Cannot make counter-offer in state {self.current_state}")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text=f"Error: Cannot make counter-offer in state {self.current_state}")
             return False
         if countering_player != self.active_negotiator:
-            print(f"Error: It's not {countering_player.name}'s turn to make a counter-offer. Active: {self.active_negotiator.name}")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text=f"Error: It's not {countering_player.name}'s turn to make a counter-offer. Active: {self.active_negotiator.name}")
             return False
 
         self.history.append(counter_offer_details)
@@ -37,15 +44,19 @@ class NegotiationManager:
         # Switch active negotiator
         self.active_negotiator = self.initiator if countering_player == self.target else self.target
         self.last_turn_updated = game_turn
-        print(f"{countering_player.name} made a counter-offer at turn {game_turn}. New offer: {counter_offer_details}")
+        if log.level <= INFO:
+            log.emit(INFO, 'NEGOTIATION', state=self.current_state, player=countering_player.name, entry=self.history[-1],
+                     text=f"{countering_player.name} made a counter-offer at turn {game_turn}. New offer: {counter_offer_details}")
         return True
 
     def accept_offer(self, accepting_player, game_turn: int):
         if self.current_state not in ["PROPOSED", "COUNTERED"]:
-            print(f"Error: Cannot accept offer in state {self.current_state}")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text=f"Error: Cannot accept offer in state {self.current_state}")
             return False
         if accepting_player != self.active_negotiator:
-            print(f"Error: It's not {accepting_player.name}'s turn to accept. Active: {self.active_negotiator.name}")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text=f"Error: It's not {accepting_player.name}'s turn to accept. Active: {self.active_negotiator.name}")
             return False
 
         # Further validation (e.g., can players afford the trade) should be done by AIGame before calling this
@@ -59,7 +70,9 @@ class NegotiationManager:
         self.current_state = "ACCEPTED"
         self.active_negotiator = None # No active negotiator once accepted
         self.last_turn_updated = game_turn
-        print(f"Offer accepted by {accepting_player.name} at turn {game_turn}. Last offer was: {last_offer}")
+        if log.level <= INFO:
+            log.emit(INFO, 'NEGOTIATION', state=self.current_state, player=accepting_player.name, entry=self.history[-1],
+                     text=f"Offer accepted by {accepting_player.name} at turn {game_turn}. Last offer was: {last_offer}")
         return True
 
     def reject_offer(self, rejecting_player, game_turn: int, reason: str = "No reason given."):
@@ -68,7 +81,8 @@ class NegotiationManager:
             # print(f"Warning: Rejecting offer in state {self.current_state}")
             pass # Allow this
         if rejecting_player != self.active_negotiator and self.current_state in ["PROPOSED", "COUNTERED"]:
-            print(f"Error: It's not {rejecting_player.name}'s turn to reject. Active: {self.active_negotiator.name if self.active_negotiator else 'None'}")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text=f"Error: It's not {rejecting_player.name}'s turn to reject. Active: {self.active_negotiator.name if self.active_negotiator else 'None'}")
             return False
 
         last_offer = self.history[-1] if self.history else None
@@ -82,12 +96,15 @@ class NegotiationManager:
         self.current_state = "REJECTED"
         self.active_negotiator = None
         self.last_turn_updated = game_turn
-        print(f"Offer rejected by {rejecting_player.name} at turn {game_turn}. Reason: {reason}. Last offer: {last_offer}")
+        if log.level <= INFO:
+            log.emit(INFO, 'NEGOTIATION', state=self.current_state, player=rejecting_player.name, entry=self.history[-1],
+                     text=f"Offer rejected by {rejecting_player.name} at turn {game_turn}. Reason: {reason}. Last offer: {last_offer}")
         return True
 
     def end_negotiation_by_player(self, player_ending, game_turn: int, reason: str = "Player chose to end."):
         if self.current_state == "IDLE" or self.current_state.startswith("ENDED_"):
-            print(f"Negotiation already ended or idle. Current state: {self.current_state}")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text=f"Negotiation already ended or idle. Current state: {self.current_state}")
             return False # Or True if we consider it "successfully ended"
 
         self.history.append({
@@ -99,13 +116,16 @@ class NegotiationManager:
         self.current_state = "ENDED_BY_PLAYER"
         self.active_negotiator = None
         self.last_turn_updated = game_turn
-        print(f"Negotiation ended by {player_ending.name} at turn {game_turn}. Reason: {reason}")
+        if log.level <= INFO:
+            log.emit(INFO, 'NEGOTIATION', state=self.current_state, player=player_ending.name, entry=self.history[-1],
+                     text=f"Negotiation ended by {player_ending.name} at turn {game_turn}. Reason: {reason}")
         return True
 
     def end_negotiation_by_system(self, game_turn: int, reason: str):
         if self.current_state == "IDLE" or self.current_state.startswith("ENDED_"):
             # This might happen if system tries to end an already concluded negotiation, e.g. timeout after player accept/reject
-            print(f"Negotiation already ended or idle. Current state: {self.current_state}. System tried to end for: {reason}")
+            if log.level <= WARNING:
+                log.emit(WARNING, 'MESSAGE', text=f"Negotiation already ended or idle. Current state: {self.current_state}. System tried to end for: {reason}")
             return True
 
         self.history.append({
@@ -116,7 +136,9 @@ class NegotiationManager:
         self.current_state = "ENDED_SYSTEM"
         self.active_negotiator = None
         self.last_turn_updated = game_turn
-        print(f"Negotiation ended by system at turn {game_turn}. Reason: {reason}")
+        if log.level <= INFO:
+            log.emit(INFO, 'NEGOTIATION', state=self.current_state, player=None, entry=self.history[-1],
+                     text=f"Negotiation ended by system at turn {game_turn}. Reason: {reason}")
         return True
 
     def get_context_for_player(self, player_obj):
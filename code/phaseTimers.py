@@ -0,0 +1,152 @@
+#Settlers of Catan
+#Per-phase timers and latency histograms of a game
+
+import json, math, sys, time
+
+#Log scale histogram buckets: BUCKETS_PER_DOUBLING per doubling from MIN_SECONDS, so a percentile is within ~4.5%
+MIN_SECONDS = 1e-6
+BUCKETS_PER_DOUBLING = 8
+NUM_BUCKETS = 40*BUCKETS_PER_DOUBLING #1us to ~13 days
+PERCENTILES = (50, 95, 99)
+
+#Phases timed in playCatan - render and model_state are also timed while waiting on LLMs
+PHASES = ('turn', 'dice', 'distribution', 'discard', 'robber', 'communication', 'negotiation',
+          'llm_wait', 'model_state', 'ai_decision', 'render')
+
+
+#Function to get the player type a phase is counted under - the LLM type, 'heuristic', 'mcts', or 'game' for no player
+def player_kind(player_i):
+    if player_i is None:
+        return 'game'
+    return getattr(player_i, 'llm_type', getattr(player_i, 'kind', 'heuristic'))
+
+
+#Class for the latency histogram of one phase and player type
+class LatencyHistogram():
+    'Log bucketed latency histogram with exact count, total and max'
+
+    def __init__(self):
+        self.buckets = [0]*NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        bucket = int(math.log2(seconds/MIN_SECONDS)*BUCKETS_PER_DOUBLING) + 1 if seconds > MIN_SECONDS else 0
+        self.buckets[min(bucket, NUM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    #Function to get the latency below which a percentage of the samples fall, from the bucket's upper bound
+    def percentile(self, percent):
+        rank = percent/100*self.count
+        seen = 0
+        for bucket, bucketCount in enumerate(self.buckets):
+            seen += bucketCount
+            if seen >= rank and bucketCount:
+                return min(self.max, MIN_SECONDS*2**(bucket/BUCKETS_PER_DOUBLING))
+        return self.max
+
+    def merge(self, other):
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def summary(self):
+        summary = {'count': self.count, 'total_s': self.total, 'mean_ms': self.total/self.count*1000 if self.count else 0.0}
+        for percent in PERCENTILES:
+            summary['p{}_ms'.format(percent)] = self.percentile(percent)*1000
+        summary['max_ms'] = self.max*1000
+        return summary
+
+
+#Context manager timing one phase, made by PhaseTimers.phase
+class PhaseTimer():
+    'Times one phase into its histogram'
+
+    __slots__ = ('histogram', 'startTime')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.startTime = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.add(time.perf_counter() - self.startTime)
+        return False
+
+#Phase timer of disabled timers - does nothing
+class NullTimer():
+    'No-op phase timer'
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_TIMER = NullTimer()
+
+
+#Class for the phase timers of a game, or of many games when one PhaseTimers is passed to each
+#    with self.timers.phase('dice', currPlayer):
+#        diceNum = self.gameLogic.roll_dice()
+#Phases may nest, e.g. llm_wait inside communication. Disabled timers hand out a shared no-op timer
+class PhaseTimers():
+    'Per phase, per player type latency histograms'
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.histograms = {} #(phase, player type) -> LatencyHistogram
+
+    def get_histogram(self, phase, player_i):
+        key = (phase, player_kind(player_i))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        return histogram
+
+    #Function to get a context manager timing a phase, counted under the player's type
+    def phase(self, phase, player_i=None):
+        if not self.enabled:
+            return NULL_TIMER
+        return PhaseTimer(self.get_histogram(phase, player_i))
+
+    #Function to add a time the caller measured, for spans a with block can't wrap
+    def record(self, phase, player_i, seconds):
+        if self.enabled:
+            self.get_histogram(phase, player_i).add(seconds)
+
+    #Function to add the histograms of other timers, e.g. of games run elsewhere
+    def merge(self, other):
+        for key, histogram in other.histograms.items():
+            self.histograms.setdefault(key, LatencyHistogram()).merge(histogram)
+
+    #Function to get {phase: {player type: {count, total_s, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}}
+    #Can be called at any point of a game
+    def summary(self):
+        summary = {}
+        for (phase, kind), histogram in sorted(self.histograms.items(), key=lambda item: (PHASES.index(item[0][0]) if item[0][0] in PHASES else len(PHASES), item[0])):
+            summary.setdefault(phase, {})[kind] = histogram.summary()
+        return summary
+
+    #Function to write the summary as JSON
+    def export(self, path):
+        with open(path, 'w') as exportFile:
+            json.dump(self.summary(), exportFile, indent=2)
+
+    #Function to print the summary as a table
+    def print_summary(self, stream=None):
+        stream = stream or sys.stdout
+        print("{:<14} {:<10} {:>8} {:>10} {:>10} {:>10} {:>10} {:>10}".format('phase', 'player', 'count', 'total s', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms'), file=stream)
+        for phase, kinds in self.summary().items():
+            for kind, stats in kinds.items():
+                print("{:<14} {:<10} {:>8} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.3f}".format(
+                    phase, kind, stats['count'], stats['total_s'], stats['p50_ms'], stats['p95_ms'], stats['p99_ms'], stats['max_ms']), file=stream)
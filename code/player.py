@@ -2,6 +2,7 @@
 #Player class implementation
 
 from board import *
+from eventLog import log, DEBUG, INFO
 import numpy as np
 
 #Class definition for a player
@@ -12,6 +13,7 @@ class player():
     def __init__(self, playerName, playerColor):
         self.name = playerName
         self.color = playerColor
+        self.rng = np.random.default_rng() #Random stream of this player, replaced by the game's agent stream when seated
         self.victoryPoints = 0
         self.isAI = False
 
@@ -50,15 +52,18 @@ class player():
             if self.roadsLeft > 0:
                 can_build = True
             else:
-                print(f"{self.name} has no roads left to build during setup.") # Should not happen in normal setup
+                if log.level <= DEBUG:
+                    log.emit(DEBUG, 'BUILD_FAILED', player=self.name, piece='ROAD', reason='NO_PIECES_SETUP') # Should not happen in normal setup
         else: # Main game phase - check resources
             if self.resources['BRICK'] > 0 and self.resources['WOOD'] > 0:
                 if self.roadsLeft > 0:
                     can_build = True
                 else:
-                    print(f"{self.name} has no roads available to build.")
+                    if log.level <= DEBUG:
+                        log.emit(DEBUG, 'BUILD_FAILED', player=self.name, piece='ROAD', reason='NO_PIECES')
             else:
-                print(f"{self.name} has insufficient Resources to Build Road - Need 1 BRICK, 1 WOOD.")
+                if log.level <= DEBUG:
+                    log.emit(DEBUG, 'BUILD_FAILED', player=self.name, piece='ROAD', reason='NO_RESOURCES')
 
         if can_build:
             self.buildGraph['ROADS'].append((v1,v2))
@@ -79,45 +84,56 @@ class player():
                  self.maxRoadLength = 0
 
 
-            print('{} Built a Road. MaxRoadLength: {}'.format(self.name, self.maxRoadLength))
+            if log.level <= INFO:
+                log.emit(INFO, 'BUILD_ROAD', player=self.name, v1=v1, v2=v2, length=self.maxRoadLength, setup=setup_phase)
             return True # Indicate success
 
         return False # Indicate failure
 
 
     #function to build a settlement on vertex with coordinates vCoord
-    def build_settlement(self, vCoord, board):
+    #Setup phase settlements are free
+    def build_settlement(self, vCoord, board, setup_phase=False):
         'Update player buildGraph and boardgraph to add a settlement on vertex v'
         #Take input from Player on where to build settlement
             #Check if player has correct resources
                 #Update player resources and boardGraph with transaction
 
-        if(self.resources['BRICK'] > 0 and self.resources['WOOD'] > 0 and self.resources['SHEEP'] > 0 and self.resources['WHEAT'] > 0): #Check if player has resources available
+        if(setup_phase or (self.resources['BRICK'] > 0 and self.resources['WOOD'] > 0 and self.resources['SHEEP'] > 0 and self.resources['WHEAT'] > 0)): #Check if player has resources available
             if(self.settlementsLeft > 0): #Check if player has settlements left
                 self.buildGraph['SETTLEMENTS'].append(vCoord)
                 self.settlementsLeft -= 1
 
                 #Update player resources
-                self.resources['BRICK'] -= 1
-                self.resources['WOOD'] -= 1
-                self.resources['SHEEP'] -= 1
-                self.resources['WHEAT'] -= 1
+                if not setup_phase:
+                    self.resources['BRICK'] -= 1
+                    self.resources['WOOD'] -= 1
+                    self.resources['SHEEP'] -= 1
+                    self.resources['WHEAT'] -= 1
                 
                 self.victoryPoints += 1
                 board.updateBoardGraph_settlement(vCoord, self) #update the overall boardGraph
 
-                print('{} Built a Settlement'.format(self.name))
+                if log.level <= INFO:
+                    log.emit(INFO, 'BUILD_SETTLEMENT', player=self.name, vertex=vCoord, setup=setup_phase)
                 
                  #Add port to players port list if it is a new port
                 if((board.boardGraph[vCoord].port != False) and (board.boardGraph[vCoord].port not in self.portList)):
                     self.portList.append(board.boardGraph[vCoord].port)
-                    print("{} now has {} Port access".format(self.name, board.boardGraph[vCoord].port))
+                    if log.level <= INFO:
+                        log.emit(INFO, 'PORT_ACCESS', player=self.name, port=board.boardGraph[vCoord].port)
+
+                return True
 
             else:
-                print("No settlements available to build")
+                if log.level <= DEBUG:
+                    log.emit(DEBUG, 'BUILD_FAILED', player=self.name, piece='SETTLEMENT', reason='NO_PIECES')
   
         else:
-            print("Insufficient Resources to Build Settlement. Build Cost: 1 BRICK, 1 WOOD, 1 WHEAT, 1 SHEEP")
+            if log.level <= DEBUG:
+                log.emit(DEBUG, 'BUILD_FAILED', player=self.name, piece='SETTLEMENT', reason='NO_RESOURCES')
+
+        return False
 
     #function to build a city on vertex v
     def build_city(self, vCoord, board):
@@ -134,29 +150,36 @@ class player():
                 self.victoryPoints += 1
 
                 board.updateBoardGraph_city(vCoord, self) #update the overall boardGraph
-                print('{} Built a City'.format(self.name))
+                if log.level <= INFO:
+                    log.emit(INFO, 'BUILD_CITY', player=self.name, vertex=vCoord)
+                return True
 
             else:
-                print("No cities available to build")
+                if log.level <= DEBUG:
+                    log.emit(DEBUG, 'BUILD_FAILED', player=self.name, piece='CITY', reason='NO_PIECES')
 
         else:
-            print("Insufficient Resources to Build City. Build Cost: 3 ORE, 2 WHEAT")
+            if log.level <= DEBUG:
+                log.emit(DEBUG, 'BUILD_FAILED', player=self.name, piece='CITY', reason='NO_RESOURCES')
+
+        return False
     
     #function to move robber to a specific hex and steal from a player
     def move_robber(self, hexIndex, board, player_robbed):
         'Update boardGraph with Robber and steal resource'
         board.updateBoardGraph_robber(hexIndex)
+        if log.level <= INFO:
+            log.emit(INFO, 'MOVE_ROBBER', player=self.name, hex=hexIndex)
         
-        #Steal a random resource from other players
-        self.steal_resource(player_robbed)
-
-        return
+        #Steal a random resource from other players - returns the resource stolen or None
+        return self.steal_resource(player_robbed)
 
 
     #Function to steal a random resource from player_2
     def steal_resource(self, player_2):
         if(player_2 == None):
-            print("No Player on this hex to Rob")
+            if log.level <= INFO:
+                log.emit(INFO, 'STEAL', player=self.name, victim=None, resource=None)
             return None # Return None if no player or no resources to steal
         
         #Get all resources player 2 has in a list and use random list index to steal
@@ -165,100 +188,47 @@ class player():
             p2_resources_list += [resourceName]*resourceAmount
 
         if not p2_resources_list: # Check if player_2 has any resources
-            print(f"Player {player_2.name} has no resources to steal.")
+            if log.level <= INFO:
+                log.emit(INFO, 'STEAL', player=self.name, victim=player_2.name, resource=None)
             return None
 
-        #Get a random permutation and steal a card
-        # Corrected to use the populated list directly for random choice
-        resourceStolen = np.random.choice(p2_resources_list)
+        #Steal a random card
+        resourceStolen = p2_resources_list[self.rng.integers(len(p2_resources_list))]
         
         #Update resources of both players
         player_2.resources[resourceStolen] -= 1
         self.resources[resourceStolen] += 1
-        print(f"{self.name} stole 1 {resourceStolen} from Player {player_2.name}")
+        if log.level <= INFO:
+            log.emit(INFO, 'STEAL', player=self.name, victim=player_2.name, resource=resourceStolen)
 
         return resourceStolen # Return the stolen resource type
 
         
     #Function to calculate road length for longest road calculation
-    #Use both player buildgraph and board graph to compute recursively
+    #The board keeps the road networks and caches the longest trail of each, see longestRoad.py
     def get_road_length(self, board):
-        roadLengths = [] #List to store road lengths from each starting edge
-        for road in self.buildGraph['ROADS']: #check for every starting edge
-            self.road_i_lengths = [] #List to keep track of all lengths of roads resulting from this root road
-            roadCount = 0
-            roadArr = []
-            vertexList = []
-            #print("Start road:", road)
-            self.check_path_length(road, roadArr, roadCount, vertexList, board.boardGraph)
-
-            road_inverted = (road[1], road[0])
-            roadCount = 0
-            roadArr = []
-            vertexList = []
-            self.check_path_length(road_inverted, roadArr, roadCount, vertexList, board.boardGraph)
-                
-            roadLengths.append(max(self.road_i_lengths)) #Update roadLength with max starting from this road
-            #print(self.road_i_lengths)
-
-        #print("Road Lengths:", roadLengths, max(roadLengths))
-        return max(roadLengths)
-
-    #Function to checl the path length from a current edge to all possible other vertices not yet visited by t
-    def check_path_length(self, edge, edgeList, roadLength, vertexList, boardGraph):
-        #Append current edge to list and increment road count
-        edgeList.append(edge) #Append the road
-        roadLength += 1
-        vertexList.append(edge[0]) #Append the first vertex
-        
-        #Get new neighboring forward edges from this edge - not visited by the search yet
-        road_neighbors_list = self.get_neighboring_roads(edge, boardGraph, edgeList, vertexList)
-        
-        #print(neighboringRoads)
-        #if no neighboring roads exist append the roadLength upto this edge
-        if(road_neighbors_list == []):
-            #print("No new neighbors found")
-            self.road_i_lengths.append(roadLength)
-            return
+        return board.longestRoad.get_longest_road(self)
 
-        else:
-            #check paths from left and right neighbors separately
-            for neighbor_road in road_neighbors_list:
-                #print("checking neighboring edge:", neighbor_road)
-                self.check_path_length(neighbor_road, edgeList, roadLength, vertexList, boardGraph)
-
-
-
-    #Helper function to get neighboring edges from this road that haven't already been explored
-    #We want forward neighbors only
-    def get_neighboring_roads(self, road_i, boardGraph, visitedRoads, visitedVertices):
-        #print("Getting neighboring roads for current road:", road_i)
-        newNeighbors = []
-        #Use v1 and v2 to get the vertices to expand from
-        v1 = road_i[0]
-        v2 = road_i[1] 
-        for edge in self.buildGraph['ROADS']:
-            if(edge[1] in visitedVertices):
-                edge = (edge[1], edge[0]) #flip the edge if the orientation is reversed
-
-            if(edge not in visitedRoads): #If it is a new distinct edge
-                if(boardGraph[v2].state['Player'] in [self, None]):#Add condition for vertex to be not colonised by anyone else
-                    if(edge[0] == v2 and edge[0] not in visitedVertices):  #If v2 has neighbors, defined starting or finishing at v2
-                        #print("Appending NEW neighbor:", edge)
-                        newNeighbors.append(edge)
-
-                    if(edge[0] == v1 and edge[0] not in visitedVertices):
-                        newNeighbors.append(edge)
-
-                    if(edge[1] == v2 and edge[1] not in visitedVertices): #If v1 has neighbors, defined starting or finishing at v2
-                        newNeighbors.append((edge[1], edge[0]))
-
-                    if(edge[1] == v1 and edge[1] not in visitedVertices):
-                        newNeighbors.append((edge[1], edge[0]))
+        
+    #Function to get an immutable snapshot of the player's game state
+    def snapshot(self):
+        return (tuple(self.resources.values()), tuple(self.devCards.values()), tuple(self.newDevCards),
+                tuple(self.buildGraph['ROADS']), tuple(self.buildGraph['SETTLEMENTS']), tuple(self.buildGraph['CITIES']), tuple(self.portList),
+                self.victoryPoints, self.visibleVictoryPoints, self.settlementsLeft, self.roadsLeft, self.citiesLeft,
+                self.knightsPlayed, self.largestArmyFlag, self.maxRoadLength, self.longestRoadFlag, self.devCardPlayedThisTurn)
+
+    #Function to return the player to a snapshot
+    def restore(self, snapshot):
+        (resources, devCards, newDevCards, roads, settlements, cities, portList,
+         self.victoryPoints, self.visibleVictoryPoints, self.settlementsLeft, self.roadsLeft, self.citiesLeft,
+         self.knightsPlayed, self.largestArmyFlag, self.maxRoadLength, self.longestRoadFlag, self.devCardPlayedThisTurn) = snapshot
+        self.resources = dict(zip(self.resources, resources))
+        self.devCards = dict(zip(self.devCards, devCards))
+        self.newDevCards = list(newDevCards)
+        self.buildGraph = {'ROADS':list(roads), 'SETTLEMENTS':list(settlements), 'CITIES':list(cities)}
+        self.portList = list(portList)
 
-        return newNeighbors
 
-        
     #function to end turn
     def end_turn():
         'Pass turn to next player and update game state'
@@ -267,25 +237,19 @@ class player():
     def draw_devCard(self, board):
         'Draw a random dev card from stack and update self.devcards'
         if not (self.resources['WHEAT'] >= 1 and self.resources['ORE'] >= 1 and self.resources['SHEEP'] >= 1): #Check if player has resources available
-            print("Insufficient Resources for Dev Card. Cost: 1 ORE, 1 WHEAT, 1 SHEEP")
+            if log.level <= DEBUG:
+                log.emit(DEBUG, 'BUILD_FAILED', player=self.name, piece='DEVCARD', reason='NO_RESOURCES')
             return False
 
-        #Get alldev cards available
-        devCardsToDraw = []
-        for cardName, cardAmount in board.devCardStack.items():
-            devCardsToDraw += [cardName]*cardAmount
+        #Draw the top card of the shuffled deck
+        cardDrawn = board.devCardStack.draw()
 
         #IF there are no devCards left
-        if(devCardsToDraw == []):
-            print("No Dev Cards Left!")
+        if(cardDrawn is None):
+            if log.level <= DEBUG:
+                log.emit(DEBUG, 'BUILD_FAILED', player=self.name, piece='DEVCARD', reason='NO_PIECES')
             return False
 
-        devCardIndex = np.random.randint(0, len(devCardsToDraw)) # This line was already correctly indented
-
-        #Get a random permutation and draw a card
-        devCardsToDraw = np.random.permutation(devCardsToDraw) # Corrected indentation
-        cardDrawn = devCardsToDraw[devCardIndex]
-
         #Update player resources
         self.resources['ORE'] -= 1
         self.resources['WHEAT'] -= 1
@@ -294,15 +258,14 @@ class player():
         #If card is a victory point apply immediately, else add to new card list
         if(cardDrawn == 'VP'):
             self.victoryPoints += 1
-            board.devCardStack[cardDrawn] -= 1
             self.devCards[cardDrawn] += 1
             self.visibleVictoryPoints = self.victoryPoints - self.devCards['VP']
         
-        else:#Update player dev card and the stack
+        else:#Update player dev card list
             self.newDevCards.append(cardDrawn)
-            board.devCardStack[cardDrawn] -= 1
         
-        print("{} drew a {} from Development Card Stack".format(self.name, cardDrawn))
+        if log.level <= INFO:
+            log.emit(INFO, 'DRAW_DEV_CARD', player=self.name, card=cardDrawn)
         return True
 
     #Function to update dev card stack with dev cards drawn from prior turn
@@ -346,7 +309,8 @@ class player():
         devCardPlayed = devCard_dict[devCardNumber]
         self.devCardPlayedThisTurn = True
 
-        print("Playing Dev Card:", devCardPlayed)
+        if log.level <= INFO:
+            log.emit(INFO, 'PLAY_DEV_CARD', player=self.name, card=devCardPlayed)
         self.devCards[devCardPlayed] -= 1
 
         #Logic for each Dev Card
@@ -373,6 +337,8 @@ class player():
 
             self.resources[r1] += 1
             self.resources[r2] += 1
+            if log.level <= INFO:
+                log.emit(INFO, 'DEV_CARD_RESOURCES', player=self.name, card=devCardPlayed, resources=[r1, r2])
 
         if(devCardPlayed == 'MONOPOLY'):
             print("Resources to Monopolize:", resource_list)
@@ -380,6 +346,8 @@ class player():
             resourceToMonopolize = ""
             while (resourceToMonopolize not in self.resources.keys()):
                 resourceToMonopolize = input("Enter resource name to monopolise: ").upper()
+            if log.level <= INFO:
+                log.emit(INFO, 'DEV_CARD_RESOURCES', player=self.name, card=devCardPlayed, resources=[resourceToMonopolize])
 
             #Loop over each player to Monopolize all resources
             for player in list(game.playerQueue.queue):
@@ -403,25 +371,29 @@ class player():
         if(r1_port in self.portList and self.resources[r1] >= 2): #Can use 2:1 port with r1
             self.resources[r1] -= 2
             self.resources[r2] += 1
-            print("Traded 2 {} for 1 {} using {} Port".format(r1, r2, r1))
+            if log.level <= INFO:
+                log.emit(INFO, 'BANK_TRADE', player=self.name, give=r1, get=r2, ratio=2)
             return
 
         #Check for 3:1 Port
         elif('3:1 PORT' in self.portList and self.resources[r1] >= 3):
             self.resources[r1] -= 3
             self.resources[r2] += 1
-            print("Traded 3 {} for 1 {} using 3:1 Port".format(r1, r2))
+            if log.level <= INFO:
+                log.emit(INFO, 'BANK_TRADE', player=self.name, give=r1, get=r2, ratio=3)
             return
 
         #Check 4:1 port
         elif(self.resources[r1] >= 4):
             self.resources[r1] -= 4
             self.resources[r2] += 1
-            print("Traded 4 {} for 1 {}".format(r1, r2))
+            if log.level <= INFO:
+                log.emit(INFO, 'BANK_TRADE', player=self.name, give=r1, get=r2, ratio=4)
             return
         
         else:
-            print("Insufficient resource {} to trade with Bank".format(r1))
+            if log.level <= DEBUG:
+                log.emit(DEBUG, 'BANK_TRADE_FAILED', player=self.name, give=r1, get=r2)
             return
 
 
@@ -0,0 +1,79 @@
+#Settlers of Catan
+#Dice roll production table - which player collects what for each roll number
+
+#Class to keep the payouts of every roll number up to date as the board changes
+#Buildings are tracked per hex, and the flat payout list of a roll number is rebuilt
+#lazily the first time it is rolled after one of its hexes changed
+class ProductionTable():
+    'Roll number -> tuple of (player, resource, amount) payouts'
+
+    def __init__(self, board):
+        self.topology = board.topology
+        self.hexRoll = [] #hexIndex -> roll number of the hex, None for the desert
+        self.hexResource = [] #hexIndex -> resource type produced
+        self.rollHexes = {roll: [] for roll in range(2, 13)} #roll number -> hexes with that number
+        for hexIndex in range(self.topology.num_hexes):
+            hexResource = board.hexTileDict[hexIndex].resource
+            self.hexRoll.append(hexResource.num)
+            self.hexResource.append(hexResource.type)
+            if hexResource.num is not None:
+                self.rollHexes[hexResource.num].append(hexIndex)
+
+        self.hexBuildings = [{} for h in range(self.topology.num_hexes)] #hexIndex -> {player: resource amount per roll}
+        self.robberHex = None
+        self.payouts = {} #roll number -> ((player, resource, amount), ...), missing when it needs rebuilding
+
+        return None
+
+
+    #Function to add amount of production for player on every hex around vertex v
+    #A settlement adds 1, upgrading it to a city adds 1 more
+    def add_building(self, player, v, amount=1):
+        for hexIndex in self.topology.vertex_hexes[v]:
+            hexBuildings = self.hexBuildings[hexIndex]
+            hexBuildings[player] = hexBuildings.get(player, 0) + amount
+            self.invalidate(hexIndex)
+
+
+    #Function to move the robber to hexIndex - the robbed hex pays nothing
+    def move_robber(self, hexIndex):
+        if self.robberHex is not None:
+            self.invalidate(self.robberHex)
+        self.robberHex = hexIndex
+        self.invalidate(hexIndex)
+
+
+    #Helper function to drop the cached payouts of the roll number of a hex
+    def invalidate(self, hexIndex):
+        self.payouts.pop(self.hexRoll[hexIndex], None)
+
+
+    #Function to get an immutable snapshot of the buildings and robber
+    #Cached payout lists are never modified once built, so they are shared with the snapshot
+    def snapshot(self):
+        return (tuple(tuple(hexBuildings.items()) for hexBuildings in self.hexBuildings), self.robberHex, tuple(self.payouts.items()))
+
+
+    #Function to return to a snapshot
+    def restore(self, snapshot):
+        hexBuildings, self.robberHex, payouts = snapshot
+        self.hexBuildings = [dict(buildings) for buildings in hexBuildings]
+        self.payouts = dict(payouts)
+
+
+    #Function to get the payouts of a roll number as a flat list of (player, resource, amount)
+    #Payouts of one player for the same resource from both hexes of a number are combined
+    def get_payouts(self, roll):
+        payouts = self.payouts.get(roll)
+        if payouts is None:
+            totals = {}
+            for hexIndex in self.rollHexes.get(roll, ()):
+                if hexIndex == self.robberHex:
+                    continue
+                resourceType = self.hexResource[hexIndex]
+                for player, amount in self.hexBuildings[hexIndex].items():
+                    totals[(player, resourceType)] = totals.get((player, resourceType), 0) + amount
+            payouts = tuple((player, resourceType, amount) for (player, resourceType), amount in totals.items())
+            self.payouts[roll] = payouts
+
+        return payouts
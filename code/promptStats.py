@@ -0,0 +1,60 @@
+#Settlers of Catan
+#Prefix and suffix sizes of the prompts sent to LLM players, and how often their prefix could be served from a cache
+
+#Class for the prompt statistics of one LLM player, or of many when merged
+#Prompts are a prefix that is byte-stable across a game (rules, response format, persona, the fixed board),
+#with state deltas followed by the state at the start of the turn, and a suffix that changes every call. Providers cache prompt prefixes they have seen, so a prompt whose
+#prefix was already sent is counted as a prefix hit. Nothing is sent to count, so this works offline
+class PromptStats():
+    'Prompt prefix/suffix sizes and prefix hits'
+
+    def __init__(self):
+        self.calls = 0
+        self.prefixHits = 0
+        self.prefixBytes = 0
+        self.suffixBytes = 0
+        self.hitBytes = 0 #Prefix bytes of the hits - the part of the prompts a prefix cache serves
+        self.seenPrefixes = set()
+
+    #Function to count one prompt
+    def add(self, prefix, suffix):
+        prefixBytes, suffixBytes = len(prefix.encode()), len(suffix.encode())
+        self.calls += 1
+        self.prefixBytes += prefixBytes
+        self.suffixBytes += suffixBytes
+        if prefix in self.seenPrefixes:
+            self.prefixHits += 1
+            self.hitBytes += prefixBytes
+        else:
+            self.seenPrefixes.add(prefix)
+
+    #Function to add the counts of another player's prompts - their prefixes are their own, so none are shared
+    def merge(self, other):
+        self.calls += other.calls
+        self.prefixHits += other.prefixHits
+        self.prefixBytes += other.prefixBytes
+        self.suffixBytes += other.suffixBytes
+        self.hitBytes += other.hitBytes
+
+    def summary(self):
+        calls, totalBytes = max(self.calls, 1), max(self.prefixBytes + self.suffixBytes, 1)
+        return {'calls': self.calls, 'prefix_hits': self.prefixHits, 'prefix_hit_ratio': round(self.prefixHits/calls, 4),
+                'mean_prefix_bytes': round(self.prefixBytes/calls, 1), 'mean_suffix_bytes': round(self.suffixBytes/calls, 1),
+                'cached_byte_ratio': round(self.hitBytes/totalBytes, 4)}
+
+
+if __name__ == '__main__':
+    import contextlib, io
+    from AIGame import catanAIGame
+    from LLMPlayer import LLMPlayer
+    from eventLog import log, OFF
+
+    #Placeholder LLM players answer offline, so the prompts of a whole game are built without an API
+    with log.configured(level=OFF), contextlib.redirect_stdout(io.StringIO()):
+        game = catanAIGame(headless=True, roster=['chatgpt', 'claude', 'deepseek', 'heuristic'], seed=0, maxTurns=60)
+    total = PromptStats()
+    for player_i in game.playerQueue.queue:
+        if isinstance(player_i, LLMPlayer):
+            print(player_i.name, player_i.prompt_stats.summary())
+            total.merge(player_i.prompt_stats)
+    print("All LLM players", total.summary())
@@ -0,0 +1,264 @@
+#Settlers of Catan
+#Replay of recorded games with checkpoints for random access
+
+import numpy as np
+from board import catanBoard
+from player import player
+from gameState import GameState
+from gameRecord import GameRecord, RECORD_TYPES, RESOURCE_TYPES, DEV_CARD_TYPES, NONE, NO_VALUE
+from eventLog import log, OFF
+
+#Records between two checkpoints - a seek applies at most this many records
+CHECKPOINT_EVERY = 128
+PLAYER_COLORS = ['black', 'darkslateblue', 'magenta4', 'orange1']
+
+
+#Class to rebuild a recorded game on a fresh board and players
+#Records are applied straight to the board and player model - no AI or LLM is asked for anything.
+#A GameState snapshot is kept every CHECKPOINT_EVERY records as the replay first passes them,
+#so seeking anywhere restores the closest checkpoint before it and applies the few records in between
+class GameReplay():
+    'Recorded game replay with random access seek'
+
+    def __init__(self, record, gameIndex=0, checkpointEvery=CHECKPOINT_EVERY):
+        if isinstance(record, str):
+            record = GameRecord(record)
+        names, kinds, layout, deck = record.game_setup(gameIndex)
+        gameRecords = record.game_records(gameIndex)
+        self.records = gameRecords.tolist() #Tuples are much faster to apply than numpy rows
+        self.turns = np.array(gameRecords['turn']) #Non decreasing, for seeking by turn
+
+        with log.configured(level=OFF):
+            self.board = catanBoard(layout=layout)
+            self.players = [player(name, PLAYER_COLORS[seat % len(PLAYER_COLORS)]) for seat, name in enumerate(names)]
+        self.kinds = kinds
+        self.board.devCardStack.restore((deck, 0, tuple((card, deck.count(card)) for card in DEV_CARD_TYPES)))
+        self.state = GameState(self.board, self.players)
+
+        #Function applying each record type, by record code - None for records that don't change the state
+        appliers = {'TURN_START': self.apply_turn_start, 'PAYOUT': self.apply_payout, 'SETUP_RESOURCE': self.apply_setup_resource,
+                    'BUILD_ROAD': self.apply_road, 'BUILD_SETTLEMENT': self.apply_settlement, 'BUILD_CITY': self.apply_city,
+                    'MOVE_ROBBER': self.apply_robber, 'STEAL': self.apply_steal, 'DISCARD': self.apply_discard,
+                    'DRAW_DEV_CARD': self.apply_draw_dev_card, 'PLAY_DEV_CARD': self.apply_play_dev_card,
+                    'DEV_CARD_RESOURCES': self.apply_dev_card_resources, 'BANK_TRADE': self.apply_bank_trade,
+                    'PLAYER_TRADE': self.apply_player_trade, 'LONGEST_ROAD': self.apply_longest_road, 'LARGEST_ARMY': self.apply_largest_army}
+        self.appliers = [appliers.get(recordType) for recordType in RECORD_TYPES]
+
+        self.position = 0 #Index of the next record to apply
+        self.checkpointEvery = checkpointEvery
+        self.checkpoints = [self.state.snapshot()] #checkpoints[k] is the state at position k*checkpointEvery
+
+        return None
+
+    #Number of records in the game
+    def __len__(self):
+        return len(self.records)
+
+    #Turn of the last applied record - 0 during setup
+    @property
+    def turn(self):
+        return int(self.turns[self.position - 1]) if self.position > 0 else 0
+
+    #Function to apply records up to position, storing checkpoints on the way
+    def advance(self, position):
+        position = min(position, len(self.records))
+        every = self.checkpointEvery
+        appliers = self.appliers
+        with log.configured(level=OFF): #Player methods are used to build, their events aren't wanted again
+            while self.position < position:
+                boundary = min(position, (self.position // every + 1)*every)
+                for code, seat, turn, a, b in self.records[self.position:boundary]:
+                    apply = appliers[code]
+                    if apply is not None:
+                        apply(seat, a, b)
+                self.position = boundary
+                if boundary % every == 0 and boundary // every == len(self.checkpoints):
+                    self.checkpoints.append(self.state.snapshot())
+
+    #Function to go to a record position, forwards or backwards
+    def seek(self, position):
+        position = max(0, min(position, len(self.records)))
+        checkpoint = min(position // self.checkpointEvery, len(self.checkpoints) - 1)
+        #Restore unless the current position is already between the checkpoint and the target
+        if not checkpoint*self.checkpointEvery <= self.position <= position:
+            self.state.restore(self.checkpoints[checkpoint])
+            self.position = checkpoint*self.checkpointEvery
+        self.advance(position)
+
+    #Function to go to the start of a turn, before its first record - turn 1 is the first turn after setup
+    def seek_turn(self, turn):
+        self.seek(int(np.searchsorted(self.turns, turn, side='left')))
+
+    #Function to replay the rest of the game
+    def run(self):
+        self.advance(len(self.records))
+
+
+    def apply_turn_start(self, seat, a, b):
+        player_i = self.players[seat]
+        player_i.updateDevCards()
+        player_i.devCardPlayedThisTurn = False
+
+    def apply_payout(self, seat, a, b):
+        self.players[seat].resources[RESOURCE_TYPES[a]] += b
+
+    def apply_setup_resource(self, seat, a, b):
+        self.players[seat].resources[RESOURCE_TYPES[a]] += 1
+
+    def apply_road(self, seat, a, b):
+        v1, v2 = self.board.topology.edge_vertices[a]
+        self.players[seat].build_road(v1, v2, self.board, setup_phase=bool(b))
+
+    def apply_settlement(self, seat, a, b):
+        self.players[seat].build_settlement(a, self.board, setup_phase=bool(b))
+
+    def apply_city(self, seat, a, b):
+        self.players[seat].build_city(a, self.board)
+
+    def apply_robber(self, seat, a, b):
+        self.board.updateBoardGraph_robber(a)
+
+    def apply_steal(self, seat, a, b):
+        if a != NO_VALUE and b != NO_VALUE:
+            self.players[a].resources[RESOURCE_TYPES[b]] -= 1
+            self.players[seat].resources[RESOURCE_TYPES[b]] += 1
+
+    def apply_discard(self, seat, a, b):
+        self.players[seat].resources[RESOURCE_TYPES[a]] -= b
+
+    def apply_draw_dev_card(self, seat, a, b):
+        self.players[seat].draw_devCard(self.board) #The deck is in the recorded order, so this draws card a
+
+    def apply_play_dev_card(self, seat, a, b):
+        player_i = self.players[seat]
+        player_i.devCards[DEV_CARD_TYPES[a]] -= 1
+        player_i.devCardPlayedThisTurn = True
+        if DEV_CARD_TYPES[a] == 'KNIGHT':
+            player_i.knightsPlayed += 1
+
+    def apply_dev_card_resources(self, seat, a, b):
+        player_i = self.players[seat]
+        chosen = [RESOURCE_TYPES[code] for code in (b & 0xFF, b >> 8) if code != NONE]
+        if DEV_CARD_TYPES[a] == 'MONOPOLY':
+            for player_j in self.players:
+                if player_j is not player_i:
+                    player_i.resources[chosen[0]] += player_j.resources[chosen[0]]
+                    player_j.resources[chosen[0]] = 0
+        else: #Year of plenty
+            for resource in chosen:
+                player_i.resources[resource] += 1
+
+    def apply_bank_trade(self, seat, a, b):
+        resources = self.players[seat].resources
+        resources[RESOURCE_TYPES[a & 0xFF]] -= a >> 8
+        resources[RESOURCE_TYPES[b]] += 1
+
+    def apply_player_trade(self, seat, a, b):
+        resource = RESOURCE_TYPES[a & 0xFF]
+        self.players[seat].resources[resource] -= b
+        self.players[a >> 8].resources[resource] += b
+
+    def apply_longest_road(self, seat, a, b):
+        for player_i in self.players:
+            if player_i.longestRoadFlag:
+                player_i.longestRoadFlag = False
+                player_i.victoryPoints -= 2
+        self.players[seat].longestRoadFlag = True
+        self.players[seat].victoryPoints += 2
+
+    def apply_largest_army(self, seat, a, b):
+        for player_i in self.players:
+            if player_i.largestArmyFlag:
+                player_i.largestArmyFlag = False
+                player_i.victoryPoints -= 2
+        self.players[seat].largestArmyFlag = True
+        self.players[seat].victoryPoints += 2
+
+
+if __name__ == '__main__':
+    import os, tempfile, time
+    from AIGame import simulate
+
+    numGames = 20
+    recordPath = os.path.join(tempfile.mkdtemp(), 'games.rec')
+    for seed in range(numGames):
+        simulate(seed=seed, recordPath=recordPath)
+    record = GameRecord(recordPath)
+
+    #Full replays
+    startTime = time.perf_counter()
+    replays = []
+    for gameIndex in range(len(record)):
+        replay = GameReplay(record, gameIndex)
+        replay.run()
+        replays.append(replay)
+    elapsed = time.perf_counter() - startTime
+    numRecords = sum(len(replay) for replay in replays)
+    print("Replayed {} games, {} records in {:.3f}s ({:.0f} records/s)".format(numGames, numRecords, elapsed, numRecords/elapsed))
+    print("Final victory points:", [[player_i.victoryPoints for player_i in replay.players] for replay in replays[:5]])
+
+    #Random seeks against replays from the start
+    replay = replays[0]
+    rng = np.random.default_rng(0)
+    positions = rng.integers(0, len(replay) + 1, size=200)
+    startTime = time.perf_counter()
+    seekStates = []
+    for position in positions:
+        replay.seek(int(position))
+        seekStates.append(replay.state.snapshot())
+    print("Seek: {:.1f}us per seek".format((time.perf_counter() - startTime)/len(positions)*1e6))
+
+    mismatches = 0
+    for position, seekState in zip(positions[:50], seekStates):
+        fresh = GameReplay(record, 0)
+        fresh.advance(int(position))
+        mismatches += fresh.state.snapshot().players != seekState.players
+    print("Seek mismatches:", mismatches)
+
+    #Games with LLM seats, replayed against the live players
+    #The LLM seats are scripted to build whatever they can afford, so their setup and turn builds all go through the record
+    from AIGame import catanAIGame
+    from LLMPlayer import LLMPlayer
+    from gameRecord import GameRecordSink
+    from eventLog import INFO
+    import contextlib
+
+    placeholderMove = LLMPlayer.get_llm_move
+    def scripted_move(self, state):
+        actions = state.available_actions
+        if state.robber_movement_is_mandatory or state.discard_is_mandatory:
+            return placeholderMove(self, state)
+        for actionType, costKey in (('build_city', 'build_city'), ('build_settlement', 'build_settlement'), ('build_road', 'build_road')):
+            canAfford = state.game_phase == 'setup' or all(self.resources[res] >= count for res, count in state.action_costs[costKey].items())
+            if actions.get(actionType) and canAfford:
+                choice = actions[actionType][int(self.rng.integers(len(actions[actionType])))]
+                if actionType == 'build_road':
+                    return {"type": actionType, "v1_index": choice[0], "v2_index": choice[1]}
+                return {"type": actionType, "vertex_index": choice}
+        return {"type": "end_turn"}
+    LLMPlayer.get_llm_move = scripted_move
+
+    recordPath = os.path.join(tempfile.mkdtemp(), 'llm_games.rec')
+    liveGames = []
+    for seed in range(10):
+        with log.configured(level=INFO, sinks=[GameRecordSink(recordPath)]), open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            game = catanAIGame(headless=True, roster=['chatgpt', 'heuristic', 'claude', 'heuristic'], seed=seed, maxTurns=200)
+        liveGames.append(sorted(game.playerQueue.queue, key=lambda player_i: player_i.name))
+    LLMPlayer.get_llm_move = placeholderMove
+
+    record = GameRecord(recordPath)
+    mismatches = 0
+    llmPieces = 0
+    for gameIndex, livePlayers in enumerate(liveGames):
+        replay = GameReplay(record, gameIndex)
+        replay.run()
+        replayPlayers = sorted(replay.players, key=lambda player_i: player_i.name)
+        for livePlayer, replayPlayer in zip(livePlayers, replayPlayers):
+            live = (livePlayer.name, livePlayer.victoryPoints, sorted(livePlayer.buildGraph['SETTLEMENTS']), sorted(livePlayer.buildGraph['CITIES']), len(livePlayer.buildGraph['ROADS']))
+            replayed = (replayPlayer.name, replayPlayer.victoryPoints, sorted(replayPlayer.buildGraph['SETTLEMENTS']), sorted(replayPlayer.buildGraph['CITIES']), len(replayPlayer.buildGraph['ROADS']))
+            if live != replayed:
+                mismatches += 1
+                print("Mismatch in game {}: live {} replayed {}".format(gameIndex, live, replayed))
+            if isinstance(livePlayer, LLMPlayer):
+                llmPieces += len(livePlayer.buildGraph['SETTLEMENTS']) + len(livePlayer.buildGraph['CITIES']) + len(livePlayer.buildGraph['ROADS'])
+    print("LLM seat games: {} games, {} LLM pieces on the board, {} player mismatches".format(len(liveGames), llmPieces, mismatches))
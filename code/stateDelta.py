@@ -0,0 +1,197 @@
+#Settlers of Catan
+#Delta encoding of the game states sent to an LLM player during one turn, against the state at its start
+
+import copy, json
+
+#A diff is sent only while it is at most this fraction of the full state's size - past that the turn is rebased
+MAX_DELTA_RATIO = 0.5
+
+PIECE_FIELDS = ('settlements_vertex_indices', 'cities_vertex_indices', 'roads_vertex_indices_pairs')
+FEEDBACK_FIELDS = ('last_action_status', 'last_action_error_details')
+
+
+#Function to serialize a state view or diff the way it is put in a prompt
+def dumps_compact(obj):
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+#Function to get the diff of two state views (modelState.to_dict() after a JSON round trip)
+#Returns a dict with only the non-empty sections of:
+#    feedback: the last action's status and details, whenever set
+#    resources: {player: {resource: new count}} of the changed counts
+#    new_pieces: {player: {settlements, cities, roads}} built since - a city replaces the settlement on its vertex
+#    robber_location_hex_index: the new robber hex
+#    players: {player: {field: new value}} of the players' other changed fields
+#    board: {field: new value} of the other changed board fields - hexes only lists the changed hexes
+#    changed: {field: new value} of the other changed state fields, removed: [fields no longer set]
+#Returns None if the players changed or pieces were taken off, which a diff doesn't express
+def state_delta(previous, current):
+    delta = {}
+
+    #Feedback is sent whenever set, so a repeated failure is reported again
+    feedback = {field: current.get(field) for field in FEEDBACK_FIELDS
+                if current.get(field) is not None or previous.get(field) != current.get(field)}
+    if feedback:
+        delta['feedback'] = feedback
+
+    previousPlayers = {p['name']: p for p in previous['players']}
+    if [p['name'] for p in previous['players']] != [p['name'] for p in current['players']]:
+        return None
+    resources, newPieces, playerChanges = {}, {}, {}
+    for p in current['players']:
+        q = previousPlayers[p['name']]
+        changedResources = {res: count for res, count in p['resources'].items() if q['resources'].get(res) != count}
+        if changedResources:
+            resources[p['name']] = changedResources
+
+        pieces = {}
+        for field, key in zip(PIECE_FIELDS, ('settlements', 'cities', 'roads')):
+            added = [piece for piece in p[field] if piece not in q[field]]
+            if added:
+                pieces[key] = added
+        if pieces:
+            newPieces[p['name']] = pieces
+
+        changedFields = {field: value for field, value in p.items()
+                         if field != 'resources' and field not in PIECE_FIELDS and q.get(field) != value}
+        if changedFields:
+            playerChanges[p['name']] = changedFields
+    if resources:
+        delta['resources'] = resources
+    if newPieces:
+        delta['new_pieces'] = newPieces
+
+    previousBoard, board = previous['board'], current['board']
+    if board['robber_location_hex_index'] != previousBoard['robber_location_hex_index']:
+        delta['robber_location_hex_index'] = board['robber_location_hex_index']
+
+    if playerChanges:
+        delta['players'] = playerChanges
+
+    boardChanges = {}
+    for field, value in board.items():
+        if field == 'hexes':
+            changedHexes = [h for h, previousHex in zip(value, previousBoard['hexes']) if h != previousHex]
+            if changedHexes:
+                boardChanges['hexes'] = changedHexes
+        elif field != 'robber_location_hex_index' and previousBoard.get(field) != value:
+            boardChanges[field] = value
+    if boardChanges:
+        delta['board'] = boardChanges
+
+    changed = {field: value for field, value in current.items()
+               if field not in ('players', 'board') and field not in FEEDBACK_FIELDS and previous.get(field) != value}
+    if changed:
+        delta['changed'] = changed
+    removed = [field for field in previous if field not in current]
+    if removed:
+        delta['removed'] = removed
+
+    #Pieces are only ever added, so anything else can't be rebuilt from the diff
+    if apply_state_delta(previous, delta) != current:
+        return None
+    return delta
+
+
+#Function to rebuild the state view a diff was made against - what the LLM has to work out from the diff
+def apply_state_delta(previous, delta):
+    state = copy.deepcopy(previous)
+    for field in delta.get('removed', []):
+        del state[field]
+    state.update(delta.get('changed', {}))
+    state.update(delta.get('feedback', {}))
+
+    for p in state['players']:
+        name = p['name']
+        p['resources'].update(delta.get('resources', {}).get(name, {}))
+        pieces = delta.get('new_pieces', {}).get(name, {})
+        cities = pieces.get('cities', [])
+        p['settlements_vertex_indices'] = sorted([v for v in p['settlements_vertex_indices'] if v not in cities] + pieces.get('settlements', []))
+        p['cities_vertex_indices'] = sorted(p['cities_vertex_indices'] + cities)
+        p['roads_vertex_indices_pairs'] = sorted(p['roads_vertex_indices_pairs'] + pieces.get('roads', []))
+        p.update(delta.get('players', {}).get(name, {}))
+
+    board = state['board']
+    if 'robber_location_hex_index' in delta:
+        board['robber_location_hex_index'] = delta['robber_location_hex_index']
+    boardChanges = dict(delta.get('board', {}))
+    changedHexes = {h['hex_index']: h for h in boardChanges.pop('hexes', [])}
+    board['hexes'] = [changedHexes.get(h['hex_index'], h) for h in board['hexes']]
+    board.update(boardChanges)
+    return state
+
+
+#Class to encode the states an LLM player is sent during a turn: the state at the start of the turn (the base) and
+#the diff from it to the current state. The base stays byte-identical for the turn, so each prompt can repeat it
+#right after the prompt prefix where a provider's prompt cache serves it, and only the diff is new. The view the LLM
+#rebuilds from each diff is checked locally, and the current state becomes the new base whenever the diff can't
+#rebuild it or is over maxRatio of the full state's size
+class StateDeltaEncoder():
+    'Turn base state, then diffs against it'
+
+    def __init__(self, maxRatio=MAX_DELTA_RATIO):
+        self.maxRatio = maxRatio
+        self.base = None #State view the turn's diffs are made against, None outside a turn
+        self.baseJson = None
+        self.active = False
+        #States that became a base and states sent as a diff
+        self.fullStates = 0
+        self.deltaStates = 0
+
+    #Function to start a turn - the next state is its base
+    def begin_turn(self):
+        self.active = True
+        self.base = self.baseJson = None
+
+    def end_turn(self):
+        self.active = False
+        self.base = self.baseJson = None
+
+    #Function to encode a modelState, returns (base JSON, diff JSON) - the diff is None when the state is the base itself,
+    #and outside a turn the state is returned as it is. static_board as in modelState.to_dict
+    def encode(self, game_state_obj, static_board=True):
+        fullJson = game_state_obj.to_json(compact=True, static_board=static_board)
+        if not self.active:
+            self.fullStates += 1
+            return fullJson, None
+
+        current = json.loads(fullJson) #Detached from the live game objects, with lists for tuples as the LLM sees them
+        if self.base is not None:
+            delta = state_delta(self.base, current)
+            if delta is not None:
+                deltaJson = dumps_compact(delta)
+                if len(deltaJson) <= self.maxRatio*len(fullJson):
+                    self.deltaStates += 1
+                    return self.baseJson, deltaJson
+
+        self.fullStates += 1
+        self.base, self.baseJson = current, fullJson
+        return fullJson, None
+
+
+if __name__ == '__main__':
+    import contextlib, io
+    from AIGame import catanAIGame
+    from LLMPlayer import LLMPlayer
+    from promptStats import PromptStats
+    from eventLog import log, OFF
+
+    #Placeholder LLM players answer offline, so the prompts of whole turns are built without an API.
+    #The same seeded game is played with and without state deltas; the prompt is the whole request content sent
+    totals = {}
+    for stateDeltas in (False, True):
+        with log.configured(level=OFF), contextlib.redirect_stdout(io.StringIO()):
+            game = catanAIGame(headless=True, roster=['chatgpt', 'claude', 'heuristic', 'heuristic'], seed=0, maxTurns=60, stateDeltas=stateDeltas)
+        totals[stateDeltas] = PromptStats()
+        for player_i in game.playerQueue.queue:
+            if isinstance(player_i, LLMPlayer):
+                totals[stateDeltas].merge(player_i.prompt_stats)
+                if stateDeltas:
+                    print("{}: {} full states, {} diffs".format(player_i.name, player_i.state_deltas.fullStates, player_i.state_deltas.deltaStates))
+    for stateDeltas, stats in totals.items():
+        requestBytes = stats.prefixBytes + stats.suffixBytes
+        print("{}: {} requests, {} bytes sent ({:.0f} per request), {} of them already sent in an earlier prompt prefix ({:.0%})".format(
+            "State deltas" if stateDeltas else "Full states ", stats.calls, requestBytes, requestBytes/max(stats.calls, 1), stats.hitBytes, stats.hitBytes/max(requestBytes, 1)))
+    fullBytes, deltaBytes = (totals[mode].prefixBytes + totals[mode].suffixBytes for mode in (False, True))
+    fullNew, deltaNew = fullBytes - totals[False].hitBytes, deltaBytes - totals[True].hitBytes
+    print("Bytes sent with state deltas: {:.0%} of full states, bytes not in a cached prefix: {:.0%}".format(deltaBytes/max(fullBytes, 1), deltaNew/max(fullNew, 1)))
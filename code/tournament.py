@@ -0,0 +1,111 @@
+#Settlers of Catan
+#Multiprocess tournament runner - plays many headless games and aggregates the results
+
+import argparse, math, os, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from AIGame import simulate
+
+#Function to play one game of the tournament in a worker process
+#seating: roster indices of the agents in seat order. Returns the seating with the game result
+def play_game(roster, seating, seed, maxTurns):
+    result = simulate([roster[agent] for agent in seating], seed=seed, maxTurns=maxTurns)
+    return seating, result
+
+
+#Function to get the Wilson score interval of a win rate - (low, high)
+def wilson_interval(wins, games, z=1.96):
+    if games == 0:
+        return 0.0, 1.0
+    p = wins/games
+    denominator = 1 + z**2/games
+    center = (p + z**2/(2*games))/denominator
+    halfWidth = z*math.sqrt(p*(1 - p)/games + z**2/(4*games**2))/denominator
+    return max(0.0, center - halfWidth), min(1.0, center + halfWidth)
+
+
+#Class to aggregate game results per agent as they stream in
+#Agents are the roster entries, labelled by roster position since the same type can be seated twice
+class TournamentStats():
+    'Win counts, victory points and seat statistics per agent'
+
+    def __init__(self, roster):
+        self.roster = list(roster)
+        self.agentNames = ["{}-{}".format(playerType, agent + 1) for agent, playerType in enumerate(self.roster)]
+        self.games = 0
+        self.unfinished = 0 #Games that hit the turn limit without a winner
+        self.wins = [0]*len(self.roster)
+        self.victoryPoints = [0]*len(self.roster)
+        self.seatWins = [0]*len(self.roster) #Wins by seat position, to spot a first player advantage
+        self.turns = 0
+
+    #Function to add the result of one game, seating[seat] is the roster index of the agent in that seat
+    def add(self, seating, result):
+        self.games += 1
+        self.turns += result["turns"]
+        #Player names are in seat order
+        seatNames = list(result["victory_points"].keys())
+        for seat, agent in enumerate(seating):
+            self.victoryPoints[agent] += result["victory_points"][seatNames[seat]]
+
+        if result["winner"] is None:
+            self.unfinished += 1
+        else:
+            winnerSeat = seatNames.index(result["winner"])
+            self.wins[seating[winnerSeat]] += 1
+            self.seatWins[winnerSeat] += 1
+
+    #Function to get a table of win rates with 95% confidence intervals
+    def summary(self):
+        lines = ["{} games, {} unfinished, {:.1f} turns per game".format(self.games, self.unfinished, self.turns/max(self.games, 1))]
+        for agent, agentName in enumerate(self.agentNames):
+            low, high = wilson_interval(self.wins[agent], self.games)
+            lines.append("{:<16} wins {:>6}  win rate {:.3f} [{:.3f}, {:.3f}]  avg VP {:.2f}".format(
+                agentName, self.wins[agent], self.wins[agent]/max(self.games, 1), low, high, self.victoryPoints[agent]/max(self.games, 1)))
+        lines.append("Wins by seat: {}".format(self.seatWins))
+        return "\n".join(lines)
+
+
+#Function to run a tournament of numGames between the agents of the roster
+#Every game gets an independent seed spawned from seed, and the seating rotates by one seat each game
+#so every agent plays every seat equally often. Results are aggregated as games finish
+def run_tournament(roster, numGames, seed=None, workers=None, maxTurns=1000, progressEvery=0):
+    stats = TournamentStats(roster)
+    gameSeeds = [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(numGames)]
+    numAgents = len(roster)
+    seatings = [tuple((gameIndex + seat) % numAgents for seat in range(numAgents)) for gameIndex in range(numGames)]
+
+    if workers == 1: #Play in this process, useful for debugging
+        results = (play_game(roster, seatings[i], gameSeeds[i], maxTurns) for i in range(numGames))
+        for seating, result in results:
+            stats.add(seating, result)
+            if progressEvery and stats.games % progressEvery == 0:
+                print(stats.summary())
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_game, roster, seatings[i], gameSeeds[i], maxTurns) for i in range(numGames)]
+        for future in as_completed(futures):
+            seating, result = future.result()
+            stats.add(seating, result)
+            if progressEvery and stats.games % progressEvery == 0:
+                print(stats.summary())
+
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a Catan tournament between AI players")
+    parser.add_argument("--roster", nargs="+", default=["heuristic"]*4, help="Player types, e.g. heuristic heuristic heuristic heuristic")
+    parser.add_argument("--games", type=int, default=100, help="Number of games to play")
+    parser.add_argument("--seed", type=int, help="Master seed of the tournament")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--max-turns", type=int, default=1000, help="Cap on player turns per game")
+    parser.add_argument("--progress", type=int, default=0, help="Print the standings every N games")
+    args = parser.parse_args()
+
+    startTime = time.perf_counter()
+    stats = run_tournament(args.roster, args.games, seed=args.seed, workers=args.workers, maxTurns=args.max_turns, progressEvery=args.progress)
+    elapsed = time.perf_counter() - startTime
+    print(stats.summary())
+    print("{} games in {:.2f}s ({:.1f} games/s) on {} workers".format(stats.games, elapsed, stats.games/elapsed, args.workers))